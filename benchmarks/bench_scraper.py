@@ -0,0 +1,247 @@
+"""Scraper parse throughput and golden-output checks on a replayed corpus.
+
+Study plan and Grind75 pages are served from a fixture directory through the
+replay transport (see ``leetcode_picker.recording``), so the numbers and the
+parsed output don't depend on the live sites. Without ``--corpus`` a
+synthetic corpus shaped like the real pages is generated: study plans with
+their problem list in ``__NEXT_DATA__``, and a Grind75 page whose links are
+only in a Next.js chunk::
+
+    python -m benchmarks.bench_scraper
+    python -m benchmarks.bench_scraper --problems 500 --repeat 20
+
+    # Record the live pages once, then benchmark and check against them
+    LEETCODE_PICKER_RECORD=corpus leetcode-picker refresh
+    python -m benchmarks.bench_scraper --corpus corpus --update-golden
+    python -m benchmarks.bench_scraper --corpus corpus
+
+The parsed problems of every page are compared with a golden file
+(``golden.json`` in the corpus, or ``benchmarks/fixtures/scraper_golden.json``
+for the synthetic one). The exit status is 1 on any difference.
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from leetcode_picker.metrics import Metrics
+from leetcode_picker.models import STUDY_PLANS, Problem
+from leetcode_picker.recording import REPLAY_ENV, FixtureStore, request_key
+from leetcode_picker.scraper import LeetCodeScraper
+
+from .bench_search import synthetic_catalog
+
+SYNTHETIC_GOLDEN = Path(__file__).resolve().parent / "fixtures" / "scraper_golden.json"
+
+GRIND75_PAGE = STUDY_PLANS["grind75"].rstrip("/") + "/?grouping=none"
+GRIND75_CHUNK = (
+    "https://www.techinterviewhandbook.org/_next/static/chunks/app/page-1a2b.js"
+)
+
+HTML_HEADERS = {"Content-Type": "text/html; charset=utf-8"}
+
+# Problems per synthetic study plan; the committed golden file covers this size
+DEFAULT_PROBLEMS = 150
+
+
+def _filler(rng: random.Random, n_blocks: int) -> str:
+    """Markup of the kind that surrounds the data on the real pages."""
+    return "".join(
+        f'<div class="flex w-full items-center px-{rng.randint(1, 8)} '
+        f'text-label-{rng.randint(1, 4)}"><span>{"x" * rng.randint(5, 40)}'
+        "</span></div>"
+        for _ in range(n_blocks)
+    )
+
+
+def study_plan_page(problems: List[Problem], rng: random.Random) -> bytes:
+    """A study plan page with its problem list in the Next.js data script."""
+    questions = [
+        {
+            "titleSlug": p.url.rstrip("/").rsplit("/", 1)[-1],
+            "title": p.title,
+            "difficulty": p.difficulty.upper(),
+            "paidOnly": False,
+        }
+        for p in problems
+    ]
+    # Next.js embeds compact JSON
+    data = {
+        "props": {
+            "pageProps": {"studyPlan": {"planSubGroups": [{"questions": questions}]}}
+        }
+    }
+    return (
+        "<html><head><title>Study Plan</title></head><body>"
+        + _filler(rng, 4 * len(problems))
+        + f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data, separators=(",", ":"))}</script>'
+        + "</body></html>"
+    ).encode("utf-8")
+
+
+def write_synthetic_corpus(directory: Path, n_problems: int, seed: int = 0) -> None:
+    """Write a corpus with one page per study plan plus Grind75 (page and chunk)."""
+    rng = random.Random(seed)
+    catalog = list(synthetic_catalog(n_problems * len(STUDY_PLANS), seed).values())
+    for problem in catalog:
+        problem.difficulty = rng.choice(["easy", "medium", "hard"])
+
+    store = FixtureStore(directory)
+    for i, plan_url in enumerate(STUDY_PLANS.values()):
+        if "leetcode.com" not in plan_url:
+            continue
+        page = study_plan_page(catalog[i * n_problems : (i + 1) * n_problems], rng)
+        store.put(request_key("GET", plan_url), 200, HTML_HEADERS, page)
+
+    # Grind75: no problem links in the page itself, so the chunk is fetched
+    slugs = [
+        item["url"].rstrip("/").rsplit("/", 1)[-1]
+        for item in LeetCodeScraper()._grind75_static_items()
+    ]
+    chunk_path = GRIND75_CHUNK.split("techinterviewhandbook.org", 1)[1]
+    grind75_page = (
+        "<html><head>"
+        f'<script src="/_next/static/chunks/webpack-9f8e.js"></script>'
+        f'<script src="{chunk_path}"></script>'
+        "</head><body>" + _filler(rng, 2000) + "</body></html>"
+    )
+    store.put(request_key("GET", GRIND75_PAGE), 200, HTML_HEADERS, grind75_page.encode())
+    chunk = ";".join(
+        f'e.exports[{i}]={{slug:"{slug}",url:"/problems/{slug}/",weeks:{i // 10}}}'
+        for i, slug in enumerate(slugs)
+    )
+    store.put(
+        request_key("GET", GRIND75_CHUNK),
+        200,
+        {"Content-Type": "application/javascript"},
+        chunk.encode(),
+    )
+
+
+def scrape_cases(scraper: LeetCodeScraper) -> Dict[str, Callable[[], List[Problem]]]:
+    """One scrape per page, keyed by plan name."""
+    cases: Dict[str, Callable[[], List[Problem]]] = {}
+    for name, url in STUDY_PLANS.items():
+        if name == "grind75":
+            cases[name] = scraper.scrape_grind75
+        else:
+            cases[name] = functools.partial(scraper.scrape_leetcode_study_plan, name, url)
+    return cases
+
+
+def run(corpus: Path, repeat: int) -> Dict[str, Dict]:
+    """Time each page's scrape and collect its output."""
+    os.environ[REPLAY_ENV] = str(corpus)
+    results = {}
+    for name in STUDY_PLANS:
+        metrics = Metrics()
+        scraper = LeetCodeScraper(metrics=metrics)
+        case = scrape_cases(scraper)[name]
+        with contextlib.redirect_stdout(io.StringIO()):
+            problems = case()
+            served = metrics.to_json()["metrics"].get("http_response_bytes_total", {})
+            page_bytes = sum(served.values())
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                case()
+                timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        results[name] = {
+            "problems": [[p.url, p.title, p.difficulty] for p in problems],
+            "ms": round(median * 1000, 3),
+            "bytes": page_bytes,
+            "mb_per_s": round(page_bytes / median / 1e6, 2) if median else 0.0,
+        }
+    return results
+
+
+def check_golden(results: Dict[str, Dict], golden_file: Path) -> int:
+    """Compare parsed problems with the golden file; returns the mismatch count."""
+    golden = json.loads(golden_file.read_text(encoding="utf-8"))
+    mismatches = 0
+    for name, result in results.items():
+        expected = golden.get(name)
+        actual = result["problems"]
+        if expected == actual:
+            continue
+        mismatches += 1
+        if expected is None:
+            print(f"  {name}: not in the golden file")
+            continue
+        print(f"  {name}: {len(actual)} problems parsed, golden has {len(expected)}")
+        for i, (want, got) in enumerate(zip(expected, actual)):
+            if want != got:
+                print(f"    first difference at #{i}: expected {want}, got {got}")
+                break
+    return mismatches
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark and the golden check."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", type=Path, help="Recorded fixture directory")
+    parser.add_argument(
+        "--problems",
+        type=int,
+        default=DEFAULT_PROBLEMS,
+        help="Problems per synthetic study plan",
+    )
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument(
+        "--update-golden",
+        action="store_true",
+        help="Write the parsed output as the new golden file",
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.corpus:
+            corpus = args.corpus
+            golden_file = corpus / "golden.json"
+        else:
+            corpus = Path(tmp)
+            write_synthetic_corpus(corpus, args.problems)
+            golden_file = SYNTHETIC_GOLDEN
+        results = run(corpus, args.repeat)
+
+    print(f"{'page':<20} {'problems':>8} {'KB':>8} {'ms':>9} {'MB/s':>7}")
+    for name, result in results.items():
+        print(
+            f"{name:<20} {len(result['problems']):>8} {result['bytes'] / 1000:>8.1f} "
+            f"{result['ms']:>9.3f} {result['mb_per_s']:>7.2f}"
+        )
+
+    if args.update_golden:
+        golden_file.parent.mkdir(parents=True, exist_ok=True)
+        golden = {name: result["problems"] for name, result in results.items()}
+        golden_file.write_text(json.dumps(golden, indent=1) + "\n", encoding="utf-8")
+        print(f"Wrote {golden_file}")
+        return 0
+    if not golden_file.exists():
+        print(f"No golden file at {golden_file}; run with --update-golden first")
+        return 1
+    if not args.corpus and args.problems != DEFAULT_PROBLEMS:
+        print(f"Golden check skipped (it covers --problems {DEFAULT_PROBLEMS})")
+        return 0
+
+    mismatches = check_golden(results, golden_file)
+    if mismatches:
+        print(f"Golden check FAILED for {mismatches} page(s)")
+        return 1
+    print("Golden check passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
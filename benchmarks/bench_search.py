@@ -0,0 +1,106 @@
+"""Title lookup latency against a synthetic catalog.
+
+Builds a trigram index over a catalog the size of LeetCode's (titles drawn from
+a skewed vocabulary, so common words have long posting lists) and times
+lookups of partial and misspelled titles::
+
+    python -m benchmarks.bench_search
+    python -m benchmarks.bench_search --problems 10000 --queries 500
+"""
+
+import argparse
+import json
+import random
+import string
+import time
+from typing import Dict, List, Optional
+
+from leetcode_picker.models import Problem
+from leetcode_picker.search import TitleIndex
+
+COMMON_WORDS = "of the in a to and with sum array string tree number maximum".split()
+
+
+def synthetic_catalog(n_problems: int, seed: int = 0) -> Dict[str, Problem]:
+    """Problems with 2-6 word titles; about a third of the words are common ones."""
+    rng = random.Random(seed)
+    vocabulary = [
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+        for _ in range(2500)
+    ]
+    problems = {}
+    for i in range(n_problems):
+        words = [
+            (
+                rng.choice(COMMON_WORDS)
+                if rng.random() < 0.35
+                else vocabulary[int(rng.paretovariate(1.2) * 3) % len(vocabulary)]
+            )
+            for _ in range(rng.randint(2, 6))
+        ]
+        url = f"https://leetcode.com/problems/synthetic-{i}/"
+        title = " ".join(w.capitalize() for w in words)
+        problems[url] = Problem(
+            url=url, title=title, difficulty="medium", study_plan_urls=[]
+        )
+    return problems
+
+
+def make_queries(problems: Dict[str, Problem], n: int, seed: int = 0) -> List[str]:
+    """Prefixes of real titles, half of them with one letter dropped."""
+    rng = random.Random(seed)
+    titles = [p.title.lower() for p in problems.values()]
+    queries = []
+    for _ in range(n):
+        query = rng.choice(titles)[: rng.randint(4, 24)]
+        if rng.random() < 0.5 and len(query) > 4:
+            drop = rng.randrange(len(query))
+            query = query[:drop] + query[drop + 1 :]
+        queries.append(query)
+    return queries
+
+
+def bench(n_problems: int, n_queries: int) -> Dict:
+    """Time index build and lookups."""
+    problems = synthetic_catalog(n_problems)
+    start = time.perf_counter()
+    index = TitleIndex.build(problems)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for query in make_queries(problems, n_queries):
+        start = time.perf_counter()
+        index.search(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+
+    return {
+        "problems": n_problems,
+        "build_ms": round(build_ms, 1),
+        "median_ms": round(timings[len(timings) // 2], 3),
+        "p90_ms": round(timings[int(len(timings) * 0.9)], 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the benchmark and print the result."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--problems", type=int, default=3500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="Print JSON")
+    args = parser.parse_args(argv)
+
+    result = bench(args.problems, args.queries)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(
+            f"{result['problems']} problems: build {result['build_ms']} ms, lookup "
+            f"median {result['median_ms']} ms, p90 {result['p90_ms']} ms, "
+            f"max {result['max_ms']} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
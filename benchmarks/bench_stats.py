@@ -0,0 +1,109 @@
+"""Stats column build and report times over synthetic submission histories.
+
+Generates a history of 10k, 100k and 300k submissions (the synthetic account
+of ``fake_leetcode``) with the matching problems.csv, and times building the
+NumPy columns from scratch, loading them from the cache, and each report.
+Every case is run ``--repeat`` times after a warm-up call and the median is
+reported in milliseconds::
+
+    python -m benchmarks.bench_stats
+    python -m benchmarks.bench_stats --sizes 10000 --repeat 9
+    python -m benchmarks.bench_stats --output current.json
+
+Needs NumPy (``pip install -e '.[stats]'``).
+"""
+
+import argparse
+import json
+import platform
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from leetcode_picker.history import HISTORY_FIELDS
+from leetcode_picker.models import Problem
+from leetcode_picker.stats import SolveStats
+from leetcode_picker.storage import HISTORY_FILE_NAME, ProblemStorage
+
+from .bench_storage import median_ms
+from .fake_leetcode import FakeLeetCode
+
+DEFAULT_SIZES = [10_000, 100_000, 300_000]
+
+DEFAULT_REPEAT = 5
+
+
+def write_account(data_file: Path, n_submissions: int) -> None:
+    """Write a synthetic account's database and submission history."""
+    fake = FakeLeetCode.synthetic(n_submissions)
+    problems = {}
+    for i, question in enumerate(fake.questions.values()):
+        url = f"https://leetcode.com/problems/{question['titleSlug']}/"
+        problems[url] = Problem(
+            url=url,
+            title=question["title"],
+            difficulty=question["difficulty"].lower(),
+            study_plan_urls=[],
+            last_pass_date=f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            completions=1,
+            submissions=1,
+        )
+    ProblemStorage(data_file).save_problems(problems)
+    with open(data_file.parent / HISTORY_FILE_NAME, "w", encoding="utf-8") as f:
+        for submission in fake.submissions:
+            record = {k: submission.get(k) for k in HISTORY_FIELDS}
+            f.write(json.dumps(record) + "\n")
+
+
+def bench(n_submissions: int, repeat: int) -> Dict[str, float]:
+    """Time every case against one synthetic account."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = Path(tmp) / "problems.csv"
+        write_account(data_file, n_submissions)
+        store = ProblemStorage(data_file)
+        stats = SolveStats(store)
+
+        def build(i: int) -> None:
+            stats.columns_file.unlink(missing_ok=True)
+            SolveStats(store)
+
+        cases: Dict[str, Callable[[int], object]] = {
+            "build": build,
+            "load_cached": lambda i: SolveStats(store),
+            "weekly_12": lambda i: stats.weekly(12),
+            "weekly_520": lambda i: stats.weekly(520),
+            "submissions_per_completion": lambda i: stats.submissions_per_completion(),
+            "stale": lambda i: stats.stale(),
+        }
+        return {name: median_ms(case, repeat) for name, case in cases.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the suite and print a table (or write JSON)."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to FILE")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for size in args.sizes:
+        results[str(size)] = bench(size, args.repeat)
+        print(f"{size} submissions:")
+        for name, ms in results[str(size)].items():
+            print(f"  {name:<28} {ms:>10.3f} ms")
+
+    if args.output:
+        report = {
+            "benchmark": "stats",
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Storage and command hot paths against synthetic problem databases.
+
+Generates ``problems.csv`` files of 300, 3k, 30k and 300k rows (a third
+solved, a fifth in study plans) and times the storage layer and the local
+commands that filter or update them. Every case is run ``--repeat`` times
+after a warm-up call and the median is reported in milliseconds::
+
+    python -m benchmarks.bench_storage
+    python -m benchmarks.bench_storage --sizes 300 3000 --repeat 9
+    python -m benchmarks.bench_storage --output current.json
+    python -m benchmarks.compare benchmarks/baselines/storage.json current.json
+
+The commands run against the synthetic file through the default data path, so
+sidecar indexes (shuffle queues, review index, progress counters, title
+index) are built by the warm-up call and measured warm.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from leetcode_picker import commands, storage
+from leetcode_picker.models import STUDY_PLANS
+from leetcode_picker.storage import ProblemStorage
+
+from .bench_search import synthetic_catalog
+
+DEFAULT_SIZES = [300, 3_000, 30_000, 300_000]
+
+DEFAULT_REPEAT = 5
+
+
+def write_catalog(data_file: Path, n_problems: int, seed: int = 0) -> None:
+    """Write a synthetic database with a realistic mix of problem states."""
+    rng = random.Random(seed)
+    problems = synthetic_catalog(n_problems, seed)
+    plan_urls = list(STUDY_PLANS.values())
+    for problem in problems.values():
+        problem.difficulty = rng.choice(["easy", "medium", "medium", "hard"])
+        if rng.random() < 0.2:
+            problem.study_plan_urls = rng.sample(plan_urls, rng.randint(1, 2))
+        if rng.random() < 0.33:
+            problem.completions = rng.randint(1, 4)
+            problem.submissions = problem.completions + rng.randint(0, 3)
+            problem.last_pass_date = (
+                f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            )
+        if rng.random() < 0.02:
+            problem.overridden_difficulty = "hard"
+    ProblemStorage(data_file).save_problems(problems)
+
+
+def median_ms(case: Callable[[int], object], repeat: int) -> float:
+    """Median wall time of ``case(i)`` over ``repeat`` runs, after a warm-up."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        case(-1)
+        timings = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            case(i)
+            timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+def bench(n_problems: int, repeat: int) -> Dict[str, float]:
+    """Time every case against one synthetic database."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = Path(tmp) / "problems.csv"
+        write_catalog(data_file, n_problems)
+        # Commands build their storage from the default path
+        storage.DEFAULT_DATA_FILE = data_file
+        store = ProblemStorage(data_file)
+        problems = store.load_problems()
+        urls = sorted(problems)
+        unsolved = [url for url in urls if not problems[url].is_completed]
+        title_counts = Counter(p.title for p in problems.values())
+        # Resolving a title only writes when the title is unambiguous
+        unique_titles = [
+            problems[url].title
+            for url in reversed(unsolved)
+            if title_counts[problems[url].title] == 1
+        ]
+
+        def load_cold(i: int) -> None:
+            store.invalidate_cache()
+            store.load_problems()
+
+        def load_cached(i: int) -> None:
+            store.load_problems()
+
+        def save(i: int) -> None:
+            store.save_problems(store.load_problems())
+
+        def add_or_update(i: int) -> None:
+            problem = store.load_problems()[urls[i % len(urls)]]
+            problem.submissions += 1
+            store.add_or_update_problem(problem)
+
+        def mark_by_slug(i: int) -> None:
+            slug = unsolved[i + 1].rstrip("/").rsplit("/", 1)[-1]
+            commands.mark_complete([slug], "2024-06-01")
+
+        def mark_by_title(i: int) -> None:
+            commands.mark_complete([unique_titles[i + 1]], "2024-06-01")
+
+        cases: Dict[str, Callable[[int], None]] = {
+            "load_cold": load_cold,
+            "load_cached": load_cached,
+            "save": save,
+            "add_or_update": add_or_update,
+            "choose": lambda i: commands.choose_problem(None, None),
+            "choose_filtered": lambda i: commands.choose_problem("hard", "leetcode-75"),
+            "choose_count_5": lambda i: commands.choose_problem(None, None, count=5),
+            "review": lambda i: commands.review_problem(None, None),
+            "review_due": lambda i: commands.review_problem(
+                None, None, due=True, limit=10
+            ),
+            "review_random": lambda i: commands.review_problem(
+                4, "medium", randomize=True
+            ),
+            "progress": lambda i: commands.show_progress(),
+            "mark_complete_slug": mark_by_slug,
+            "mark_complete_title": mark_by_title,
+        }
+        results = {name: median_ms(case, repeat) for name, case in cases.items()}
+        store.invalidate_cache()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the suite and print a table (or write JSON)."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to FILE")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for size in args.sizes:
+        results[str(size)] = bench(size, args.repeat)
+        print(f"{size} problems:")
+        for name, ms in results[str(size)].items():
+            print(f"  {name:<20} {ms:>10.3f} ms")
+
+    if args.output:
+        report = {
+            "benchmark": "storage",
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Sync throughput benchmark against the local fake LeetCode server.
+
+Measures wall time, requests issued, bytes received and peak Python memory for
+a full submission sync (or ``--fast`` status sync) of synthetic histories::
+
+    python -m benchmarks.bench_sync
+    python -m benchmarks.bench_sync --sizes 1000 100000 --latency 0.005
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from leetcode_picker.auth import LeetCodeAuth
+from leetcode_picker.storage import ProblemStorage
+from leetcode_picker.sync import LeetCodeSync
+
+from .fake_leetcode import FakeLeetCode, serve
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+
+def run_sync(fake: FakeLeetCode, url: str, fast: bool, trace_memory: bool) -> Dict:
+    """Run one sync into a fresh data directory and measure it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        auth = LeetCodeAuth(auth_file=data_dir / "auth.json", graphql_url=url)
+        auth.save_cookies("fake-session", "fake-csrf")
+        sync = LeetCodeSync(auth=auth, storage=ProblemStorage(data_dir / "problems.csv"))
+        sync.retry_delay = 0.01
+
+        requests_before = fake.requests
+        limited_before = fake.rate_limited
+        bytes_before = fake.bytes_sent
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if fast:
+                sync.sync_status_data()
+            else:
+                sync.sync_submission_data()
+        elapsed = time.perf_counter() - start
+        peak = 0
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        return {
+            "seconds": elapsed,
+            "requests": fake.requests - requests_before,
+            "rate_limited": fake.rate_limited - limited_before,
+            "bytes": fake.bytes_sent - bytes_before,
+            "peak_bytes": peak,
+            "problems": len(sync.storage.load_problems()),
+        }
+
+
+def bench(
+    size: int, fast: bool = False, latency: float = 0.0, rate_limit_every: int = 0
+) -> Dict[str, Any]:
+    """Benchmark one history size: a timed run, then a memory-traced run."""
+    fake = FakeLeetCode.synthetic(
+        size, latency=latency, rate_limit_every=rate_limit_every
+    )
+    server, url = serve(fake)
+    try:
+        timed = run_sync(fake, url, fast, trace_memory=False)
+        traced = run_sync(fake, url, fast, trace_memory=True)
+    finally:
+        server.shutdown()
+
+    return {
+        "submissions": size,
+        "mode": "fast" if fast else "full",
+        "seconds": round(timed["seconds"], 3),
+        "requests": timed["requests"],
+        "rate_limited": timed["rate_limited"],
+        "bytes": timed["bytes"],
+        "peak_mb": round(traced["peak_bytes"] / 1e6, 2),
+        "problems": timed["problems"],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the benchmark and print a table (or JSON)."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--fast", action="store_true", help="Benchmark sync --fast")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds/request")
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print JSON lines")
+    args = parser.parse_args(argv)
+
+    if not args.json:
+        print(
+            f"{'submissions':>11} {'mode':>4} {'seconds':>8} {'requests':>8} "
+            f"{'429s':>5} {'MB recv':>8} {'peak MB':>8} {'problems':>8}"
+        )
+    for size in args.sizes:
+        result = bench(size, args.fast, args.latency, args.rate_limit_every)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(
+                f"{result['submissions']:>11} {result['mode']:>4} "
+                f"{result['seconds']:>8.3f} {result['requests']:>8} "
+                f"{result['rate_limited']:>5} {result['bytes'] / 1e6:>8.2f} "
+                f"{result['peak_mb']:>8.2f} {result['problems']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Startup regression check for local (offline) commands.
+
+Runs each local command under ``python -X importtime`` in a scratch home
+directory and fails if it imports a networking library or if its total import
+time exceeds the budget. Modules a bare interpreter already imports (site
+hooks, encodings) are left out of both checks. Every command is run once
+untimed first, against a scratch bytecode cache, so compiling sources isn't
+counted and the result is the same whether or not the checkout has .pyc
+files::
+
+    python -m benchmarks.check_startup
+    python -m benchmarks.check_startup --budget-ms 30
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+# Modules that only networking commands (auth, sync, refresh, progress -v) need
+FORBIDDEN_MODULES = {
+    "requests",
+    "urllib3",
+    "charset_normalizer",
+    "idna",
+    "certifi",
+    "bs4",
+    "soupsieve",
+    "http.client",
+}
+
+# Local commands and their arguments; run in this order against a scratch store
+LOCAL_COMMANDS = [
+    ["choose"],
+    ["review"],
+    ["progress"],
+    ["override-difficulty", "https://leetcode.com/problems/two-sum/", "hard"],
+    ["mark-complete", "https://leetcode.com/problems/two-sum/", "--date", "2024-01-02"],
+]
+
+# Import time allowed per local command (sum of per-module self time), on top
+# of bare interpreter startup
+DEFAULT_BUDGET_MS = 40.0
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+SEED_CSV = """url,title,difficulty,study_plan_urls,last_pass_date,completions,submissions,overridden_difficulty
+https://leetcode.com/problems/two-sum/,Two Sum,easy,"[""https://leetcode.com/studyplan/top-interview-150/""]",2024-01-01,1,1,
+https://leetcode.com/problems/lru-cache/,LRU Cache,medium,"[""https://leetcode.com/studyplan/leetcode-75/""]",,0,0,
+"""
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Map module name to self import time in microseconds."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+def run_importtime(
+    args: List[str], home: Path, cache: Path
+) -> Tuple[Dict[str, int], int]:
+    """Run the interpreter with ``args`` under -X importtime.
+
+    Bytecode is read from and written to ``cache``.
+    """
+    env = dict(
+        os.environ,
+        HOME=str(home),
+        PYTHONPATH=str(REPO_ROOT),
+        PYTHONPYCACHEPREFIX=str(cache),
+    )
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    return parse_importtime(result.stderr), result.returncode
+
+
+def scratch_home(path: Path) -> Path:
+    """Create a home directory holding the seed problem store."""
+    data_dir = path / ".leetcode-picker"
+    data_dir.mkdir(parents=True)
+    (data_dir / "problems.csv").write_text(SEED_CSV, encoding="utf-8")
+    return path
+
+
+def check_command(
+    argv: List[str], home: Path, cache: Path, baseline: Set[str]
+) -> Tuple[float, List[str], int]:
+    """Run one command; returns (import ms, forbidden modules, exit code)."""
+    modules, returncode = run_importtime(
+        ["-m", "leetcode_picker.main", *argv], home, cache
+    )
+    modules = {name: us for name, us in modules.items() if name not in baseline}
+    forbidden = sorted(
+        name
+        for name in modules
+        if name in FORBIDDEN_MODULES or name.split(".")[0] in FORBIDDEN_MODULES
+    )
+    return sum(modules.values()) / 1000, forbidden, returncode
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Check every local command; returns a process exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = Path(tmp) / "pycache"
+        # Fill the bytecode cache from a separate store, so the timed runs
+        # start from the same data as without the warm-up
+        warm_up = scratch_home(Path(tmp) / "warm-up")
+        for command in [["-c", "pass"]] + [
+            ["-m", "leetcode_picker.main", *c] for c in LOCAL_COMMANDS
+        ]:
+            run_importtime(command, warm_up, cache)
+
+        home = scratch_home(Path(tmp) / "home")
+        baseline = set(run_importtime(["-c", "pass"], home, cache)[0])
+
+        for command in LOCAL_COMMANDS:
+            import_ms, forbidden, returncode = check_command(
+                command, home, cache, baseline
+            )
+            problems = []
+            if returncode != 0:
+                problems.append(f"exit {returncode}")
+            if forbidden:
+                problems.append(f"imported {', '.join(forbidden)}")
+            if import_ms > args.budget_ms:
+                problems.append(f"over budget ({args.budget_ms:.0f} ms)")
+            status = "FAIL" if problems else "ok"
+            detail = f"  {'; '.join(problems)}" if problems else ""
+            print(f"{status:>4} {import_ms:7.1f} ms  {' '.join(command[:1])}{detail}")
+            failed = failed or bool(problems)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
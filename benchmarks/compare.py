@@ -0,0 +1,89 @@
+"""Compare a benchmark run against a stored JSON baseline.
+
+Both files are ``--output`` reports of a benchmark (``{"results": {size:
+{case: ms}}}``). Cases that got slower by more than the threshold are flagged,
+and the exit status is 1 if any were::
+
+    python -m benchmarks.compare benchmarks/baselines/storage.json current.json
+    python -m benchmarks.compare baseline.json current.json --threshold 0.5
+
+Differences under ``--min-delta-ms`` are ignored, since sub-millisecond cases
+jitter by more than any sensible percentage.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_THRESHOLD = 0.25
+
+DEFAULT_MIN_DELTA_MS = 0.5
+
+
+def load_results(path: Path) -> Dict[str, Dict[str, float]]:
+    """The ``results`` section of a benchmark report."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare(
+    baseline: Dict[str, Dict[str, float]],
+    current: Dict[str, Dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+) -> List[Tuple[str, str, float, float, bool]]:
+    """(size, case, baseline ms, current ms, regressed) for cases in both runs."""
+    rows = []
+    for size, cases in current.items():
+        for case, ms in cases.items():
+            before = baseline.get(size, {}).get(case)
+            if before is None:
+                continue
+            regressed = ms - before > min_delta_ms and ms > before * (1 + threshold)
+            rows.append((size, case, before, ms, regressed))
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print the comparison; exit status 1 on regression."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Allowed slowdown as a fraction (default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=DEFAULT_MIN_DELTA_MS,
+        help=f"Ignore slowdowns smaller than this (default: {DEFAULT_MIN_DELTA_MS})",
+    )
+    args = parser.parse_args(argv)
+
+    rows = compare(
+        load_results(args.baseline),
+        load_results(args.current),
+        args.threshold,
+        args.min_delta_ms,
+    )
+    print(f"{'size':>7} {'case':<20} {'baseline':>10} {'current':>10} {'change':>8}")
+    for size, case, before, ms, regressed in rows:
+        change = (ms - before) / before * 100 if before else 0.0
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{size:>7} {case:<20} {before:>10.3f} {ms:>10.3f} {change:>+7.1f}%{flag}")
+
+    regressions = sum(row[4] for row in rows)
+    if regressions:
+        print(f"\n{regressions} regression(s) above {args.threshold:.0%}")
+        return 1
+    print(f"\nNo regressions above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
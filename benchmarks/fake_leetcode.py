@@ -0,0 +1,293 @@
+"""Local stand-in for the LeetCode GraphQL API.
+
+Serves the handful of queries leetcode-picker makes (``user``, ``submissionList``,
+``questionList`` and ``question``) from synthetic data, including LeetCode's
+quirks: ``submissionList`` ignores ``limit`` and returns ~20 per page. Rate
+limiting (429s) and latency can be injected.
+
+Run standalone to point a manual session at it::
+
+    python -m benchmarks.fake_leetcode --submissions 5000 --port 8765
+"""
+
+import argparse
+import json
+import random
+import re
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+# LeetCode returns this many submissions per page whatever limit is asked for
+SUBMISSION_PAGE_SIZE = 20
+
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+
+
+@dataclass
+class FakeLeetCode:
+    """Synthetic account data plus fault injection settings and request counters."""
+
+    submissions: List[Dict[str, Any]] = field(default_factory=list)
+    questions: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    page_size: int = SUBMISSION_PAGE_SIZE
+    latency: float = 0.0  # seconds added to every response
+    rate_limit_every: int = 0  # every Nth request gets a 429 (0 = never)
+    requests: int = 0
+    rate_limited: int = 0
+    bytes_sent: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @classmethod
+    def synthetic(
+        cls, n_submissions: int, n_problems: int = 0, seed: int = 0, **kwargs: Any
+    ) -> "FakeLeetCode":
+        """Build an account with ``n_submissions`` spread over ``n_problems``."""
+        rng = random.Random(seed)
+        n_problems = n_problems or max(1, min(3000, n_submissions // 4))
+        questions = {}
+        for i in range(n_problems):
+            slug = f"synthetic-problem-{i}"
+            questions[slug] = {
+                "title": f"Synthetic Problem {i}",
+                "titleSlug": slug,
+                "difficulty": DIFFICULTIES[i % 3],
+            }
+
+        slugs = list(questions)
+        now = int(time.time())
+        submissions = []
+        # Newest first, like LeetCode
+        for i in range(n_submissions):
+            slug = rng.choice(slugs)
+            accepted = rng.random() < 0.4
+            submissions.append(
+                {
+                    "id": str(n_submissions - i),
+                    "title": questions[slug]["title"],
+                    "titleSlug": slug,
+                    "status": 10 if accepted else 11,
+                    "statusDisplay": "Accepted" if accepted else "Wrong Answer",
+                    "lang": "python3",
+                    "timestamp": str(now - i * 600),
+                    "url": f"/submissions/detail/{n_submissions - i}/",
+                    "isPending": "Not Pending",
+                    "memory": "17.1 MB",
+                    "runtime": "52 ms",
+                    "__typename": "SubmissionDumpNode",
+                }
+            )
+        return cls(submissions=submissions, questions=questions, **kwargs)
+
+    def count_request(self) -> bool:
+        """Count a request; returns False if it should be rate limited."""
+        with self._lock:
+            self.requests += 1
+            if self.rate_limit_every and self.requests % self.rate_limit_every == 0:
+                self.rate_limited += 1
+                return False
+        return True
+
+    def resolve(self, name: str, args: Dict[str, Any], authed: bool) -> Any:
+        """Resolve one top-level field."""
+        if name == "user":
+            if not authed:
+                return None
+            return {
+                "username": "fake-user",
+                "firstName": "Fake",
+                "lastName": "User",
+                "profile": {"userAvatar": "", "ranking": 12345},
+            }
+        if name == "submissionList":
+            offset = int(args.get("offset") or 0)
+            page = self.submissions[offset : offset + self.page_size]
+            return {
+                "submissions": page,
+                "hasNext": offset + len(page) < len(self.submissions),
+            }
+        if name == "question":
+            question = self.questions.get(args.get("titleSlug", ""))
+            return dict(question) if question else None
+        if name == "questionList":
+            return self._question_list(args)
+        raise KeyError(name)
+
+    def _question_list(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Problemset question list filtered by solved/attempted status."""
+        accepted = set()
+        attempted = set()
+        for submission in self.submissions:
+            if submission["status"] == 10:
+                accepted.add(submission["titleSlug"])
+            else:
+                attempted.add(submission["titleSlug"])
+
+        wanted = ((args.get("filters") or {}).get("status") or "").upper()
+        rows = []
+        for slug, question in self.questions.items():
+            status = "ac" if slug in accepted else "notac" if slug in attempted else None
+            if wanted == "AC" and status != "ac":
+                continue
+            if wanted == "TRIED" and status != "notac":
+                continue
+            rows.append(dict(question, status=status))
+
+        skip = int(args.get("skip") or 0)
+        limit = int(args.get("limit") or 50)
+        return {"total": len(rows), "questions": rows[skip : skip + limit]}
+
+
+def _matching(text: str, start: int, open_char: str, close_char: str) -> int:
+    """Index just past the bracket matching the one at ``start``."""
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == open_char:
+            depth += 1
+        elif text[i] == close_char:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    raise ValueError("unbalanced query")
+
+
+def parse_top_level_fields(query: str) -> List[Tuple[str, str, str]]:
+    """Return ``(alias, field name, argument text)`` for each top-level selection.
+
+    Only understands the query shapes leetcode-picker builds: no fragments or
+    directives.
+    """
+    body_start = query.index("{", query.index(")") if "(" in query.split("{")[0] else 0)
+    end = _matching(query, body_start, "{", "}") - 1
+    fields = []
+    pos = body_start + 1
+    token = re.compile(r"\s*(\w+)\s*(?::\s*(\w+))?\s*")
+    while True:
+        match = token.match(query, pos)
+        if not match or match.end() > end or not match.group(1):
+            break
+        alias, name = match.group(1), match.group(2) or match.group(1)
+        pos = match.end()
+        args = ""
+        if query[pos] == "(":
+            close = _matching(query, pos, "(", ")")
+            args = query[pos + 1 : close - 1]
+            pos = close
+        while query[pos].isspace():
+            pos += 1
+        if query[pos] == "{":
+            pos = _matching(query, pos, "{", "}")
+        fields.append((alias, name, args))
+    return fields
+
+
+def parse_arguments(text: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve ``name: $var`` / ``name: literal`` arguments."""
+    args: Dict[str, Any] = {}
+    for part in re.findall(r'(\w+)\s*:\s*(\$\w+|"[^"]*"|[^,\s]+)', text):
+        name, value = part
+        if value.startswith("$"):
+            args[name] = variables.get(value[1:])
+        else:
+            try:
+                args[name] = json.loads(value)
+            except json.JSONDecodeError:
+                args[name] = value
+    return args
+
+
+def make_handler(fake: FakeLeetCode) -> type:
+    """Build a request handler class bound to ``fake``."""
+
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive, like the real server, so session connection reuse shows up
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            super().setup()
+            # Headers and body go out in separate writes; don't let Nagle stall them
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def _send(self, status: int, payload: Dict[str, Any]) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            with fake._lock:
+                fake.bytes_sent += len(body)
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if fake.latency:
+                time.sleep(fake.latency)
+            if not fake.count_request():
+                self._send(429, {"errors": [{"message": "Too many requests"}]})
+                return
+
+            authed = bool(self.headers.get("X-CSRFToken"))
+            variables = request.get("variables") or {}
+            data: Dict[str, Any] = {}
+            errors = []
+            try:
+                fields = parse_top_level_fields(request.get("query", ""))
+            except ValueError as e:
+                self._send(400, {"errors": [{"message": str(e)}]})
+                return
+            for alias, name, arg_text in fields:
+                try:
+                    data[alias] = fake.resolve(
+                        name, parse_arguments(arg_text, variables), authed
+                    )
+                except KeyError:
+                    data[alias] = None
+                    errors.append({"message": f"unknown field {name}", "path": [alias]})
+            payload: Dict[str, Any] = {"data": data}
+            if errors:
+                payload["errors"] = errors
+            self._send(200, payload)
+
+    return Handler
+
+
+def serve(
+    fake: FakeLeetCode, host: str = "127.0.0.1", port: int = 0
+) -> Tuple[ThreadingHTTPServer, str]:
+    """Serve ``fake`` on a background thread. Returns the server and GraphQL URL."""
+    server = ThreadingHTTPServer((host, port), make_handler(fake))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/graphql"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the fake server in the foreground."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--submissions", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    fake = FakeLeetCode.synthetic(
+        args.submissions, latency=args.latency, rate_limit_every=args.rate_limit_every
+    )
+    server, url = serve(fake, port=args.port)
+    print(f"Fake LeetCode GraphQL serving {args.submissions} submissions at {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
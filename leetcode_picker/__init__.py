@@ -1,3 +1,19 @@
 """LeetCode Problem Picker - A CLI tool for selecting random LeetCode problems."""
 
+from typing import TYPE_CHECKING, Any
+
 __version__ = "0.1.0"
+
+__all__ = ["LeetCodePicker"]
+
+if TYPE_CHECKING:
+    from .api import LeetCodePicker
+
+
+def __getattr__(name: str) -> Any:
+    """Import the library API on first use, so the CLI doesn't pay for it."""
+    if name == "LeetCodePicker":
+        from .api import LeetCodePicker
+
+        return LeetCodePicker
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
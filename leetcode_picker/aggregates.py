@@ -0,0 +1,167 @@
+"""Materialized progress counters kept next to the problem database.
+
+Per study plan and per difficulty: total problems, completed, and completed
+this week (last pass on or after this week's Monday). Commands that change
+single problems apply the difference between the old and new state; bulk
+changes (sync, refresh) and edits made outside the CLI are caught by the data
+file fingerprint and trigger a full recount, as does the start of a new week.
+Reading progress is then a small JSON read instead of a pass over every
+problem and plan.
+"""
+
+import json
+import os
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import STUDY_PLANS, Problem
+from .storage import ProblemStorage
+
+AGGREGATES_FILE_NAME = "progress.json"
+
+FIELDS = ["total", "completed", "completed_week"]
+
+# Section for problems imported by sync that aren't in any study plan
+OUTSIDE_PLANS = "outside"
+
+# section -> key -> field -> count
+Counts = Dict[str, Dict[str, Dict[str, int]]]
+
+
+def week_start(today: Optional[date] = None) -> str:
+    """Monday of the current week (YYYY-MM-DD)."""
+    today = today or date.today()
+    return (today - timedelta(days=today.weekday())).isoformat()
+
+
+def problem_plans(problem: Problem) -> List[str]:
+    """Names of the study plans a problem belongs to."""
+    return [
+        name
+        for name, plan_url in STUDY_PLANS.items()
+        if any(plan_url in url for url in problem.study_plan_urls)
+    ]
+
+
+def _groups(problem: Problem) -> List[Tuple[str, str]]:
+    """(section, key) pairs a problem is counted under."""
+    groups = [("plans", name) for name in problem_plans(problem)]
+    if not problem.study_plan_urls:
+        groups.append((OUTSIDE_PLANS, "all"))
+    groups.append(("difficulties", problem.effective_difficulty))
+    return groups
+
+
+def _add(counts: Counts, problem: Problem, week: str, sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) a problem's contribution."""
+    completed = problem.is_completed
+    this_week = (
+        completed
+        and problem.last_pass_date is not None
+        and problem.last_pass_date >= week
+    )
+    for section, key in _groups(problem):
+        row = counts.setdefault(section, {}).setdefault(key, dict.fromkeys(FIELDS, 0))
+        row["total"] += sign
+        row["completed"] += sign * completed
+        row["completed_week"] += sign * this_week
+
+
+def compute(problems: Iterable[Problem], week: str) -> Counts:
+    """Count everything from scratch."""
+    counts: Counts = {
+        "plans": {name: dict.fromkeys(FIELDS, 0) for name in STUDY_PLANS},
+        "difficulties": {
+            level: dict.fromkeys(FIELDS, 0) for level in ("easy", "medium", "hard")
+        },
+    }
+    for problem in problems:
+        _add(counts, problem, week, 1)
+    return counts
+
+
+class ProgressAggregates:
+    """Progress counters for a storage's data file.
+
+    Create it before changing problems, then call apply() after saving the
+    change, so the update can be applied incrementally.
+    """
+
+    def __init__(self, storage: ProblemStorage):
+        """Load the counters, recounting if they're stale."""
+        self.storage = storage
+        self.aggregates_file = storage.data_file.parent / AGGREGATES_FILE_NAME
+        self.week = week_start()
+        stored = self._read()
+        self.recounted = stored is None
+        self.counts = self.recount() if stored is None else stored
+
+    def _read(self) -> Optional[Counts]:
+        """Stored counters, or None if missing or out of date.
+
+        Saves held in memory (the shell) aren't in them, so while there are
+        any, the counters are always recounted from the held copy.
+        """
+        if self.storage.pending_writes:
+            return None
+        try:
+            with open(self.aggregates_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if (
+                tuple(data["fingerprint"]) == self.storage.fingerprint()
+                and data["week"] == self.week
+            ):
+                return data["counts"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def _save(self) -> None:
+        """Persist the counters, tagged with the data file fingerprint and week.
+
+        Skipped while saves are held in memory: the counters would include
+        them, but the fingerprint is still that of the file on disk.
+        """
+        if self.storage.pending_writes:
+            return
+        data = {
+            "fingerprint": self.storage.fingerprint(),
+            "week": self.week,
+            "counts": self.counts,
+        }
+        tmp_file = self.aggregates_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_file, self.aggregates_file)
+
+    def recount(self) -> Counts:
+        """Recount from every problem and store the result."""
+        self.counts = compute(self.storage.load_problems().values(), self.week)
+        self._save()
+        return self.counts
+
+    def apply(self, changes: Iterable[Tuple[Problem, Problem]]) -> None:
+        """Update the counters for saved changes, given (before, after) pairs."""
+        for before, after in changes:
+            _add(self.counts, before, self.week, -1)
+            _add(self.counts, after, self.week, 1)
+        self._save()
+
+    def verify(self) -> List[str]:
+        """Recount from scratch; describe every counter that had drifted."""
+        stored = self.counts
+        fresh = compute(self.storage.load_problems().values(), self.week)
+        drift = []
+        for section in sorted(set(stored) | set(fresh)):
+            keys = set(stored.get(section, {})) | set(fresh.get(section, {}))
+            for key in sorted(keys):
+                for field in FIELDS:
+                    old = stored.get(section, {}).get(key, {}).get(field, 0)
+                    new = fresh.get(section, {}).get(key, {}).get(field, 0)
+                    if old != new:
+                        drift.append(
+                            f"{section}/{key}/{field}: stored {old}, actual {new}"
+                        )
+        self.counts = fresh
+        self._save()
+        return drift
@@ -0,0 +1,490 @@
+"""Library interface for using the picker from other Python code.
+
+    from leetcode_picker import LeetCodePicker
+
+    with LeetCodePicker() as picker:
+        for problem in picker.choose(difficulty="medium", count=2):
+            print(problem.title, problem.url)
+        picker.mark_complete("two-sum")
+        print(picker.progress()["plans"]["leetcode-75"])
+
+Methods return Problem objects and plain dicts instead of printing, and raise
+ValueError for bad arguments and LookupError for unknown problems.
+
+One instance is meant to be shared by many threads. Reads are answered from
+an immutable in-memory snapshot of the database without taking a lock.
+Writes are queued to a single writer thread, which applies everything queued
+so far in one ProblemStorage.update() (one file write per batch) and then
+publishes a new snapshot. Changes made by other processes (the CLI, a
+scheduled sync) are noticed by the data file's fingerprint and picked up on
+the next read.
+"""
+
+import copy
+import queue
+import re
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from .aggregates import Counts, ProgressAggregates, compute, week_start
+from .derived import after_bulk_update, after_update, selection_queues
+from .models import STUDY_PLANS, Problem
+from .picking import DIFFICULTIES, quotas
+from .scheduler import ReviewIndex, due_date
+from .selection import Selection
+from .storage import ProblemStorage
+
+if TYPE_CHECKING:
+    from .search import TitleIndex
+
+# (before, after) pairs of the problems a write changed
+Changes = List[Tuple[Problem, Problem]]
+
+# A queued write: mutates the problems, returns its result and its changes
+Operation = Callable[[Dict[str, Problem]], Tuple[Any, Changes]]
+
+
+class _Snapshot:
+    """A private copy of the problems that is never mutated once published.
+
+    Derived data (review order, title index, progress counters) is built the
+    first time it's asked for.
+    """
+
+    def __init__(self, fingerprint: Tuple[int, int, int], problems: Dict[str, Problem]):
+        """Wrap copied problems, as of the data file ``fingerprint``."""
+        self.fingerprint = fingerprint
+        self.problems = problems
+        self._lock = threading.Lock()
+        self._derived: Dict[str, Any] = {}
+
+    def _get(self, name: str, build: Callable[[], Any]) -> Any:
+        """Build a piece of derived data once."""
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = build()
+            return self._derived[name]
+
+    def review_order(self) -> List[Tuple[str, str]]:
+        """(due date, url) of every solved problem, most overdue first."""
+        return self._get(
+            "review",
+            lambda: sorted(
+                (due_date(p), p.url) for p in self.problems.values() if p.is_completed
+            ),
+        )
+
+    def title_index(self) -> "TitleIndex":
+        """Trigram index over the titles."""
+        from .search import TitleIndex
+
+        return self._get("titles", lambda: TitleIndex.build(self.problems))
+
+    def progress(self, week: str) -> Counts:
+        """Progress counters as of ``week``."""
+        return self._get(
+            f"progress {week}", lambda: compute(self.problems.values(), week)
+        )
+
+
+@dataclass
+class _Write:
+    """A queued operation and the future its caller waits on."""
+
+    operation: Operation
+    future: "Future[Any]"
+
+
+def _copy(problems: Dict[str, Problem]) -> Dict[str, Problem]:
+    """Problems detached from the storage snapshot, which writes mutate."""
+    return {url: replace(problem) for url, problem in problems.items()}
+
+
+class LeetCodePicker:
+    """Thread-safe client over one problem database."""
+
+    def __init__(
+        self, data_file: Optional[Path] = None, auth_file: Optional[Path] = None
+    ):
+        """Open the database (default: ~/.leetcode-picker/problems.csv)."""
+        self.storage = ProblemStorage(data_file)
+        self.auth_file = auth_file
+        self._current: Optional[_Snapshot] = None
+        # Held for every use of self.storage, whose cached snapshot writes
+        # mutate in place
+        self._storage_lock = threading.Lock()
+        self._writes: "queue.Queue[Optional[_Write]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+
+    def __enter__(self) -> "LeetCodePicker":
+        """Use as a context manager; close() on exit."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Stop the writer thread."""
+        self.close()
+
+    def close(self) -> None:
+        """Finish queued writes and stop the writer thread."""
+        with self._writer_lock:
+            if self._writer is None:
+                return
+            self._writes.put(None)
+            self._writer.join()
+            self._writer = None
+
+    # Reads
+
+    def _snapshot(self) -> _Snapshot:
+        """The current snapshot, reloaded if the data file changed on disk."""
+        current = self._current
+        if current is not None and current.fingerprint == self.storage.fingerprint():
+            return current
+        with self._storage_lock:
+            return self._reload()
+
+    def _reload(self) -> _Snapshot:
+        """Publish a fresh snapshot if needed; call with the storage lock held."""
+        # Taken before loading: a write in between only causes another reload
+        fingerprint = self.storage.fingerprint()
+        current = self._current
+        if current is None or current.fingerprint != fingerprint:
+            current = _Snapshot(fingerprint, _copy(self.storage.load_problems()))
+            self._current = current
+        return current
+
+    def find(self, query: str) -> Problem:
+        """Look a problem up by URL, slug or (partial or misspelled) title."""
+        from .search import best_match
+
+        snapshot = self._snapshot()
+        match = re.search(r"/problems/([^/?#]+)", query)
+        slug = match.group(1) if match else query.strip().strip("/")
+        problem = snapshot.problems.get(f"https://leetcode.com/problems/{slug}/")
+        if problem is not None:
+            return replace(problem)
+
+        matches = snapshot.title_index().search(query)
+        url = best_match(matches)
+        if url is not None and url in snapshot.problems:
+            return replace(snapshot.problems[url])
+        if matches:
+            titles = ", ".join(snapshot.problems[u].title for _, u in matches)
+            raise LookupError(f"'{query}' matches several problems: {titles}")
+        raise LookupError(f"problem not found: {query}")
+
+    def problems(
+        self,
+        difficulty: Optional[str] = None,
+        study_plan: Optional[str] = None,
+        solved: Optional[bool] = None,
+    ) -> List[Problem]:
+        """Problems matching every filter given, in URL order."""
+        _check_filters(difficulty, study_plan)
+        return [
+            replace(p)
+            for _, p in sorted(self._snapshot().problems.items())
+            if (difficulty is None or p.effective_difficulty == difficulty)
+            and (study_plan is None or any(study_plan in u for u in p.study_plan_urls))
+            and (solved is None or p.is_completed == solved)
+        ]
+
+    def choose(
+        self,
+        difficulty: Optional[str] = None,
+        study_plan: Optional[str] = None,
+        count: int = 1,
+        mix: Optional[Dict[str, int]] = None,
+        seed: Optional[int] = None,
+    ) -> List[Problem]:
+        """Random unsolved problems, without repeats until all have come up.
+
+        Shares the shuffle bags with ``leetcode-picker choose``. ``mix`` asks
+        for a number per difficulty instead of ``difficulty``/``count``.
+        """
+        return self._pick(
+            False, _checked_quotas(difficulty, count, mix), study_plan, seed
+        )
+
+    def review(
+        self,
+        difficulty: Optional[str] = None,
+        count: int = 1,
+        weeks_ago: Optional[int] = None,
+    ) -> List[Tuple[str, Problem]]:
+        """(due date, problem) for the most overdue solved problems.
+
+        ``weeks_ago`` limits it to problems last solved at least that long ago.
+        """
+        _check_filters(difficulty, None)
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        cutoff = None
+        if weeks_ago:
+            cutoff = (datetime.now() - timedelta(weeks=weeks_ago)).strftime("%Y-%m-%d")
+        snapshot = self._snapshot()
+        picked = []
+        for next_due, url in snapshot.review_order():
+            problem = snapshot.problems[url]
+            if difficulty and problem.effective_difficulty != difficulty:
+                continue
+            if cutoff and not (
+                problem.last_pass_date and problem.last_pass_date <= cutoff
+            ):
+                continue
+            picked.append((next_due, replace(problem)))
+            if len(picked) >= count:
+                break
+        return picked
+
+    def review_random(
+        self,
+        difficulty: Optional[str] = None,
+        count: int = 1,
+        mix: Optional[Dict[str, int]] = None,
+        weeks_ago: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> List[Problem]:
+        """Random solved problems, from the same shuffle bags as ``review --random``."""
+        return self._pick(
+            True, _checked_quotas(difficulty, count, mix), None, seed, weeks_ago
+        )
+
+    def due(
+        self, difficulty: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[Tuple[str, Problem]]:
+        """(due date, problem) for everything due for review today, most overdue first."""
+        _check_filters(difficulty, None)
+        today = datetime.now().strftime("%Y-%m-%d")
+        snapshot = self._snapshot()
+        items: List[Tuple[str, Problem]] = []
+        for next_due, url in snapshot.review_order():
+            if next_due > today or (limit and len(items) >= limit):
+                break
+            problem = snapshot.problems[url]
+            if difficulty is None or problem.effective_difficulty == difficulty:
+                items.append((next_due, replace(problem)))
+        return items
+
+    def progress(self) -> Counts:
+        """Counters as ``leetcode-picker progress`` shows them.
+
+        ``counts[section][key][field]``: sections "plans", "difficulties" and
+        "outside" (problems in no study plan); fields "total", "completed" and
+        "completed_week".
+        """
+        return copy.deepcopy(self._snapshot().progress(week_start()))
+
+    def _pick(
+        self,
+        solved: bool,
+        per_difficulty: List[Tuple[Optional[str], int]],
+        study_plan: Optional[str],
+        seed: Optional[int],
+        weeks_ago: Optional[int] = None,
+    ) -> List[Problem]:
+        """Pop problems from the shuffle bags, one quota at a time."""
+        _check_filters(None, study_plan)
+        snapshot = self._snapshot()
+        picked: set = set()
+        chosen: List[Problem] = []
+        # The storage write lock also keeps other threads' picks out
+        with self.storage.write_lock():
+            queues = selection_queues(self.storage)
+            for difficulty, quota in per_difficulty:
+                selection = Selection(
+                    solved=solved,
+                    difficulty=difficulty,
+                    study_plan=study_plan,
+                    weeks_ago=weeks_ago,
+                )
+                chosen += queues.pop_many(
+                    selection, snapshot.problems, quota, seed, picked
+                )
+        return [replace(problem) for problem in chosen]
+
+    # Writes
+
+    def mark_complete(self, problem: str, date: Optional[str] = None) -> Problem:
+        """Record a completion (today unless ``date``, YYYY-MM-DD is given).
+
+        Returns the updated problem. Marking a problem complete again for the
+        same date changes nothing, as on the command line.
+        """
+        if date:
+            datetime.strptime(date, "%Y-%m-%d")
+        url = self.find(problem).url
+
+        def operation(problems: Dict[str, Problem]) -> Tuple[Problem, Changes]:
+            current = _stored(problems, url)
+            if current.last_pass_date == (date or datetime.now().strftime("%Y-%m-%d")):
+                return replace(current), []
+            before = replace(current)
+            current.mark_completed(date)
+            return replace(current), [(before, current)]
+
+        return self._submit(operation)
+
+    def override_difficulty(self, problem: str, difficulty: str) -> Problem:
+        """Set the difficulty a problem counts as; returns the updated problem."""
+        _check_filters(difficulty, None)
+        url = self.find(problem).url
+
+        def operation(problems: Dict[str, Problem]) -> Tuple[Problem, Changes]:
+            current = _stored(problems, url)
+            before = replace(current)
+            current.overridden_difficulty = difficulty
+            return replace(current), [(before, current)]
+
+        return self._submit(operation)
+
+    def _submit(self, operation: Operation) -> Any:
+        """Queue a write for the writer thread and wait for its result."""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="leetcode-picker-writer", daemon=True
+                )
+                self._writer.start()
+        write = _Write(operation, Future())
+        self._writes.put(write)
+        return write.future.result()
+
+    def _write_loop(self) -> None:
+        """Apply queued writes in batches until close()."""
+        while True:
+            first = self._writes.get()
+            if first is None:
+                return
+            batch = [first]
+            stop = False
+            while True:
+                try:
+                    write = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if write is None:
+                    stop = True
+                    break
+                batch.append(write)
+            self._apply(batch)
+            if stop:
+                return
+
+    def _apply(self, batch: List[_Write]) -> None:
+        """Save a batch of writes in one update and publish the result."""
+        results: Dict[int, Any] = {}
+        changes: Changes = []
+
+        def apply(problems: Dict[str, Problem]) -> bool:
+            # Runs again on fresh data if another process saved meanwhile
+            results.clear()
+            changes.clear()
+            for i, write in enumerate(batch):
+                try:
+                    results[i], write_changes = write.operation(problems)
+                except Exception as e:
+                    results[i] = e
+                    continue
+                changes.extend(write_changes)
+            return bool(changes)
+
+        with self._storage_lock:
+            before = self.storage.fingerprint()
+            try:
+                # Counters and review index as the CLI keeps them, so its
+                # progress and review stay incremental
+                aggregates = ProgressAggregates(self.storage)
+                index = ReviewIndex(self.storage)
+                self.storage.update(apply)
+                if changes:
+                    after_update(self.storage, changes, index, aggregates)
+            except Exception as e:
+                # The cached snapshot may hold the unsaved changes
+                self.storage.invalidate_cache()
+                for write in batch:
+                    write.future.set_exception(e)
+                return
+            self._publish(before, changes)
+
+        for i, write in enumerate(batch):
+            if isinstance(results.get(i), Exception):
+                write.future.set_exception(results[i])
+            else:
+                write.future.set_result(results.get(i))
+
+    def _publish(self, before: Tuple[int, int, int], changes: Changes) -> None:
+        """Publish the snapshot after a write; call with the storage lock held.
+
+        Only the changed problems are copied, unless the file had also been
+        written by someone else since the last snapshot.
+        """
+        current = self._current
+        if current is None or current.fingerprint != before or self.storage.rebased:
+            self._reload()
+            return
+        problems = dict(current.problems)
+        for _, after in changes:
+            problems[after.url] = replace(after)
+        self._current = _Snapshot(self.storage.fingerprint(), problems)
+
+    # Network
+
+    def refresh(self, verbose: bool = False) -> int:
+        """Re-scrape the study plans into the database; returns its size."""
+        from .scraper import LeetCodeScraper
+
+        with self._storage_lock:
+            LeetCodeScraper().update_problem_database(self.storage, verbose=verbose)
+            self._after_bulk_update()
+            return len(self._current.problems) if self._current else 0
+
+    def sync(self, fast: bool = False, restart: bool = False) -> bool:
+        """Sync from LeetCode (see ``leetcode-picker sync``); returns success."""
+        from .auth import LeetCodeAuth
+        from .sync import LeetCodeSync
+
+        with self._storage_lock:
+            sync = LeetCodeSync(LeetCodeAuth(self.auth_file), self.storage)
+            ok = sync.sync_status_data() if fast else sync.sync_submission_data(restart)
+            self._after_bulk_update()
+            return ok
+
+    def _after_bulk_update(self) -> None:
+        """Reset derived data and reload; call with the storage lock held."""
+        after_bulk_update(self.storage)
+        self._reload()
+
+
+def _stored(problems: Dict[str, Problem], url: str) -> Problem:
+    """A problem in the database being written, which may have changed since lookup."""
+    problem = problems.get(url)
+    if problem is None:
+        raise LookupError(f"problem not found: {url}")
+    return problem
+
+
+def _check_filters(difficulty: Optional[str], study_plan: Optional[str]) -> None:
+    """Reject unknown difficulties and study plans."""
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError(f"unknown difficulty: {difficulty}")
+    if study_plan is not None and study_plan not in STUDY_PLANS:
+        raise ValueError(f"unknown study plan: {study_plan}")
+
+
+def _checked_quotas(
+    difficulty: Optional[str], count: int, mix: Optional[Dict[str, int]]
+) -> List[Tuple[Optional[str], int]]:
+    """The quotas per difficulty, after rejecting arguments that can't be picked."""
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    if mix and (difficulty or count != 1):
+        raise ValueError("use either mix or difficulty/count, not both")
+    for level in mix or [difficulty]:
+        _check_filters(level, None)
+    return quotas(difficulty, count, mix)
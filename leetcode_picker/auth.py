@@ -2,11 +2,18 @@
 
 import json
 import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 import requests
 
+from . import profiling, recording
+from .metrics import REGISTRY, Metrics
+
 # LeetCode GraphQL endpoint
 LEETCODE_GRAPHQL_URL = "https://leetcode.com/graphql"
 
@@ -14,14 +21,106 @@ LEETCODE_GRAPHQL_URL = "https://leetcode.com/graphql"
 DEFAULT_AUTH_FILE = Path.home() / ".leetcode-picker" / "auth.json"
 
 
+class RateLimiter:
+    """Spaces requests evenly, across every thread and session sharing it."""
+
+    def __init__(self, per_second: float):
+        """Allow at most ``per_second`` requests per second."""
+        self.interval = 1.0 / per_second
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        """Block until this caller's request slot comes up."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class GraphQLError(Exception):
+    """Raised when a GraphQL request can't be made or its response is unusable."""
+
+
+@dataclass
+class GraphQLField:
+    """A top-level GraphQL selection that can be merged into a batched request.
+
+    ``selection`` is the field text as it would appear inside ``query { ... }``,
+    referencing its variables as ``$name``; ``variable_types`` gives each
+    variable's GraphQL type.
+    """
+
+    selection: str
+    variables: Dict[str, Any] = field(default_factory=dict)
+    variable_types: Dict[str, str] = field(default_factory=dict)
+
+
+# Current user, used both as the auth probe and for user info
+CURRENT_USER_FIELD = GraphQLField(
+    """
+    user {
+        username
+        firstName
+        lastName
+        profile {
+            userAvatar
+            ranking
+        }
+    }
+    """
+)
+
+
+def build_batched_query(fields: Dict[str, GraphQLField]) -> Dict[str, Any]:
+    """Merge several aliased selections into one GraphQL request body.
+
+    Each selection is aliased by its key and its variables are prefixed with
+    the alias, so the same field can appear several times with different
+    arguments.
+    """
+    definitions = []
+    selections = []
+    variables: Dict[str, Any] = {}
+
+    for alias, gql_field in fields.items():
+        selection = re.sub(
+            r"\$(\w+)", lambda m: f"${alias}_{m.group(1)}", gql_field.selection
+        )
+        selections.append(f"{alias}: {selection.strip()}")
+        for name, type_name in gql_field.variable_types.items():
+            definitions.append(f"${alias}_{name}: {type_name}")
+            variables[f"{alias}_{name}"] = gql_field.variables.get(name)
+
+    header = f"query batched({', '.join(definitions)})" if definitions else "query"
+    body = "\n".join(selections)
+    return {"query": f"{header} {{\n{body}\n}}", "variables": variables}
+
+
 class LeetCodeAuth:
     """Handles LeetCode authentication using cookies."""
 
-    def __init__(self, auth_file: Optional[Path] = None):
-        """Initialize with optional custom auth file path."""
+    def __init__(
+        self,
+        auth_file: Optional[Path] = None,
+        graphql_url: str = LEETCODE_GRAPHQL_URL,
+        metrics: Optional[Metrics] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        """Initialize with optional custom auth file path, GraphQL endpoint and metrics.
+
+        A ``rate_limiter`` shared between several accounts keeps their
+        combined request rate under its limit.
+        """
         self.auth_file = auth_file or DEFAULT_AUTH_FILE
+        self.graphql_url = graphql_url
+        self.metrics = metrics or REGISTRY
+        self.rate_limiter = rate_limiter
         self.session_cookie: Optional[str] = None
         self.csrf_token: Optional[str] = None
+        self._session: Optional[requests.Session] = None
 
     def save_cookies(self, session_cookie: str, csrf_token: str) -> None:
         """Save authentication cookies to file."""
@@ -48,6 +147,7 @@ class LeetCodeAuth:
 
         self.session_cookie = session_cookie
         self.csrf_token = csrf_token
+        self._session = None
 
     def load_cookies(self) -> bool:
         """Load authentication cookies from file. Returns True if successful."""
@@ -70,13 +170,20 @@ class LeetCodeAuth:
 
             self.session_cookie = auth_data.get("leetcode_session")
             self.csrf_token = auth_data.get("csrf_token")
+            self._session = None
 
             return bool(self.session_cookie and self.csrf_token)
         except (json.JSONDecodeError, KeyError, OSError):
             return False
 
     def get_authenticated_session(self) -> Optional[requests.Session]:
-        """Get a requests session with authentication headers."""
+        """Get a requests session with authentication headers.
+
+        The session is reused across calls so requests share one connection pool.
+        """
+        if self._session is not None:
+            return self._session
+
         if not (self.session_cookie and self.csrf_token):
             if not self.load_cookies():
                 return None
@@ -103,69 +210,56 @@ class LeetCodeAuth:
             }
         )
 
+        recording.attach(session)
+        profiling.instrument_session(session)
+        self.metrics.instrument_session(session, "graphql")
+        self._session = session
         return session
 
-    def test_authentication(self) -> bool:
-        """Test if current authentication is working with a simple query."""
+    def graphql(self, fields: Dict[str, GraphQLField]) -> Dict[str, Any]:
+        """Run several selections in one round trip and split the results out.
+
+        Returns each alias's data, or None for selections that came back with
+        an error. Raises GraphQLError if the request itself fails.
+        """
         session = self.get_authenticated_session()
         if not session:
-            return False
-
-        # Simple GraphQL query to test authentication
-        query = {
-            "query": """
-            query currentUser {
-                user {
-                    username
-                    firstName
-                    lastName
-                }
-            }
-            """
-        }
+            raise GraphQLError("not authenticated")
 
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait()
         try:
-            response = session.post(LEETCODE_GRAPHQL_URL, json=query, timeout=10)
+            response = session.post(
+                self.graphql_url, json=build_batched_query(fields), timeout=10
+            )
             response.raise_for_status()
+            with profiling.phase("json decode"):
+                data = response.json()
+        except (requests.RequestException, json.JSONDecodeError) as e:
+            if isinstance(e, requests.RequestException):
+                self.metrics.request_failed(e, "graphql")
+            raise GraphQLError(str(e)) from e
 
-            data = response.json()
-            return (
-                "data" in data
-                and "user" in data["data"]
-                and data["data"]["user"] is not None
-            )
-        except (requests.RequestException, json.JSONDecodeError, KeyError):
-            return False
+        if not isinstance(data, dict) or not isinstance(data.get("data"), dict):
+            raise GraphQLError(f"unexpected response: {str(data)[:200]}")
 
-    def get_user_info(self) -> Optional[Dict]:
-        """Get basic user information to verify auth is working."""
-        session = self.get_authenticated_session()
-        if not session:
-            return None
-
-        query = {
-            "query": """
-            query currentUser {
-                user {
-                    username
-                    firstName
-                    lastName
-                    profile {
-                        userAvatar
-                        ranking
-                    }
-                }
-            }
-            """
+        failed = {
+            error["path"][0]
+            for error in data.get("errors") or []
+            if isinstance(error, dict) and error.get("path")
+        }
+        return {
+            alias: None if alias in failed else data["data"].get(alias)
+            for alias in fields
         }
 
-        try:
-            response = session.post(LEETCODE_GRAPHQL_URL, json=query, timeout=10)
-            response.raise_for_status()
+    def test_authentication(self) -> bool:
+        """Test if current authentication is working with a simple query."""
+        return self.get_user_info() is not None
 
-            data = response.json()
-            if "data" in data and "user" in data["data"] and data["data"]["user"]:
-                return data["data"]["user"]
-            return None
-        except (requests.RequestException, json.JSONDecodeError, KeyError):
+    def get_user_info(self) -> Optional[Dict]:
+        """Get basic user information; None means auth isn't working."""
+        try:
+            return self.graphql({"user": CURRENT_USER_FIELD})["user"]
+        except GraphQLError:
             return None
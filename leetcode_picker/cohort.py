@@ -0,0 +1,196 @@
+"""Sync a cohort of LeetCode accounts against one shared problem catalog.
+
+AUTH_DIR holds one auth file per account (``alice.json``, ``bob.json``, in
+the format ``leetcode-picker auth`` writes). Each account keeps its own data
+directory, ``DATA_DIR/<name>/``, with its own problems.csv, submission
+history and derived indexes, written independently of the others.
+
+The study plans are scraped once into ``DATA_DIR/catalog.csv`` (when it's
+empty, or on request) and merged into every account's database, and question
+metadata looked up for one account is cached for all of them. Accounts sync
+in a thread pool; every GraphQL request goes through one RateLimiter, so the
+cohort as a whole stays under the rate limit however many workers run.
+"""
+
+import io
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, TextIO
+
+from .auth import LEETCODE_GRAPHQL_URL, LeetCodeAuth, RateLimiter
+from .metrics import REGISTRY, Metrics
+from .models import Problem
+from .storage import CATALOG_FILE_NAME, DEFAULT_COHORT_DIR, ProblemStorage
+from .sync import LeetCodeSync, QuestionCache
+
+# Each account's output from its last sync-all run, in its data directory
+LOG_FILE_NAME = "sync.log"
+
+DEFAULT_WORKERS = 4
+
+# GraphQL requests per second across all accounts
+DEFAULT_RATE = 2.0
+
+
+@dataclass
+class AccountResult:
+    """Outcome of one account's sync."""
+
+    name: str
+    ok: bool
+    seconds: float
+    # Result counts, or the failure reason when not ok
+    summary: str
+
+
+class _ThreadOutput:
+    """Stand-in for sys.stdout that gives each worker thread its own buffer.
+
+    Threads that aren't capturing write through to the real stream.
+    """
+
+    def __init__(self, stream: TextIO):
+        """Wrap the stream that uncaptured output goes to."""
+        self.stream = stream
+        self._local = threading.local()
+
+    def capture(self, buffer: Optional[io.StringIO]) -> None:
+        """Send this thread's output to ``buffer`` (None to stop)."""
+        self._local.buffer = buffer
+
+    def write(self, text: str) -> int:
+        """Write to this thread's buffer, or the real stream."""
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self) -> None:
+        """Flush the real stream."""
+        self.stream.flush()
+
+
+class CohortSync:
+    """Syncs every account in an auth directory, concurrently."""
+
+    def __init__(
+        self,
+        auth_dir: Path,
+        data_dir: Optional[Path] = None,
+        workers: int = DEFAULT_WORKERS,
+        rate: float = DEFAULT_RATE,
+        graphql_url: str = LEETCODE_GRAPHQL_URL,
+        metrics: Optional[Metrics] = None,
+    ):
+        """Set up the shared catalog, metadata cache and rate limiter."""
+        self.auth_dir = auth_dir
+        self.data_dir = data_dir or DEFAULT_COHORT_DIR
+        self.workers = workers
+        self.graphql_url = graphql_url
+        self.metrics = metrics or REGISTRY
+        self.rate_limiter = RateLimiter(rate)
+        self.catalog = ProblemStorage(self.data_dir / CATALOG_FILE_NAME, self.metrics)
+        self.question_cache = QuestionCache(self.data_dir / "question_cache.json")
+
+    def accounts(self) -> Dict[str, Path]:
+        """Auth file of each account, keyed by account name (the file stem)."""
+        return {path.stem: path for path in sorted(self.auth_dir.glob("*.json"))}
+
+    def ensure_catalog(self, refresh: bool = False, verbose: bool = False) -> int:
+        """Scrape the study plans into the catalog if needed; returns its size."""
+        if refresh or not self.catalog.load_problems():
+            from .scraper import LeetCodeScraper
+
+            print("Scraping study plans for the shared catalog...")
+            LeetCodeScraper(metrics=self.metrics).update_problem_database(
+                self.catalog, verbose=verbose
+            )
+        return len(self.catalog.load_problems())
+
+    def sync_account(
+        self,
+        name: str,
+        auth_file: Path,
+        fast: bool = False,
+        restart: bool = False,
+        on_synced: Optional[Callable[[ProblemStorage], None]] = None,
+    ) -> bool:
+        """Merge the catalog into one account's database and sync it."""
+        from .scraper import merge_catalog
+
+        catalog = list(self.catalog.load_problems().values())
+        storage = ProblemStorage(self.data_dir / name / "problems.csv", self.metrics)
+
+        def apply(problems: Dict[str, Problem]) -> bool:
+            merge_catalog(problems, catalog)
+            return bool(catalog)
+
+        storage.update(apply)
+
+        auth = LeetCodeAuth(
+            auth_file,
+            graphql_url=self.graphql_url,
+            metrics=self.metrics,
+            rate_limiter=self.rate_limiter,
+        )
+        sync = LeetCodeSync(auth, storage, self.metrics)
+        sync.question_cache = self.question_cache
+        ok = sync.sync_status_data() if fast else sync.sync_submission_data(restart)
+        if on_synced is not None:
+            on_synced(storage)
+        return ok
+
+    def run(
+        self,
+        fast: bool = False,
+        restart: bool = False,
+        on_synced: Optional[Callable[[ProblemStorage], None]] = None,
+    ) -> List[AccountResult]:
+        """Sync every account; each one's output goes to its sync.log."""
+        output = _ThreadOutput(sys.stdout)
+
+        def run_one(name: str, auth_file: Path) -> AccountResult:
+            buffer = io.StringIO()
+            output.capture(buffer)
+            start = time.perf_counter()
+            try:
+                ok = self.sync_account(name, auth_file, fast, restart, on_synced)
+            except Exception as e:
+                print(f"Error: {e}")
+                ok = False
+            finally:
+                output.capture(None)
+            seconds = time.perf_counter() - start
+
+            log = buffer.getvalue()
+            log_file = self.data_dir / name / LOG_FILE_NAME
+            log_file.parent.mkdir(parents=True, exist_ok=True)
+            log_file.write_text(log, encoding="utf-8")
+            lines = [line.strip() for line in log.splitlines() if line.strip()]
+            if ok:
+                # The counts printed under "✅ ... complete!"
+                done = max(
+                    (i for i, line in enumerate(lines) if line.startswith("✅")),
+                    default=len(lines) - 1,
+                )
+                summary = "; ".join(lines[done + 1 :]) or "\n".join(lines[-1:])
+            else:
+                summary = next(
+                    (line for line in reversed(lines) if line.startswith(("❌", "⚠"))),
+                    lines[-1] if lines else "failed",
+                )
+            return AccountResult(name, ok, seconds, summary)
+
+        accounts = self.accounts()
+        sys.stdout = output  # type: ignore[assignment]
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = [
+                    pool.submit(run_one, name, auth_file)
+                    for name, auth_file in accounts.items()
+                ]
+                return [future.result() for future in futures]
+        finally:
+            sys.stdout = output.stream
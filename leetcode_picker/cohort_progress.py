@@ -0,0 +1,184 @@
+"""Cohort progress: plan completion spread, problem solve rates, leaderboard.
+
+Every account's database under the cohort directory (see sync-all) is read
+one file at a time, streaming its rows, and reduced to a small summary: the
+per-plan and per-difficulty counters ``progress`` keeps, plus the URLs of the
+solved problems. Summaries are cached in ``cohort_progress.json`` keyed by
+each data file's fingerprint, so after one account syncs only that account's
+file is read again.
+"""
+
+import json
+import os
+import statistics
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .aggregates import compute, week_start
+from .metrics import REGISTRY, Metrics
+from .models import STUDY_PLANS, Problem
+from .storage import CATALOG_FILE_NAME, DEFAULT_COHORT_DIR, ProblemStorage
+
+CACHE_FILE_NAME = "cohort_progress.json"
+
+# Completion-percentage buckets of the per-plan distribution: (label, low, high)
+BUCKETS = [
+    ("0-24%", 0, 25),
+    ("25-49%", 25, 50),
+    ("50-74%", 50, 75),
+    ("75-99%", 75, 100),
+    ("100%", 100, 101),
+]
+
+# Per-account summary: counts (as in progress.json), solved URLs, completions
+Summary = Dict[str, Any]
+
+
+def summarize(problems: Iterable[Problem], week: str) -> Summary:
+    """Reduce one account's problems to its summary in a single pass."""
+    solved: List[str] = []
+    completions = 0
+
+    def track(problems: Iterable[Problem]) -> Iterator[Problem]:
+        nonlocal completions
+        for problem in problems:
+            if problem.is_completed:
+                solved.append(problem.url)
+                completions += problem.completions
+            yield problem
+
+    counts = compute(track(problems), week)
+    return {"counts": counts, "solved": solved, "completions": completions}
+
+
+def plan_percent(summary: Summary, plan: str) -> float:
+    """Share of a study plan an account has completed, in percent."""
+    row = summary["counts"]["plans"].get(plan, {})
+    total = row.get("total", 0)
+    return 100 * row.get("completed", 0) / total if total else 0.0
+
+
+class CohortProgress:
+    """Summaries of every account in a cohort directory, cached by fingerprint."""
+
+    def __init__(
+        self, data_dir: Optional[Path] = None, metrics: Optional[Metrics] = None
+    ):
+        """Use ``data_dir`` (default: the sync-all directory)."""
+        self.data_dir = data_dir or DEFAULT_COHORT_DIR
+        self.cache_file = self.data_dir / CACHE_FILE_NAME
+        self.metrics = metrics or REGISTRY
+        self.week = week_start()
+        # Accounts whose data file was read (not cached) by the last summaries()
+        self.reread: List[str] = []
+
+    def data_files(self) -> Dict[str, Path]:
+        """Each account's problems.csv, keyed by account name."""
+        if not self.data_dir.is_dir():
+            return {}
+        return {
+            path.name: path / "problems.csv"
+            for path in sorted(self.data_dir.iterdir())
+            if (path / "problems.csv").is_file()
+        }
+
+    def _read_cache(self) -> Dict[str, Summary]:
+        """Cached summaries, if they were computed this week."""
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data["week"] == self.week:
+                return data["accounts"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return {}
+
+    def _save(self, accounts: Dict[str, Summary]) -> None:
+        """Persist the summaries for the next run."""
+        tmp_file = self.cache_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"week": self.week, "accounts": accounts}, f)
+        os.replace(tmp_file, self.cache_file)
+
+    def summaries(self) -> Dict[str, Summary]:
+        """Every account's summary, reading only files that changed."""
+        cached = self._read_cache()
+        accounts: Dict[str, Summary] = {}
+        self.reread = []
+        for name, data_file in self.data_files().items():
+            storage = ProblemStorage(data_file, self.metrics)
+            # Taken before reading: a write in between only causes a re-read
+            fingerprint = list(storage.fingerprint())
+            entry = cached.get(name)
+            if entry is not None and entry.get("fingerprint") == fingerprint:
+                self.metrics.inc("cache_hits_total", cache="cohort")
+                accounts[name] = entry
+                continue
+            self.metrics.inc("cache_misses_total", cache="cohort")
+            self.reread.append(name)
+            accounts[name] = {
+                "fingerprint": fingerprint,
+                **summarize(storage.iter_problems(), self.week),
+            }
+        if self.reread or set(cached) != set(accounts):
+            self._save(accounts)
+        return accounts
+
+    def leaderboard(self, accounts: Dict[str, Summary]) -> List[Tuple[str, Summary]]:
+        """Accounts by problems solved, then solved this week."""
+        return sorted(
+            accounts.items(),
+            key=lambda item: (
+                -len(item[1]["solved"]),
+                -sum(
+                    row["completed_week"]
+                    for row in item[1]["counts"]["difficulties"].values()
+                ),
+                item[0],
+            ),
+        )
+
+    def plan_distribution(self, accounts: Dict[str, Summary]) -> Dict[str, List[float]]:
+        """Each study plan's completion percentage per account."""
+        return {
+            plan: [plan_percent(summary, plan) for summary in accounts.values()]
+            for plan in STUDY_PLANS
+        }
+
+    def solve_rates(self, accounts: Dict[str, Summary]) -> List[Tuple[str, str, int]]:
+        """(url, title, accounts that solved it), most solved first.
+
+        Covers the catalog's study plan problems (so unsolved ones show up)
+        and every problem someone solved; the catalog is streamed for titles.
+        """
+        solvers: Counter = Counter()
+        for summary in accounts.values():
+            solvers.update(summary["solved"])
+
+        titles: Dict[str, str] = {}
+        catalog_file = self.data_dir / CATALOG_FILE_NAME
+        if catalog_file.is_file():
+            for problem in ProblemStorage(catalog_file, self.metrics).iter_problems():
+                if problem.study_plan_urls or problem.url in solvers:
+                    titles[problem.url] = problem.title
+        for url in solvers:
+            titles.setdefault(url, url.rstrip("/").rsplit("/", 1)[-1])
+
+        return sorted(
+            ((url, title, solvers[url]) for url, title in titles.items()),
+            key=lambda row: (-row[2], row[1]),
+        )
+
+
+def describe_distribution(percents: List[float]) -> Tuple[str, str]:
+    """Summary line and bucket counts for one plan's completion percentages."""
+    summary = (
+        f"median {statistics.median(percents):.0f}%, "
+        f"min {min(percents):.0f}%, max {max(percents):.0f}%"
+    )
+    buckets = "  ".join(
+        f"{label}: {sum(low <= p < high for p in percents)}"
+        for label, low, high in BUCKETS
+    )
+    return summary, buckets
@@ -1,159 +1,290 @@
-"""CLI command implementations."""
-
-import random
-from collections import defaultdict
+"""CLI command implementations.
+
+Networking modules (auth, scraper, sync) are imported inside the commands that
+use them, so purely local commands don't pay for requests/bs4 at startup. So
+are the derived-data modules (aggregates, derived, scheduler, selection): each
+command loads only the ones it uses.
+"""
+
+import functools
+import sys
+import time
+from dataclasses import replace
 from datetime import datetime, timedelta
 from urllib.parse import urlparse
 from getpass import getpass
-from typing import Dict, Optional
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
 
-from .auth import LeetCodeAuth
-from .scraper import LeetCodeScraper, STUDY_PLANS
+from .models import STUDY_PLANS, Problem
+from .picking import DIFFICULTIES, quotas
 from .storage import ProblemStorage
-from .sync import LeetCodeSync
 
+if TYPE_CHECKING:
+    from .scraper import LeetCodeScraper
+
+
+@functools.cache
+def _scraper() -> "LeetCodeScraper":
+    """Shared scraper, so a long-lived process (daemon, shell) reuses its session."""
+    from .scraper import LeetCodeScraper
+
+    return LeetCodeScraper()
+
+
+def choose_problem(
+    difficulty: Optional[str],
+    study_plan: Optional[str],
+    seed: Optional[int] = None,
+    count: int = 1,
+    mix: Optional[Dict[str, int]] = None,
+) -> None:
+    """Choose random unsolved problems (no repeats until all have come up)."""
+    from .derived import selection_queues
+    from .selection import Selection
+
+    if not _valid_pick(difficulty, count, mix):
+        return
 
-def choose_problem(difficulty: Optional[str], study_plan: Optional[str]) -> None:
-    """Choose a random unsolved problem."""
     storage = ProblemStorage()
 
     # First ensure we have problems in the database
     _ensure_problems_loaded(storage)
 
-    # Get unsolved problems
-    problems = storage.get_unsolved_problems()
-
-    # Filter by difficulty if specified
-    if difficulty:
-        problems = [p for p in problems if p.effective_difficulty == difficulty]
-
-    # Filter by study plan if specified
-    if study_plan:
-        if study_plan not in ["leetcode-75", "top-interview-150", "grind75"]:
-            print(f"Unknown study plan: {study_plan}")
-            print("Available plans: leetcode-75, top-interview-150, grind75")
-            return
+    # Validate study plan if specified
+    if study_plan and study_plan not in ["leetcode-75", "top-interview-150", "grind75"]:
+        print(f"Unknown study plan: {study_plan}")
+        print("Available plans: leetcode-75, top-interview-150, grind75")
+        return
 
-        problems = [
-            p for p in problems if any(study_plan in url for url in p.study_plan_urls)
-        ]
-    else:
-        # Default: only show problems from main study plans
-        problems = [
-            p
-            for p in problems
-            if any(
-                plan in url for plan in STUDY_PLANS.values() for url in p.study_plan_urls
+    # Take the next problems from each filter's shuffle bag
+    problems = storage.load_problems()
+    picked: Set[str] = set()
+    chosen: List[Problem] = []
+    with storage.write_lock():
+        queues = selection_queues(storage)
+        for quota_difficulty, quota in quotas(difficulty, count, mix):
+            selection = Selection(
+                solved=False, difficulty=quota_difficulty, study_plan=study_plan
             )
-        ]
+            chosen += queues.pop_many(selection, problems, quota, seed, picked)
 
-    if not problems:
+    if not chosen:
         print("No unsolved problems found with the given criteria.")
         return
 
-    # Choose a random problem
-    chosen = random.choice(problems)
-
-    print(f"Selected problem: {chosen.title}")
-    print(f"Difficulty: {chosen.effective_difficulty}")
-    print(f"URL: {chosen.url}")
-    if chosen.overridden_difficulty:
-        print(f"Original difficulty: {chosen.difficulty} (overridden)")
-
+    for i, problem in enumerate(chosen):
+        if i:
+            print()
+        print(f"Selected problem: {problem.title}")
+        print(f"Difficulty: {problem.effective_difficulty}")
+        print(f"URL: {problem.url}")
+        if problem.overridden_difficulty:
+            print(f"Original difficulty: {problem.difficulty} (overridden)")
+    _report_shortfall(len(chosen), difficulty, count, mix)
+
+
+def review_problem(
+    weeks_ago: Optional[int],
+    difficulty: Optional[str],
+    seed: Optional[int] = None,
+    randomize: bool = False,
+    due: bool = False,
+    limit: Optional[int] = None,
+    count: int = 1,
+    mix: Optional[Dict[str, int]] = None,
+) -> None:
+    """Pick the most overdue solved problems (or random ones, or list what's due)."""
+    from .scheduler import ReviewIndex, days_overdue, due_date
+
+    if not _valid_pick(difficulty, count, mix):
+        return
 
-def review_problem(weeks_ago: Optional[int], difficulty: Optional[str]) -> None:
-    """Choose a random previously solved problem."""
     storage = ProblemStorage()
+    per_difficulty = quotas(difficulty, count, mix)
 
-    # Get completed problems
-    problems = storage.get_completed_problems()
+    if randomize or seed is not None:
+        from .derived import selection_queues
+        from .selection import Selection
 
-    # Filter by difficulty if specified
-    if difficulty:
-        problems = [p for p in problems if p.effective_difficulty == difficulty]
+        # Take the next problems from each filter's shuffle bag
+        problems = storage.load_problems()
+        picked: Set[str] = set()
+        chosen = []
+        with storage.write_lock():
+            queues = selection_queues(storage)
+            for quota_difficulty, quota in per_difficulty:
+                selection = Selection(
+                    solved=True, difficulty=quota_difficulty, weeks_ago=weeks_ago
+                )
+                chosen += queues.pop_many(selection, problems, quota, seed, picked)
+        if not chosen:
+            print("No completed problems found with the given criteria.")
+            return
+        for i, problem in enumerate(chosen):
+            if i:
+                print()
+            _print_review(problem, due_date(problem))
+        _report_shortfall(len(chosen), difficulty, count, mix)
+        return
 
-    # Filter by weeks ago if specified
+    cutoff = None
     if weeks_ago:
-        cutoff_date = (datetime.now() - timedelta(weeks=weeks_ago)).strftime("%Y-%m-%d")
-        problems = [
-            p for p in problems if p.last_pass_date and p.last_pass_date <= cutoff_date
-        ]
-
-    if not problems:
-        print("No completed problems found with the given criteria.")
-        return
+        cutoff = (datetime.now() - timedelta(weeks=weeks_ago)).strftime("%Y-%m-%d")
+
+    # Most overdue first; fill each difficulty's quota in one pass over the index
+    remaining = dict(per_difficulty)
+    wanted = sum(remaining.values())
+    index = ReviewIndex(storage)
+    today = datetime.now().strftime("%Y-%m-%d")
+    shown = 0
+    for next_due, problem in index.iter_due(until=today if due else None):
+        if cutoff and not (problem.last_pass_date and problem.last_pass_date <= cutoff):
+            continue
 
-    # Choose a random problem
-    chosen = random.choice(problems)
+        if due:
+            if difficulty and problem.effective_difficulty != difficulty:
+                continue
+            if shown == 0:
+                print("Due for review (most overdue first):")
+            overdue = days_overdue(next_due)
+            age = "undated" if overdue is None else f"{overdue}d overdue"
+            print(
+                f"  [{age}] {problem.title} ({problem.effective_difficulty}) {problem.url}"
+            )
+            shown += 1
+            if limit and shown >= limit:
+                break
+            continue
 
-    print(f"Review problem: {chosen.title}")
-    print(f"Difficulty: {chosen.effective_difficulty}")
-    print(f"URL: {chosen.url}")
-    print(f"Last completed: {chosen.last_pass_date}")
-    print(f"Completions: {chosen.completions}/{chosen.submissions}")
+        key = problem.effective_difficulty if mix else difficulty
+        if remaining.get(key, 0) <= 0:
+            continue
+        if key is not None and problem.effective_difficulty != key:
+            continue
+        remaining[key] -= 1
+        if shown:
+            print()
+        _print_review(problem, next_due)
+        shown += 1
+        if shown >= wanted:
+            break
+
+    if shown == 0:
+        if due:
+            print("Nothing is due for review.")
+        else:
+            print("No completed problems found with the given criteria.")
+    elif not due:
+        _report_shortfall(shown, difficulty, count, mix)
+
+
+def _valid_pick(
+    difficulty: Optional[str], count: int, mix: Optional[Dict[str, int]]
+) -> bool:
+    """Check that --count/--difficulty and --mix weren't combined."""
+    if count < 1:
+        print("--count must be at least 1.")
+        return False
+    if mix and (difficulty or count != 1):
+        print("Use either --mix or --difficulty/--count, not both.")
+        return False
+    return True
+
+
+def _report_shortfall(
+    found: int, difficulty: Optional[str], count: int, mix: Optional[Dict[str, int]]
+) -> None:
+    """Say so when fewer problems matched than were asked for."""
+    wanted = sum(n for _, n in quotas(difficulty, count, mix))
+    if found < wanted:
+        print(f"\nOnly {found} of {wanted} requested problems matched the criteria.")
+
+
+def _print_review(problem: Problem, next_due: str) -> None:
+    """Print a problem picked for review with its schedule."""
+    from .scheduler import days_overdue
+
+    print(f"Review problem: {problem.title}")
+    print(f"Difficulty: {problem.effective_difficulty}")
+    print(f"URL: {problem.url}")
+    print(f"Last completed: {problem.last_pass_date}")
+    print(f"Completions: {problem.completions}/{problem.submissions}")
+    overdue = days_overdue(next_due)
+    if overdue is None:
+        print("Due: now (completion date unknown)")
+    elif overdue >= 0:
+        print(f"Due: {next_due} ({overdue} days overdue)")
+    else:
+        print(f"Due: {next_due} (in {-overdue} days)")
 
 
 def override_difficulty(url: str, difficulty: str) -> None:
     """Override difficulty level for a problem."""
+    from .aggregates import ProgressAggregates
+    from .derived import after_update
+
     storage = ProblemStorage()
+    aggregates = ProgressAggregates(storage)
+    problem, candidates = _find_problem(storage, storage.load_problems(), url, {})
 
-    # Normalize incoming URL to canonical LeetCode problem URL
-    canonical = _canonical_leetcode_problem_url(url) or url.rstrip("/")
+    if not problem:
+        _print_not_found(url, candidates)
+        return
 
-    # Try exact and trailing-slash variations
-    problem = storage.get_problem(canonical) or storage.get_problem(canonical.rstrip("/"))
-    if not problem and canonical.endswith("/"):
-        problem = storage.get_problem(canonical[:-1])
+    url = problem.url
+    changes: List[Tuple[Problem, Problem]] = []
 
-    # Fallback: match by slug across all stored problems
-    if not problem:
-        problems = storage.load_problems()
-        target = _canonical_leetcode_problem_url(url)
-        if target:
-            for p in problems.values():
-                if _canonical_leetcode_problem_url(p.url) == target:
-                    problem = p
-                    break
+    def apply(problems: Dict[str, Problem]) -> bool:
+        changes.clear()
+        problem = problems.get(url)
+        if problem is None:
+            return False
+        changes.append((replace(problem), problem))
+        problem.overridden_difficulty = difficulty
+        return True
 
-    if not problem:
+    if not storage.update(apply):
         print(f"Problem not found: {url}")
-        print("Make sure the URL is correct and the problem is in the database.")
         return
-
-    old_difficulty = problem.effective_difficulty
-    problem.overridden_difficulty = difficulty
-    storage.add_or_update_problem(problem)
+    before, problem = changes[0]
+    after_update(storage, changes, None, aggregates)
 
     print(f"Updated difficulty for {problem.title}")
-    print(f"  {old_difficulty} → {difficulty}")
+    print(f"  {before.effective_difficulty} → {difficulty}")
 
 
-def show_progress() -> None:
-    """Show progress on study plans."""
+def show_progress(verify: bool = False) -> None:
+    """Show progress on study plans (from the stored counters)."""
+    from .aggregates import OUTSIDE_PLANS, ProgressAggregates
+
     storage = ProblemStorage()
+    aggregates = ProgressAggregates(storage)
 
     # First ensure we have problems in the database
-    _ensure_problems_loaded(storage)
+    if not any(row["total"] for row in aggregates.counts["difficulties"].values()):
+        _ensure_problems_loaded(storage)
+        aggregates = ProgressAggregates(storage)
 
-    # Get all problems grouped by study plan
-    plan_stats: Dict[str, Dict[str, int]] = defaultdict(
-        lambda: {"total": 0, "completed": 0}
-    )
-
-    problems = storage.load_problems()
+    if verify:
+        if aggregates.recounted:
+            print("Stored counters were out of date and have been recounted.")
+        else:
+            drift = aggregates.verify()
+            if drift:
+                print("Stored counters had drifted (now corrected):")
+                for line in drift:
+                    print(f"  {line}")
+            else:
+                print("Stored counters match a full recount.")
+        print()
 
-    for problem in problems.values():
-        # Check which study plans this problem belongs to (can be multiple)
-        for plan_name, plan_url in STUDY_PLANS.items():
-            if any(plan_url in url for url in problem.study_plan_urls):
-                plan_stats[plan_name]["total"] += 1
-                if problem.is_completed:
-                    plan_stats[plan_name]["completed"] += 1
+    counts = aggregates.counts
 
     print("Study Plan Progress:")
     print("=" * 50)
 
-    for plan_name, stats in plan_stats.items():
+    for plan_name, stats in counts["plans"].items():
         if stats["total"] == 0:
             continue
 
@@ -166,13 +297,87 @@ def show_progress() -> None:
         print(f"  Remaining: {total - completed}")
         print()
 
+    outside_completed = counts.get(OUTSIDE_PLANS, {}).get("all", {}).get("completed", 0)
+    if outside_completed:
+        print(f"Outside study plans: {outside_completed} solved")
+
+    print("By difficulty:")
+    completed_week = 0
+    for level, row in counts["difficulties"].items():
+        completed_week += row["completed_week"]
+        if row["total"] == 0:
+            continue
+        percentage = row["completed"] / row["total"] * 100
+        print(f"  {level}: {row['completed']}/{row['total']} ({percentage:.1f}%)")
+    print(f"Completed this week: {completed_week}")
+
+
+def show_stats(weeks: int) -> None:
+    """Solve velocity, difficulty mix, submissions per solve and stale problems."""
+    from .stats import SolveStats, day_date
+
+    if weeks < 1:
+        print("--weeks must be at least 1.")
+        return
+
+    stats = SolveStats()
+    totals = stats.totals()
+    headers = "".join(f"{d.capitalize():>8}" for d in DIFFICULTIES)
+
+    if stats.has_history:
+        since = day_date(totals["first_day"]).isoformat()
+        print(f"From {totals['submissions']} submissions since {since}.")
+    else:
+        print("No synced submission history: weeks below count each solved problem")
+        print("once, at its last pass date. Run 'leetcode-picker sync' for more.")
+    print()
+
+    rows = stats.weekly(weeks)
+    print(f"Solves per week (last {weeks} weeks):")
+    if stats.has_history:
+        print(f"  {'Week of':<12}{'Solved':>8}{'New':>8}{headers}{'Submits':>9}")
+    else:
+        print(f"  {'Week of':<12}{'Solved':>8}{headers}")
+    for row in rows:
+        line = f"  {row['week']:<12}{row['solved']:>8}"
+        if stats.has_history:
+            line += f"{row['new']:>8}"
+        line += "".join(f"{n:>8}" for n in row["mix"])
+        if stats.has_history:
+            line += f"{row['submissions']:>9}"
+        print(line)
+    solved = sum(row["solved"] for row in rows)
+    mix = [sum(row["mix"][i] for row in rows) for i in range(len(DIFFICULTIES))]
+    known = sum(mix)
+    shares = ", ".join(
+        f"{d} {100 * n / known:.0f}%" for d, n in zip(DIFFICULTIES, mix) if known
+    )
+    print(
+        f"  Average: {solved / weeks:.1f} solved per week"
+        + (f" ({shares})" if shares else "")
+    )
+    print()
+
+    print("Submissions per accepted solution:")
+    for difficulty, (submitted, accepted) in stats.submissions_per_completion().items():
+        if accepted:
+            print(f"  {difficulty}: {submitted / accepted:.2f} ({submitted}/{accepted})")
+    print()
+
+    print(f"Solved problems not solved again since ({totals['solved']} solved):")
+    print(f"  {'':<12}{headers}")
+    for label, counts in stats.stale():
+        label = label if label == "undated" else f"{label}+ days"
+        print(f"  {label:<12}" + "".join(f"{n:>8}" for n in counts))
+
 
 def show_progress_verbose(study_plan: Optional[str] = None) -> None:
     """Verbose checklist view for all or a specific study plan."""
     storage = ProblemStorage()
     _ensure_problems_loaded(storage)
     problems = storage.load_problems()
-    scraper = LeetCodeScraper()
+
+    scraper = _scraper()
 
     if study_plan:
         if study_plan not in STUDY_PLANS:
@@ -219,7 +424,7 @@ def list_grind75_completed_titles() -> None:
     _ensure_problems_loaded(storage)
     problems = storage.load_problems()
 
-    scraper = LeetCodeScraper()
+    scraper = _scraper()
     try:
         grind_problems = scraper.scrape_grind75()
     except Exception as exc:  # pragma: no cover
@@ -253,59 +458,203 @@ def _canonical_leetcode_problem_url(url: str) -> Optional[str]:
     return None
 
 
-def mark_complete(url: str, date: Optional[str]) -> None:
-    """Mark a problem as completed."""
-    storage = ProblemStorage()
+def _find_problem(
+    storage: ProblemStorage,
+    problems: Dict[str, Problem],
+    query: str,
+    by_slug: Dict[str, Problem],
+) -> Tuple[Optional[Problem], List[Problem]]:
+    """Find a stored problem from any variant of its URL, its slug, or by title.
+
+    Returns the problem and, when a title matches several problems equally
+    well, the candidates instead. ``by_slug`` maps canonical URLs to problems;
+    it is filled on the first lookup that needs it, so callers resolving many
+    URLs can share it.
+    """
+    if "/" not in query:
+        # A bare slug ("two-sum"), as offered by shell completion, or a title
+        problem = problems.get(f"https://leetcode.com/problems/{query}/")
+        if problem:
+            return problem, []
+        return _find_by_title(storage, problems, query)
 
     # Normalize incoming URL to canonical LeetCode problem URL
-    canonical = _canonical_leetcode_problem_url(url) or url.rstrip("/")
+    canonical = _canonical_leetcode_problem_url(query) or query.rstrip("/")
 
     # Try exact and trailing-slash variations
-    problem = storage.get_problem(canonical) or storage.get_problem(canonical.rstrip("/"))
+    problem = problems.get(canonical) or problems.get(canonical.rstrip("/"))
     if not problem and canonical.endswith("/"):
-        problem = storage.get_problem(canonical[:-1])
+        problem = problems.get(canonical[:-1])
 
     # Fallback: match by slug across all stored problems
     if not problem:
-        problems = storage.load_problems()
-        target = _canonical_leetcode_problem_url(url)
+        target = _canonical_leetcode_problem_url(query)
         if target:
-            for p in problems.values():
-                if _canonical_leetcode_problem_url(p.url) == target:
-                    problem = p
-                    break
-
-    if not problem:
-        print(f"Problem not found: {url}")
-        print("Make sure the URL is correct and the problem is in the database.")
+            if not by_slug:
+                for p in problems.values():
+                    by_slug.setdefault(_canonical_leetcode_problem_url(p.url) or p.url, p)
+            problem = by_slug.get(target)
+
+    return problem, []
+
+
+def _find_by_title(
+    storage: ProblemStorage, problems: Dict[str, Problem], query: str
+) -> Tuple[Optional[Problem], List[Problem]]:
+    """Fuzzy-match a (partial or misspelled) title via the trigram index."""
+    from .search import TitleIndex, best_match
+
+    matches = TitleIndex.for_storage(storage).search(query)
+    url = best_match(matches)
+    if url and url in problems:
+        return problems[url], []
+    return None, [problems[u] for _, u in matches if u in problems]
+
+
+def _print_not_found(query: str, candidates: List[Problem]) -> None:
+    """Explain a failed lookup, listing close title matches if there are any."""
+    if candidates:
+        print(f"'{query}' matches several problems:")
+        for p in candidates:
+            print(f"  {p.title} ({p.url})")
+        print("Use more of the title or the problem URL.")
+        return
+    print(f"Problem not found: {query}")
+    print("Make sure the URL or title is correct and the problem is in the database.")
+
+
+def _completion_items(
+    urls: List[str], date: Optional[str]
+) -> List[Tuple[str, Optional[str]]]:
+    """Expand arguments into (url, date) pairs; ``-`` reads ``url[,date]`` lines."""
+    items: List[Tuple[str, Optional[str]]] = []
+    for url in urls:
+        if url != "-":
+            items.append((url, date))
+            continue
+        for line in sys.stdin:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            line_url, _, line_date = line.partition(",")
+            items.append((line_url.strip(), line_date.strip() or date))
+    return items
+
+
+def mark_complete(urls: List[str], date: Optional[str]) -> None:
+    """Mark problems as completed (one load and one write for the whole batch)."""
+    from .aggregates import ProgressAggregates
+    from .derived import after_update
+    from .scheduler import ReviewIndex
+
+    items = _completion_items(urls, date)
+    if not items:
+        print("No problems given.")
         return
 
-    # Validate date format if provided
-    if date:
-        try:
-            datetime.strptime(date, "%Y-%m-%d")
-        except ValueError:
-            print("Invalid date format. Please use YYYY-MM-DD.")
-            return
+    storage = ProblemStorage()
+    problems = storage.load_problems()
+    by_slug: Dict[str, Problem] = {}
+    index = ReviewIndex(storage)
+    aggregates = ProgressAggregates(storage)
+    single = len(items) == 1
+
+    # Resolve and validate every item first; the completions are then applied
+    # in one update, which may have to run again on newer data
+    targets: List[Tuple[int, str, Optional[str]]] = []
+    outcomes: Dict[int, Tuple[str, List[str]]] = {}
+    for i, (url, item_date) in enumerate(items):
+        problem, candidates = _find_problem(storage, problems, url, by_slug)
+        if not problem:
+            if single:
+                _print_not_found(url, candidates)
+                outcomes[i] = ("failed", [])
+            elif candidates:
+                outcomes[i] = (
+                    "failed",
+                    [f"✗ {url}: ambiguous ({len(candidates)} close titles)"],
+                )
+            else:
+                outcomes[i] = ("failed", [f"✗ {url}: not found"])
+            continue
 
-    # Idempotency: do nothing if already marked complete for this date
-    effective_date = date or datetime.now().strftime("%Y-%m-%d")
-    if problem.last_pass_date == effective_date:
-        print(f"Already marked {problem.title} complete for {effective_date}")
-        print(f"  Completions: {problem.completions} → {problem.completions}")
-        return
+        # Validate date format if provided
+        if item_date:
+            try:
+                datetime.strptime(item_date, "%Y-%m-%d")
+            except ValueError:
+                if single:
+                    message = "Invalid date format. Please use YYYY-MM-DD."
+                else:
+                    message = f"✗ {url}: invalid date '{item_date}' (use YYYY-MM-DD)"
+                outcomes[i] = ("failed", [message])
+                continue
+        targets.append((i, problem.url, item_date))
+
+    # State of each changed problem before the batch, for the derived data
+    originals: Dict[str, Problem] = {}
+
+    def apply(problems: Dict[str, Problem]) -> bool:
+        originals.clear()
+        for i, url, item_date in targets:
+            problem = problems.get(url)
+            if problem is None:
+                outcomes[i] = ("failed", [f"✗ {url}: removed by another process"])
+                continue
+
+            # Idempotency: do nothing if already marked complete for this date
+            effective_date = item_date or datetime.now().strftime("%Y-%m-%d")
+            if problem.last_pass_date == effective_date:
+                if single:
+                    lines = [
+                        f"Already marked {problem.title} complete for {effective_date}",
+                        f"  Completions: {problem.completions} → {problem.completions}",
+                    ]
+                else:
+                    lines = [f"= {problem.title}: already complete for {effective_date}"]
+                outcomes[i] = ("skipped", lines)
+                continue
+
+            originals.setdefault(problem.url, replace(problem))
+            old_completions = problem.completions
+            problem.mark_completed(item_date)
+            if single:
+                lines = [
+                    f"Marked {problem.title} as completed",
+                    f"  Date: {problem.last_pass_date}",
+                    f"  Completions: {old_completions} → {problem.completions}",
+                ]
+            else:
+                lines = [
+                    f"✓ {problem.title}: {problem.last_pass_date}, "
+                    f"completions {old_completions} → {problem.completions}"
+                ]
+            outcomes[i] = ("marked", lines)
+        return bool(originals)
+
+    if storage.update(apply):
+        problems = storage.load_problems()
+        changes = [(before, problems[url]) for url, before in originals.items()]
+        after_update(storage, changes, index, aggregates)
 
-    old_completions = problem.completions
-    problem.mark_completed(date)
-    storage.add_or_update_problem(problem)
+    tally = {"marked": 0, "skipped": 0, "failed": 0}
+    for i in range(len(items)):
+        outcome, lines = outcomes[i]
+        tally[outcome] += 1
+        for line in lines:
+            print(line)
 
-    print(f"Marked {problem.title} as completed")
-    print(f"  Date: {problem.last_pass_date}")
-    print(f"  Completions: {old_completions} → {problem.completions}")
+    if not single:
+        print(
+            f"\nMarked {tally['marked']}, already complete {tally['skipped']}, "
+            f"failed {tally['failed']}"
+        )
 
 
 def setup_auth() -> None:
     """Set up LeetCode authentication by guiding user through cookie extraction."""
+    from .auth import LeetCodeAuth
+
     auth = LeetCodeAuth()
 
     print("🔐 LeetCode Authentication Setup")
@@ -345,53 +694,187 @@ def setup_auth() -> None:
     auth.save_cookies(session_cookie, csrf_token)
     print(f"✅ Cookies saved to {auth.auth_file}")
 
-    # Test authentication
+    # Test authentication (one request also fetches the user info)
     print("\n🔍 Testing authentication...")
-    if auth.test_authentication():
-        user_info = auth.get_user_info()
-        if user_info:
-            username = user_info.get("username", "Unknown")
-            first_name = user_info.get("firstName", "")
-            last_name = user_info.get("lastName", "")
-            full_name = f"{first_name} {last_name}".strip()
-
-            print("✅ Authentication successful!")
-            print(f"   User: {username}")
-            if full_name:
-                print(f"   Name: {full_name}")
-
-            # Show profile info if available
-            profile = user_info.get("profile", {})
-            if profile and profile.get("ranking"):
-                print(f"   Ranking: {profile['ranking']}")
-        else:
-            print("✅ Authentication working, but couldn't fetch user info.")
+    user_info = auth.get_user_info()
+    if user_info:
+        username = user_info.get("username", "Unknown")
+        first_name = user_info.get("firstName", "")
+        last_name = user_info.get("lastName", "")
+        full_name = f"{first_name} {last_name}".strip()
+
+        print("✅ Authentication successful!")
+        print(f"   User: {username}")
+        if full_name:
+            print(f"   Name: {full_name}")
+
+        # Show profile info if available
+        profile = user_info.get("profile", {})
+        if profile and profile.get("ranking"):
+            print(f"   Ranking: {profile['ranking']}")
     else:
         print("❌ Authentication failed. Please check your cookies and try again.")
         print("   Make sure you're logged into LeetCode and the cookies are correct.")
 
 
-def sync_submissions() -> None:
-    """Sync submission history from LeetCode."""
+def sync_submissions(fast: bool = False, restart: bool = False) -> bool:
+    """Sync submission history (or just solved/attempted status) from LeetCode.
+
+    Returns whether the sync completed.
+    """
+    from .derived import after_bulk_update
+    from .sync import LeetCodeSync
+
     sync = LeetCodeSync()
-    sync.sync_submission_data()
+    if fast:
+        ok = sync.sync_status_data()
+    else:
+        ok = sync.sync_submission_data(restart=restart)
+    # A sync that didn't complete hasn't written anything
+    if ok:
+        after_bulk_update(sync.storage)
+    return ok
+
+
+def sync_all(
+    auth_dir: Path,
+    data_dir: Optional[Path],
+    workers: int,
+    rate: float,
+    fast: bool = False,
+    restart: bool = False,
+    refresh: bool = False,
+) -> int:
+    """Sync every account in ``auth_dir`` concurrently; returns the failure count."""
+    from .cohort import CohortSync
+    from .derived import after_bulk_update
+
+    cohort = CohortSync(auth_dir, data_dir, workers, rate)
+    accounts = cohort.accounts()
+    if not accounts:
+        print(f"No auth files (*.json) found in {auth_dir}")
+        return 1
+
+    size = cohort.ensure_catalog(refresh)
+    print(
+        f"🔄 Syncing {len(accounts)} accounts ({workers} at a time, "
+        f"{rate:g} requests/s) against a {size}-problem catalog..."
+    )
+    start = time.perf_counter()
+    results = cohort.run(fast, restart, on_synced=after_bulk_update)
+    elapsed = time.perf_counter() - start
+
+    width = max(len(result.name) for result in results)
+    for result in results:
+        mark = "✓" if result.ok else "✗"
+        print(f"{mark} {result.name:<{width}} {result.seconds:>7.1f}s  {result.summary}")
+    failed = sum(not result.ok for result in results)
+    print(
+        f"\nSynced {len(results) - failed} of {len(results)} accounts "
+        f"in {elapsed:.1f}s; logs in {cohort.data_dir}/<account>/sync.log"
+    )
+    return failed
+
+
+def cohort_progress(data_dir: Optional[Path], top: int, problems: int) -> None:
+    """Show plan completion, problem solve rates and a leaderboard for a cohort."""
+    from .cohort_progress import CohortProgress, describe_distribution
+
+    cohort = CohortProgress(data_dir)
+    accounts = cohort.summaries()
+    if not accounts:
+        print(f"No account databases found in {cohort.data_dir}")
+        print("Run 'leetcode-picker sync-all AUTH_DIR' first.")
+        return
+
+    n = len(accounts)
+    print(
+        f"📊 Cohort progress: {n} accounts "
+        f"({len(cohort.reread)} read, {n - len(cohort.reread)} cached)"
+    )
+
+    print("\nLeaderboard (problems solved):")
+    width = max(len(name) for name in accounts)
+    for rank, (name, summary) in enumerate(cohort.leaderboard(accounts)[:top], 1):
+        week = sum(
+            row["completed_week"] for row in summary["counts"]["difficulties"].values()
+        )
+        print(
+            f"  {rank:>3}. {name:<{width}}  {len(summary['solved']):>5} solved  "
+            f"{week:>3} this week  {summary['completions']:>5} completions"
+        )
+
+    print("\nStudy plan completion across accounts:")
+    for plan, percents in cohort.plan_distribution(accounts).items():
+        total = max(s["counts"]["plans"][plan]["total"] for s in accounts.values())
+        if not total:
+            continue
+        summary_line, buckets = describe_distribution(percents)
+        print(f"  {plan} ({total} problems): {summary_line}")
+        print(f"    {buckets}")
+
+    rates = cohort.solve_rates(accounts)
+    if rates and problems:
+        print("\nMost solved problems:")
+        for url, title, solvers in rates[:problems]:
+            print(f"  {solvers:>3}/{n} ({solvers / n:4.0%})  {title}")
+        print("\nLeast solved problems:")
+        for url, title, solvers in rates[::-1][:problems]:
+            print(f"  {solvers:>3}/{n} ({solvers / n:4.0%})  {title}")
+
+
+def export_data(submissions: bool = True) -> None:
+    """Stream the database (and submission history) to stdout as NDJSON."""
+    from .transfer import export_ndjson
+
+    n_problems, n_submissions = export_ndjson(ProblemStorage(), sys.stdout, submissions)
+    sys.stdout.flush()
+    print(
+        f"Exported {n_problems} problems and {n_submissions} submissions.",
+        file=sys.stderr,
+    )
+
+
+def import_data(path: str, replace_all: bool = False) -> None:
+    """Merge an NDJSON export (a file, or '-' for stdin) into the database."""
+    from .derived import after_bulk_update
+    from .transfer import ImportSource, import_ndjson
+
+    storage = ProblemStorage()
+    source = ImportSource(None if path == "-" else Path(path))
+    counts = import_ndjson(storage, source, replace_all)
+    if counts["added"] or counts["updated"] or counts["removed"]:
+        after_bulk_update(storage)
+
+    print("✅ Import complete!")
+    print(f"   Added {counts['added']} new problems")
+    print(f"   Updated {counts['updated']} problems ({counts['unchanged']} unchanged)")
+    if replace_all:
+        print(f"   Removed {counts['removed']} problems not in the export")
+    print(f"   Added {counts['submissions']} submissions to the history")
 
 
 def refresh_problems(verbose: bool = False) -> None:
     """Force re-scrape of all study plans and update the database."""
+    from .derived import after_bulk_update
+
     storage = ProblemStorage()
     print("Refreshing study plans (re-scrape)...")
-    scraper = LeetCodeScraper()
+    scraper = _scraper()
     scraper.update_problem_database(storage, verbose=verbose)
+    after_bulk_update(storage)
     print("Refresh complete.")
 
 
 def _ensure_problems_loaded(storage: ProblemStorage) -> None:
     """Ensure the problem database has data, scrape if needed."""
+    from .derived import after_bulk_update
+
     problems = storage.load_problems()
 
     if not problems:
         print("No problems found in database. Scraping study plans...")
-        scraper = LeetCodeScraper()
+        scraper = _scraper()
         scraper.update_problem_database(storage)
+        after_bulk_update(storage)
         print("Problem database updated!")
@@ -0,0 +1,225 @@
+"""Shell completion scripts for bash, zsh and fish.
+
+The scripts are generated once from the CLI parser, so subcommands, options,
+difficulty levels and study plan names are baked in. Problem slugs change, so
+the scripts read them at completion time from the candidates file the storage
+layer writes on every save (``~/.leetcode-picker/completions.txt``). Nothing
+imports Python or parses the CSV per keypress.
+"""
+
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+from .models import STUDY_PLANS
+from .storage import COMPLETION_FILE_NAME, DEFAULT_DATA_FILE
+
+# Subcommands whose first positional argument is a problem
+PROBLEM_COMMANDS = ["mark-complete", "override-difficulty"]
+
+# Options whose values are study plan names
+PLAN_OPTIONS = ["--study-plan"]
+
+PROG = "leetcode-picker"
+
+
+def _completion_file() -> str:
+    """Candidates file path, written relative to $HOME for the scripts."""
+    return f"$HOME/{DEFAULT_DATA_FILE.parent.name}/{COMPLETION_FILE_NAME}"
+
+
+def _describe(
+    parser: argparse.ArgumentParser,
+) -> Dict[str, Tuple[str, List[str], Dict[str, List[str]], List[str]]]:
+    """Per subcommand: (help, option strings, option -> values, positional values).
+
+    Options that take a value appear in the values map, with an empty list
+    when the value can't be completed.
+    """
+    commands = {}
+    for action in parser._actions:
+        if not isinstance(action, argparse._SubParsersAction):
+            continue
+        helps = {a.dest: a.help or "" for a in action._choices_actions}
+        for name, subparser in action.choices.items():
+            options: List[str] = []
+            values: Dict[str, List[str]] = {}
+            positional: List[str] = []
+            for sub_action in subparser._actions:
+                if sub_action.option_strings:
+                    options += sub_action.option_strings
+                    long_option = sub_action.option_strings[-1]
+                    if sub_action.choices:
+                        values[long_option] = [str(c) for c in sub_action.choices]
+                    elif long_option in PLAN_OPTIONS:
+                        values[long_option] = list(STUDY_PLANS)
+                    elif sub_action.nargs != 0:
+                        values[long_option] = []  # takes a value we can't complete
+                elif sub_action.choices:
+                    positional += [str(c) for c in sub_action.choices]
+            commands[name] = (helps.get(name, ""), options, values, positional)
+    return commands
+
+
+def _global_options(parser: argparse.ArgumentParser) -> Tuple[List[str], List[str]]:
+    """Options given before the subcommand: (all of them, those taking a value)."""
+    options: List[str] = []
+    with_values: List[str] = []
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            continue
+        options += action.option_strings
+        if action.nargs != 0:
+            with_values += action.option_strings
+    return options, with_values
+
+
+def _bash(parser: argparse.ArgumentParser) -> str:
+    """Bash completion function (also used by zsh through bashcompinit)."""
+    commands = _describe(parser)
+    value_cases = []
+    option_cases = []
+    positional_cases = []
+    seen_options = set()
+    for name, (_, options, values, positional) in commands.items():
+        option_cases.append(f'        {name}) opts="{" ".join(options)}" ;;')
+        for option, choices in values.items():
+            if option in seen_options:
+                continue
+            seen_options.add(option)
+            if not choices:
+                value_cases.append(f"        {option}) return ;;")
+            else:
+                value_cases.append(
+                    f'        {option}) COMPREPLY=($(compgen -W "{" ".join(choices)}" '
+                    '-- "$cur")); return ;;'
+                )
+        if positional:
+            positional_cases.append(
+                f'        {name}) COMPREPLY=($(compgen -W "{" ".join(positional)}" '
+                '-- "$cur")) ;;'
+            )
+
+    difficulties = " ".join(commands["override-difficulty"][3])
+    global_options, global_values = _global_options(parser)
+    global_value_pattern = "|".join(global_values)
+    return f"""# {PROG} completion for bash; add to ~/.bashrc:
+#   eval "$({PROG} completion bash)"
+_leetcode_picker() {{
+    local cur="${{COMP_WORDS[COMP_CWORD]}}"
+    local prev="${{COMP_WORDS[COMP_CWORD-1]}}"
+    local candidates="{_completion_file()}"
+    local cmd="" cmd_index=0 opts="" i
+    COMPREPLY=()
+
+    # The subcommand is the first word that isn't a global option or its value
+    # (bash splits words at "=", so --option=name=value spans five)
+    for ((i = 1; i < COMP_CWORD; i++)); do
+        case "${{COMP_WORDS[i]}}" in
+            {global_value_pattern})
+                [[ "${{COMP_WORDS[i+1]}}" == "=" ]] && ((i++))
+                ((i++))
+                while [[ "${{COMP_WORDS[i+1]}}" == "=" ]]; do ((i += 2)); done ;;
+            -*|=) ;;
+            *) cmd="${{COMP_WORDS[i]}}"; cmd_index=$i; break ;;
+        esac
+    done
+
+    if [[ -z "$cmd" ]]; then
+        case "$prev" in
+            {global_value_pattern}|=) return ;;
+        esac
+        COMPREPLY=($(compgen -W "{" ".join(commands)} {" ".join(global_options)}" -- "$cur"))
+        return
+    fi
+
+    case "$prev" in
+{chr(10).join(value_cases)}
+    esac
+
+    case "$cmd" in
+{chr(10).join(option_cases)}
+    esac
+    if [[ "$cur" == -* ]]; then
+        COMPREPLY=($(compgen -W "$opts" -- "$cur"))
+        return
+    fi
+
+    case "$cmd" in
+        mark-complete)
+            [[ -r "$candidates" ]] && COMPREPLY=($(compgen -W "$(< "$candidates")" -- "$cur")) ;;
+        override-difficulty)
+            if [[ $COMP_CWORD -eq $((cmd_index + 1)) ]]; then
+                [[ -r "$candidates" ]] && COMPREPLY=($(compgen -W "$(< "$candidates")" -- "$cur"))
+            else
+                COMPREPLY=($(compgen -W "{difficulties}" -- "$cur"))
+            fi ;;
+{chr(10).join(c for c in positional_cases if not c.strip().startswith("override-"))}
+    esac
+}}
+complete -F _leetcode_picker {PROG}
+"""
+
+
+def _zsh(parser: argparse.ArgumentParser) -> str:
+    """Zsh completion, reusing the bash function through bashcompinit."""
+    return (
+        f"# {PROG} completion for zsh; add to ~/.zshrc:\n"
+        f'#   eval "$({PROG} completion zsh)"\n'
+        "autoload -U +X compinit && compinit\n"
+        "autoload -U +X bashcompinit && bashcompinit\n"
+        + "\n".join(_bash(parser).splitlines()[2:])
+        + "\n"
+    )
+
+
+def _fish(parser: argparse.ArgumentParser) -> str:
+    """Fish completion as `complete` declarations."""
+    commands = _describe(parser)
+    lines = [
+        f"# {PROG} completion for fish; save as",
+        f"#   ~/.config/fish/completions/{PROG}.fish",
+        f"complete -c {PROG} -f",
+    ]
+    global_options, global_values = _global_options(parser)
+    for option in global_options:
+        if option.startswith("--") and option != "--help":
+            extra = " -r" if option in global_values else ""
+            lines.append(
+                f"complete -c {PROG} -n __fish_use_subcommand -l {option[2:]}{extra}"
+            )
+    for name, (help_text, options, values, positional) in commands.items():
+        description = help_text.replace("'", "\\'")
+        lines.append(
+            f"complete -c {PROG} -n __fish_use_subcommand -a {name} -d '{description}'"
+        )
+        seen = f"'__fish_seen_subcommand_from {name}'"
+        for option in options:
+            if option in ("-h", "--help"):
+                continue
+            flag = f"-l {option[2:]}" if option.startswith("--") else f"-s {option[1:]}"
+            choices = values.get(option)
+            extra = ""
+            if choices:
+                extra = f" -xa '{' '.join(choices)}'"
+            elif choices is not None:
+                extra = " -x"
+            lines.append(f"complete -c {PROG} -n {seen} {flag}{extra}")
+        if name in PROBLEM_COMMANDS:
+            lines.append(
+                f"complete -c {PROG} -n {seen} "
+                f"-a '(cat \"{_completion_file()}\" 2>/dev/null)'"
+            )
+        if positional:
+            lines.append(f"complete -c {PROG} -n {seen} -a '{' '.join(positional)}'")
+    return "\n".join(lines) + "\n"
+
+
+def completion_script(
+    shell: str, parser: Optional[argparse.ArgumentParser] = None
+) -> str:
+    """Completion script for ``shell`` (bash, zsh or fish)."""
+    if parser is None:
+        from .main import create_parser
+
+        parser = create_parser()
+    return {"bash": _bash, "zsh": _zsh, "fish": _fish}[shell](parser)
@@ -0,0 +1,183 @@
+"""Resident daemon that serves CLI commands over a Unix socket.
+
+The daemon keeps imported modules, the parsed problem store and HTTP sessions
+warm between commands. The CLI hands eligible commands to it when it's
+running and falls back to running them itself when it isn't.
+
+Protocol: the client sends one JSON object (``{"argv": [...]}`` or
+``{"stop": true}``) and shuts down its write side; the daemon replies with one
+JSON object ``{"status": int, "stdout": str, "stderr": str}`` and closes.
+"""
+
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .main import DEFAULT_SOCKET, SOCKET_ENV
+
+# Largest request accepted from a client
+MAX_REQUEST_BYTES = 64 * 1024
+
+
+def socket_path(path: Optional[str] = None) -> Path:
+    """Resolve the socket path from an argument, the environment or the default."""
+    return Path(path or os.environ.get(SOCKET_ENV) or DEFAULT_SOCKET)
+
+
+def _recv_all(conn: socket.socket, limit: int = 0) -> bytes:
+    """Read until the peer shuts down its write side."""
+    chunks = []
+    size = 0
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        if limit and size > limit:
+            raise ValueError("request too large")
+    return b"".join(chunks)
+
+
+def _request(request: Dict[str, Any], path: Optional[str] = None) -> Optional[Dict]:
+    """Send a request to the daemon. Returns None if no daemon is listening."""
+    sock_path = socket_path(path)
+    if not sock_path.exists():
+        return None
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(str(sock_path))
+    except OSError:
+        client.close()
+        return None
+
+    with client:
+        client.sendall(json.dumps(request).encode("utf-8"))
+        client.shutdown(socket.SHUT_WR)
+        return json.loads(_recv_all(client))
+
+
+def call_daemon(argv: List[str], path: Optional[str] = None) -> Optional[int]:
+    """Run a command in the daemon and relay its output.
+
+    Returns the command's exit status, or None if no daemon is running (the
+    caller should run the command itself).
+    """
+    try:
+        response = _request({"argv": argv}, path)
+    except (OSError, ValueError) as e:
+        # The command may already have run, so don't retry it locally
+        print(f"Error: daemon request failed: {e}", file=sys.stderr)
+        return 1
+
+    if response is None:
+        return None
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    return int(response.get("status", 1))
+
+
+def stop_daemon(path: Optional[str] = None) -> int:
+    """Ask a running daemon to exit."""
+    try:
+        response = _request({"stop": True}, path)
+    except (OSError, ValueError) as e:
+        print(f"Error: daemon request failed: {e}", file=sys.stderr)
+        return 1
+
+    if response is None:
+        print("No daemon is running.")
+        return 1
+    print(response.get("stdout", "").rstrip())
+    return 0
+
+
+def _handle(conn: socket.socket) -> bool:
+    """Serve one request. Returns False when the daemon should stop."""
+    from .main import DAEMON_COMMANDS, create_parser, run_command
+    from .storage import ProblemStorage
+
+    try:
+        request = json.loads(_recv_all(conn, MAX_REQUEST_BYTES))
+    except (OSError, ValueError):
+        return True
+
+    if request.get("stop"):
+        reply = {"status": 0, "stdout": "Daemon stopped.\n", "stderr": ""}
+        conn.sendall(json.dumps(reply).encode("utf-8"))
+        return False
+
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            args = create_parser().parse_args(request.get("argv") or [])
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else 2
+        else:
+            if args.command in DAEMON_COMMANDS:
+                status = run_command(args)
+            else:
+                print(f"Command not served by daemon: {args.command}", file=sys.stderr)
+                status = 1
+
+    if status != 0:
+        # A failed command may have left the shared snapshot half-modified
+        ProblemStorage().invalidate_cache()
+
+    reply = {"status": status, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+    try:
+        conn.sendall(json.dumps(reply).encode("utf-8"))
+    except OSError:
+        pass
+    return True
+
+
+def run_daemon(path: Optional[str] = None) -> None:
+    """Serve commands until stopped (``daemon --stop``, SIGTERM or Ctrl-C)."""
+    sock_path = socket_path(path)
+    if sock_path.exists():
+        try:
+            if _request({"argv": ["--help"]}, str(sock_path)) is not None:
+                print(f"Daemon already running on {sock_path}")
+                return
+        except (OSError, ValueError):
+            pass
+        sock_path.unlink()  # stale socket from a daemon that didn't clean up
+
+    # Warm everything the served commands need
+    from . import commands  # noqa: F401
+    from .storage import ProblemStorage
+
+    ProblemStorage().load_problems()
+
+    sock_path.parent.mkdir(parents=True, exist_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)  # socket is private to this user
+    try:
+        server.bind(str(sock_path))
+    finally:
+        os.umask(old_umask)
+    server.listen(16)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    print(f"Daemon listening on {sock_path} (pid {os.getpid()})")
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                if not _handle(conn):
+                    break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        sock_path.unlink(missing_ok=True)
+    print("Daemon stopped.")
@@ -0,0 +1,82 @@
+"""Keeping the files derived from the problem database up to date.
+
+Shuffle bags, progress counters, the review index and the title index are
+stored next to the database. Everything that writes the database (the CLI
+commands and the library API) calls these helpers afterwards. The counter
+and index modules are imported only by the helpers that build them, so a
+command that just picks doesn't load them.
+"""
+
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from .models import Problem
+from .selection import SelectionQueues
+from .storage import ProblemStorage
+
+if TYPE_CHECKING:
+    from .aggregates import ProgressAggregates
+    from .scheduler import ReviewIndex
+
+
+def selection_queues(storage: ProblemStorage) -> SelectionQueues:
+    """Shuffle bags stored next to the problem database."""
+    return SelectionQueues(storage.data_file.parent)
+
+
+def after_update(
+    storage: ProblemStorage,
+    changes: List[Tuple[Problem, Problem]],
+    index: Optional["ReviewIndex"],
+    aggregates: "ProgressAggregates",
+) -> None:
+    """Bring derived data up to date after storage.update() saved ``changes``.
+
+    Runs under the write lock, so no other process's save or pick lands
+    between the check and the sidecar writes. If another save got in first (the update
+    was re-applied on top of it, or came right after it), the incremental
+    updates would miss it: the counters are recounted instead, and the review
+    index rebuilds itself on next use.
+
+    While saves are held in memory (the shell), the counters and the review
+    index aren't written out; after_flush() does that once the saves are.
+    """
+    with storage.write_lock():
+        selection_queues(storage).touch(changes)
+        if storage.rebased or storage.changed_since_load():
+            aggregates.recount()
+            return
+        if index is not None:
+            index.reschedule(changes)
+        aggregates.apply(changes)
+
+
+def after_flush(storage: ProblemStorage) -> None:
+    """Write the counters and review index after held saves were flushed.
+
+    Skipped if another process has written the data file since: the held
+    copy no longer matches it, and both rebuild themselves on next use.
+    """
+    from .aggregates import ProgressAggregates
+    from .scheduler import ReviewIndex
+
+    with storage.write_lock():
+        if storage.changed_since_load():
+            return
+        ProgressAggregates(storage)
+        ReviewIndex(storage)
+
+
+def after_bulk_update(storage: ProblemStorage) -> None:
+    """Reset derived data after a bulk import (sync, refresh).
+
+    Shuffle bags are dropped, and the title index and progress counters are
+    rebuilt now so the next lookup or progress call stays fast. The review
+    index rebuilds itself on next use.
+    """
+    from .aggregates import ProgressAggregates
+    from .search import TitleIndex
+
+    with storage.write_lock():
+        selection_queues(storage).clear()
+    TitleIndex.rebuild(storage)
+    ProgressAggregates(storage).recount()
@@ -0,0 +1,139 @@
+"""Local submission history, kept apart from sync so reading it stays offline.
+
+Only sync fetches submissions; export, import and stats just read or merge
+the JSON Lines file it leaves behind.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from .storage import HISTORY_FILE_NAME
+
+# Submission fields kept in the local history
+HISTORY_FIELDS = ("id", "title", "titleSlug", "status", "lang", "timestamp")
+
+
+class SubmissionHistory:
+    """Local submission history plus the checkpoint of an in-progress fetch.
+
+    Pages are appended to a partial file as they arrive and the pagination
+    cursor is saved after each one. A finished fetch replaces the history
+    file with the deduplicated partial file.
+    """
+
+    def __init__(self, directory: Path):
+        """Initialize with the directory holding the history files."""
+        self.history_file = directory / HISTORY_FILE_NAME
+        self.partial_file = directory / "submissions.partial.jsonl"
+        self.checkpoint_file = directory / "sync_checkpoint.json"
+
+    def load_checkpoint(self) -> Optional[Dict]:
+        """Load the cursor of an interrupted fetch, if there is one."""
+        if not self.partial_file.exists():
+            return None
+        try:
+            with open(self.checkpoint_file, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+            return {
+                "offset": int(checkpoint["offset"]),
+                "fetched": int(checkpoint["fetched"]),
+            }
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+
+    def clear_checkpoint(self) -> None:
+        """Discard an interrupted fetch so the next one starts from zero."""
+        for path in (self.checkpoint_file, self.partial_file):
+            path.unlink(missing_ok=True)
+
+    def start(self) -> None:
+        """Start a new fetch with an empty partial file."""
+        self.clear_checkpoint()
+        self.partial_file.parent.mkdir(parents=True, exist_ok=True)
+        self.partial_file.touch()
+
+    def append_page(self, submissions: List[Dict], offset: int, fetched: int) -> None:
+        """Append a fetched page, then move the cursor past it."""
+        with open(self.partial_file, "a", encoding="utf-8") as f:
+            for submission in submissions:
+                record = {k: submission.get(k) for k in HISTORY_FIELDS}
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        checkpoint = {
+            "offset": offset,
+            "fetched": fetched,
+            "updated": datetime.now().isoformat(timespec="seconds"),
+        }
+        tmp_file = self.checkpoint_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_file, self.checkpoint_file)
+
+    def partial_ids(self) -> Set:
+        """Ids of the submissions an interrupted fetch already has."""
+        return {record.get("id") for record in self._read(self.partial_file)}
+
+    def finish(self) -> int:
+        """Promote the partial file to the history. Returns the submission count."""
+        tmp_file = self.history_file.with_suffix(".tmp")
+        count = 0
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            for record in self._read(self.partial_file):
+                f.write(json.dumps(record) + "\n")
+                count += 1
+        os.replace(tmp_file, self.history_file)
+        self.clear_checkpoint()
+        return count
+
+    def read(self) -> Iterator[Dict]:
+        """Stream submissions from the last complete fetch."""
+        return self._read(self.history_file)
+
+    def merge(self, submissions: Iterable[Dict]) -> int:
+        """Add submissions whose id isn't in the history yet (e.g. an import).
+
+        A later full fetch replaces the history with the account's own
+        submissions. Returns the number added.
+        """
+        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.history_file.with_suffix(".tmp")
+        seen = set()
+        added = 0
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            for record in self.read():
+                seen.add(record.get("id"))
+                f.write(json.dumps(record) + "\n")
+            for submission in submissions:
+                record = {k: submission.get(k) for k in HISTORY_FIELDS}
+                if record["id"] in seen:
+                    continue
+                seen.add(record["id"])
+                f.write(json.dumps(record) + "\n")
+                added += 1
+        if added:
+            os.replace(tmp_file, self.history_file)
+        else:
+            tmp_file.unlink()
+        return added
+
+    @staticmethod
+    def _read(path: Path) -> Iterator[Dict]:
+        """Stream submissions from a history file, skipping repeated ids."""
+        if not path.exists():
+            return
+        seen = set()
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn write from an interrupted fetch
+                if record.get("id") in seen:
+                    continue
+                seen.add(record.get("id"))
+                yield record
@@ -2,20 +2,85 @@
 """Main CLI entry point for leetcode-picker."""
 
 import argparse
+import importlib
+import os
 import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
 
-from .commands import (
-    choose_problem,
-    mark_complete,
-    override_difficulty,
-    review_problem,
-    setup_auth,
-    show_progress,
-    show_progress_verbose,
-    sync_submissions,
-    list_grind75_completed_titles,  # add this
-    refresh_problems,  # add this
-)
+from . import profiling
+from .picking import DIFFICULTIES
+
+# Commands a running daemon serves; the rest are interactive or long-running
+DAEMON_COMMANDS = {
+    "choose",
+    "review",
+    "override-difficulty",
+    "progress",
+    "mark-complete",
+    "grind75-completed",
+}
+
+# Set to bypass a running daemon
+NO_DAEMON_ENV = "LEETCODE_PICKER_NO_DAEMON"
+
+DEFAULT_SOCKET = Path.home() / ".leetcode-picker" / "daemon.sock"
+
+# Overrides the socket path for both the daemon and the CLI
+SOCKET_ENV = "LEETCODE_PICKER_SOCKET"
+
+
+def _command(name: str) -> Callable[..., None]:
+    """Resolve a command implementation from commands.py on first use.
+
+    Keeps ``--help`` and argument errors from importing any command code.
+    """
+    with profiling.phase("import commands"):
+        module = importlib.import_module(".commands", __package__)
+    return getattr(module, name)
+
+
+def _parse_mix(value: str) -> Dict[str, int]:
+    """Parse a difficulty mix such as ``easy=1,medium=2,hard=1``."""
+    mix: Dict[str, int] = {}
+    for part in value.split(","):
+        level, _, count = part.partition("=")
+        level = level.strip().lower()
+        if level not in DIFFICULTIES:
+            raise argparse.ArgumentTypeError(
+                f"unknown difficulty '{level}' (choose from {', '.join(DIFFICULTIES)})"
+            )
+        try:
+            mix[level] = int(count)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"'{part}' is not DIFFICULTY=COUNT")
+        if mix[level] < 0:
+            raise argparse.ArgumentTypeError(f"negative count for {level}")
+    return mix
+
+
+def _parse_label(value: str) -> Dict[str, str]:
+    """Parse a metrics label such as ``account=alice``."""
+    name, sep, label_value = value.partition("=")
+    if not sep or not name.isidentifier():
+        raise argparse.ArgumentTypeError(f"'{value}' is not NAME=VALUE")
+    return {name: label_value}
+
+
+def _add_pick_arguments(parser: argparse.ArgumentParser) -> None:
+    """Arguments for picking several problems at once (choose, review)."""
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=1,
+        help="Pick N distinct problems (default: 1)",
+    )
+    parser.add_argument(
+        "--mix",
+        type=_parse_mix,
+        help="Pick distinct problems per difficulty, e.g. easy=1,medium=2,hard=1",
+    )
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -25,23 +90,55 @@ def create_parser() -> argparse.ArgumentParser:
         description="A CLI tool for picking random LeetCode problems and tracking progress",
     )
 
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print wall/CPU time per phase (storage, HTTP, parsing) to stderr",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="Write a cProfile dump of the command to FILE (read with pstats)",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        type=Path,
+        help="Write run metrics to FILE: Prometheus textfile if it ends in .prom, "
+        "else append a JSON line",
+    )
+    parser.add_argument(
+        "--metrics-label",
+        metavar="NAME=VALUE",
+        type=_parse_label,
+        action="append",
+        default=[],
+        help="Label added to every metric (repeatable), e.g. account=alice",
+    )
+
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
     # Choose command
     choose_parser = subparsers.add_parser("choose", help="Pick a random unsolved problem")
     choose_parser.add_argument(
         "--difficulty",
-        choices=["easy", "medium", "hard"],
+        choices=DIFFICULTIES,
         help="Filter by difficulty level",
     )
     choose_parser.add_argument(
         "--study-plan",
         help="Filter by study plan (leetcode-75, top-interview-150, grind75)",
     )
+    choose_parser.add_argument(
+        "--seed",
+        type=int,
+        help="Shuffle seed for a reproducible order of picks",
+    )
+    _add_pick_arguments(choose_parser)
 
     # Review command
     review_parser = subparsers.add_parser(
-        "review", help="Pick a random previously solved problem"
+        "review", help="Pick the solved problem most overdue for review"
     )
     review_parser.add_argument(
         "--weeks-ago",
@@ -50,18 +147,39 @@ def create_parser() -> argparse.ArgumentParser:
     )
     review_parser.add_argument(
         "--difficulty",
-        choices=["easy", "medium", "hard"],
+        choices=DIFFICULTIES,
         help="Filter by difficulty level",
     )
+    review_parser.add_argument(
+        "--random",
+        action="store_true",
+        help="Pick a random solved problem instead of the most overdue one",
+    )
+    review_parser.add_argument(
+        "--seed",
+        type=int,
+        help="Shuffle seed for a reproducible order of random picks (implies --random)",
+    )
+    review_parser.add_argument(
+        "--due",
+        action="store_true",
+        help="List every problem due for review, most overdue first",
+    )
+    review_parser.add_argument(
+        "--limit",
+        type=int,
+        help="Show at most N problems with --due",
+    )
+    _add_pick_arguments(review_parser)
 
     # Override difficulty command
     override_parser = subparsers.add_parser(
         "override-difficulty", help="Override difficulty level for a problem"
     )
-    override_parser.add_argument("url", help="Problem URL")
+    override_parser.add_argument("url", help="Problem URL or (partial) title")
     override_parser.add_argument(
         "difficulty",
-        choices=["easy", "medium", "hard"],
+        choices=DIFFICULTIES,
         help="New difficulty level",
     )
 
@@ -75,6 +193,11 @@ def create_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Show checklist view (in plan order) with completion marks",
     )
+    progress_parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Recount progress from scratch and report drift in the stored counters",
+    )
     progress_parser.add_argument(
         "study_plan",
         nargs="?",
@@ -82,13 +205,32 @@ def create_parser() -> argparse.ArgumentParser:
         help="Optional: limit to a single study plan",
     )
 
+    # Stats command
+    stats_parser = subparsers.add_parser(
+        "stats",
+        help="Solve velocity, difficulty mix, submissions per solve, stale problems",
+    )
+    stats_parser.add_argument(
+        "--weeks",
+        type=int,
+        default=12,
+        help="Weeks shown in the per-week table (default: 12)",
+    )
+
     # Mark complete command
     mark_parser = subparsers.add_parser(
         "mark-complete", help="Mark a problem as completed"
     )
-    mark_parser.add_argument("url", help="Problem URL")
     mark_parser.add_argument(
-        "--date", help="Completion date (YYYY-MM-DD, default: today)"
+        "urls",
+        nargs="+",
+        metavar="url",
+        help="Problem URLs or (partial) titles, or '-' to read 'url[,date]' "
+        "lines from stdin",
+    )
+    mark_parser.add_argument(
+        "--date",
+        help="Completion date for URLs without one (YYYY-MM-DD, default: today)",
     )
 
     # Grind75 completed command
@@ -109,46 +251,224 @@ def create_parser() -> argparse.ArgumentParser:
         help="Print verbose debug info while scraping (Grind75 only)",
     )
 
+    # Export command
+    export_parser = subparsers.add_parser(
+        "export", help="Write the database to stdout as NDJSON (for backups/merges)"
+    )
+    export_parser.add_argument(
+        "--no-submissions",
+        action="store_true",
+        help="Leave out the synced submission history",
+    )
+
+    # Import command
+    import_parser = subparsers.add_parser(
+        "import", help="Merge an NDJSON export into the database"
+    )
+    import_parser.add_argument(
+        "file",
+        nargs="?",
+        default="-",
+        help="Export file to read (default: '-', stdin)",
+    )
+    import_parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="Make the database exactly the exported problems instead of merging",
+    )
+
     # Auth setup command
     subparsers.add_parser("auth", help="Set up LeetCode authentication")
 
+    # Daemon command
+    daemon_parser = subparsers.add_parser(
+        "daemon",
+        help="Serve commands from a warm background process over a Unix socket",
+    )
+    daemon_parser.add_argument(
+        "--socket", help="Socket path (default: ~/.leetcode-picker/daemon.sock)"
+    )
+    daemon_parser.add_argument(
+        "--stop", action="store_true", help="Stop a running daemon"
+    )
+
+    # Shell command
+    shell_parser = subparsers.add_parser(
+        "shell",
+        help="Interactive shell that keeps the database loaded across commands",
+    )
+    shell_parser.add_argument(
+        "--flush-every",
+        type=int,
+        default=5,
+        help="Write held changes to disk after this many saves (default: 5)",
+    )
+
+    # Completion command
+    completion_parser = subparsers.add_parser(
+        "completion", help="Print a shell completion script"
+    )
+    completion_parser.add_argument(
+        "shell", choices=["bash", "zsh", "fish"], help="Shell to complete for"
+    )
+
     # Sync command
-    subparsers.add_parser("sync", help="Sync submission history from LeetCode")
+    sync_parser = subparsers.add_parser(
+        "sync", help="Sync submission history from LeetCode"
+    )
+    sync_parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Only fetch solved/attempted status in bulk (no counts or dates)",
+    )
+    sync_parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Discard an interrupted sync's progress instead of resuming it",
+    )
 
-    return parser
+    # Sync-all command
+    sync_all_parser = subparsers.add_parser(
+        "sync-all", help="Sync a directory of accounts against a shared catalog"
+    )
+    sync_all_parser.add_argument(
+        "auth_dir", type=Path, help="Directory with one auth file (NAME.json) per account"
+    )
+    sync_all_parser.add_argument(
+        "--data-dir",
+        type=Path,
+        help="Where each account's data goes, as DIR/NAME/ "
+        "(default: ~/.leetcode-picker/cohort)",
+    )
+    sync_all_parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Accounts synced at the same time (default: 4)",
+    )
+    sync_all_parser.add_argument(
+        "--rate",
+        type=float,
+        default=2.0,
+        help="GraphQL requests per second across all accounts (default: 2)",
+    )
+    sync_all_parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Only fetch solved/attempted status in bulk (no counts or dates)",
+    )
+    sync_all_parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Discard interrupted syncs' progress instead of resuming them",
+    )
+    sync_all_parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Re-scrape the shared catalog before syncing",
+    )
 
+    # Cohort progress command
+    cohort_parser = subparsers.add_parser(
+        "cohort-progress",
+        help="Plan completion, solve rates and a leaderboard across accounts",
+    )
+    cohort_parser.add_argument(
+        "--data-dir",
+        type=Path,
+        help="Account data directory used by sync-all "
+        "(default: ~/.leetcode-picker/cohort)",
+    )
+    cohort_parser.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="Accounts shown on the leaderboard (default: 20)",
+    )
+    cohort_parser.add_argument(
+        "--problems",
+        type=int,
+        default=10,
+        help="Problems shown in the most/least solved lists (default: 10)",
+    )
 
-def main() -> int:
-    """Main entry point."""
-    parser = create_parser()
-    args = parser.parse_args()
+    return parser
 
-    if not args.command:
-        parser.print_help()
-        return 1
 
+def run_command(args: argparse.Namespace) -> int:
+    """Run a parsed command in this process. Returns the exit status."""
     try:
         if args.command == "choose":
-            choose_problem(args.difficulty, args.study_plan)
+            _command("choose_problem")(
+                args.difficulty, args.study_plan, args.seed, args.count, args.mix
+            )
         elif args.command == "review":
-            review_problem(args.weeks_ago, args.difficulty)
+            _command("review_problem")(
+                args.weeks_ago,
+                args.difficulty,
+                args.seed,
+                args.random,
+                args.due,
+                args.limit,
+                args.count,
+                args.mix,
+            )
         elif args.command == "override-difficulty":
-            override_difficulty(args.url, args.difficulty)
+            _command("override_difficulty")(args.url, args.difficulty)
         elif args.command == "progress":
             if getattr(args, "verbose", False):
-                show_progress_verbose(getattr(args, "study_plan", None))
+                _command("show_progress_verbose")(getattr(args, "study_plan", None))
             else:
-                show_progress()
+                _command("show_progress")(args.verify)
+        elif args.command == "stats":
+            _command("show_stats")(args.weeks)
         elif args.command == "mark-complete":
-            mark_complete(args.url, args.date)
+            _command("mark_complete")(args.urls, args.date)
         elif args.command == "grind75-completed":
-            list_grind75_completed_titles()
+            _command("list_grind75_completed_titles")()
         elif args.command == "refresh":
-            refresh_problems(args.verbose)
+            _command("refresh_problems")(args.verbose)
+        elif args.command == "export":
+            _command("export_data")(not args.no_submissions)
+        elif args.command == "import":
+            _command("import_data")(args.file, args.replace)
         elif args.command == "auth":
-            setup_auth()
+            _command("setup_auth")()
         elif args.command == "sync":
-            sync_submissions()
+            ok = _command("sync_submissions")(args.fast, args.restart)
+            return 0 if ok else 1
+        elif args.command == "sync-all":
+            failed = _command("sync_all")(
+                args.auth_dir,
+                args.data_dir,
+                args.workers,
+                args.rate,
+                args.fast,
+                args.restart,
+                args.refresh,
+            )
+            return 1 if failed else 0
+        elif args.command == "cohort-progress":
+            _command("cohort_progress")(args.data_dir, args.top, args.problems)
+        elif args.command == "completion":
+            from .completion import completion_script
+            from .storage import ProblemStorage
+
+            # Make sure there are candidates to complete before the next save
+            storage = ProblemStorage()
+            with storage.write_lock():
+                storage.write_completions(storage.load_problems())
+            print(completion_script(args.shell, create_parser()), end="")
+        elif args.command == "shell":
+            from .shell import run_shell
+
+            run_shell(args.flush_every)
+        elif args.command == "daemon":
+            from .daemon import run_daemon, stop_daemon
+
+            if args.stop:
+                return stop_daemon(args.socket)
+            run_daemon(args.socket)
         else:
             print(f"Unknown command: {args.command}", file=sys.stderr)
             return 1
@@ -159,5 +479,88 @@ def main() -> int:
     return 0
 
 
+def is_measured(args: argparse.Namespace) -> bool:
+    """Whether --timings, --profile or --metrics was given."""
+    return bool(args.timings or args.profile or args.metrics)
+
+
+def run_measured(args: argparse.Namespace) -> int:
+    """Run a command with --timings, --profile and/or --metrics, then report."""
+    from .metrics import REGISTRY
+
+    if args.metrics:
+        labels = {"command": args.command}
+        for label in args.metrics_label:
+            labels.update(label)
+        REGISTRY.enable(labels)
+    timings = profiling.enable() if args.timings else None
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter()
+    status = 1
+    try:
+        with profiling.phase(f"command {args.command}"):
+            status = run_command(args)
+        return status
+    finally:
+        if args.metrics:
+            REGISTRY.set("run_duration_seconds", time.perf_counter() - start)
+            REGISTRY.set("run_success", int(status == 0))
+            REGISTRY.set("run_timestamp_seconds", time.time())
+            try:
+                REGISTRY.write(args.metrics)
+            except OSError as e:
+                print(f"Error writing metrics: {e}", file=sys.stderr)
+            REGISTRY.reset()
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(
+                f"Profile written to {args.profile} "
+                f"(view with: python -m pstats {args.profile})",
+                file=sys.stderr,
+            )
+        if timings is not None:
+            profiling.disable()
+            timings.report()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main entry point."""
+    parser = create_parser()
+    if argv is None:
+        argv = sys.argv[1:]
+    args = parser.parse_args(argv)
+
+    if not args.command:
+        parser.print_help()
+        return 1
+
+    if is_measured(args):
+        return run_measured(args)
+
+    # Hand off to a running daemon if there is one; it has everything warm.
+    # The daemon can't read our stdin, so batches from stdin run here.
+    reads_stdin = "-" in getattr(args, "urls", [])
+    if (
+        args.command in DAEMON_COMMANDS
+        and not reads_stdin
+        and not os.environ.get(NO_DAEMON_ENV)
+        # Checked before importing the client, which local runs don't need
+        and os.path.exists(os.environ.get(SOCKET_ENV) or DEFAULT_SOCKET)
+    ):
+        from .daemon import call_daemon
+
+        status = call_daemon(argv)
+        if status is not None:
+            return status
+
+    return run_command(args)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,220 @@
+"""Run metrics for monitoring scheduled refresh and sync jobs.
+
+A Metrics registry counts HTTP requests (by status), response bytes, request
+errors, sync retries, cache hits and misses, and storage loads and writes,
+and keeps duration histograms for requests and storage operations. The
+scraper, auth, sync and storage classes take a registry in their constructor
+and default to the process-wide REGISTRY, which records nothing until it's
+enabled (``--metrics FILE``).
+
+At the end of a run the values are written as a Prometheus textfile-collector
+file (when FILE ends in ``.prom``) or appended to FILE as one JSON line. They
+describe that run only: counters start from zero in every process.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+PREFIX = "leetcode_picker_"
+
+# Upper bounds (seconds) of the duration histogram buckets
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (type, help); every metric recorded must be declared here
+METRICS: Dict[str, Tuple[str, str]] = {
+    "http_requests_total": ("counter", "HTTP responses by client and status code."),
+    "http_response_bytes_total": ("counter", "HTTP response body bytes."),
+    "http_errors_total": ("counter", "HTTP requests that got no response."),
+    "http_request_duration_seconds": ("histogram", "HTTP request latency."),
+    "sync_retries_total": ("counter", "Sync requests retried after a failure."),
+    "cache_hits_total": ("counter", "Lookups answered from a local cache."),
+    "cache_misses_total": ("counter", "Lookups a local cache couldn't answer."),
+    "storage_loads_total": ("counter", "Problem database reads from disk."),
+    "storage_writes_total": ("counter", "Problem database writes to disk."),
+    "storage_bytes_total": ("counter", "Problem database bytes read or written."),
+    "storage_duration_seconds": ("histogram", "Problem database read/write time."),
+    "run_duration_seconds": ("gauge", "Wall time of the run."),
+    "run_success": ("gauge", "1 if the command exited with status 0."),
+    "run_timestamp_seconds": ("gauge", "Unix time the run finished."),
+}
+
+# Sorted (name, value) label pairs
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+def _number(value: float) -> str:
+    """Sample value without exponent rounding (timestamps need every digit)."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metrics:
+    """Counters, gauges and histograms for one run; safe to share across threads."""
+
+    def __init__(self, enabled: bool = True, labels: Optional[Dict[str, str]] = None):
+        """Create a registry; ``labels`` are added to every series on output."""
+        self.enabled = enabled
+        self.labels = dict(labels or {})
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, LabelSet], float] = {}
+        # (name, labels) -> [count per bucket..., +Inf count, sum]
+        self._histograms: Dict[Tuple[str, LabelSet], List[float]] = {}
+
+    def enable(self, labels: Optional[Dict[str, str]] = None) -> None:
+        """Start recording, with extra constant labels."""
+        self.enabled = True
+        self.labels.update(labels or {})
+
+    def reset(self) -> None:
+        """Stop recording and forget every value and constant label."""
+        with self._lock:
+            self.enabled = False
+            self.labels = {}
+            self._values.clear()
+            self._histograms.clear()
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Add to a counter."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """Set a gauge."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._values[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        """Record a duration in a histogram."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            row = self._histograms.setdefault(key, [0.0] * (len(BUCKETS) + 2))
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    row[i] += 1
+                    break
+            else:
+                row[len(BUCKETS)] += 1
+            row[-1] += seconds
+
+    def instrument_session(self, session: Any, client: str) -> None:
+        """Count each response of a requests session under ``client``."""
+        if not self.enabled:
+            return
+
+        def record(response: Any, *args: Any, **kwargs: Any) -> None:
+            status = str(response.status_code)
+            self.inc("http_requests_total", client=client, status=status)
+            self.inc("http_response_bytes_total", len(response.content), client=client)
+            self.observe(
+                "http_request_duration_seconds",
+                response.elapsed.total_seconds(),
+                client=client,
+            )
+
+        session.hooks["response"].append(record)
+
+    def request_failed(self, error: Exception, client: str) -> None:
+        """Count a request exception that came without a response.
+
+        Error statuses are already counted by status in http_requests_total.
+        """
+        if getattr(error, "response", None) is None:
+            self.inc("http_errors_total", client=client)
+
+    def _series(self, labels: LabelSet, **extra: str) -> str:
+        """Prometheus label block with the constant labels added."""
+        pairs = {**self.labels, **dict(labels), **extra}
+        if not pairs:
+            return ""
+        body = ",".join(
+            '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+            for k, v in sorted(pairs.items())
+        )
+        return "{" + body + "}"
+
+    def to_prometheus(self) -> str:
+        """Text exposition format, one HELP/TYPE block per metric recorded."""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in METRICS.items():
+                series: List[Tuple[LabelSet, Any]]
+                if kind == "histogram":
+                    series = sorted(
+                        (k[1], v) for k, v in self._histograms.items() if k[0] == name
+                    )
+                else:
+                    series = sorted(
+                        (k[1], v) for k, v in self._values.items() if k[0] == name
+                    )
+                if not series:
+                    continue
+                full_name = PREFIX + name
+                lines.append(f"# HELP {full_name} {help_text}")
+                lines.append(f"# TYPE {full_name} {kind}")
+                for labels, value in series:
+                    if kind != "histogram":
+                        lines.append(
+                            f"{full_name}{self._series(labels)} {_number(value)}"
+                        )
+                        continue
+                    cumulative = 0.0
+                    bounds = [f"{b:g}" for b in BUCKETS] + ["+Inf"]
+                    for bound, count in zip(bounds, value[:-1]):
+                        cumulative += count
+                        lines.append(
+                            f"{full_name}_bucket{self._series(labels, le=bound)} "
+                            f"{_number(cumulative)}"
+                        )
+                    lines.append(
+                        f"{full_name}_sum{self._series(labels)} {_number(value[-1])}"
+                    )
+                    lines.append(
+                        f"{full_name}_count{self._series(labels)} {_number(cumulative)}"
+                    )
+        return "\n".join(lines) + "\n"
+
+    def to_json(self) -> Dict[str, Any]:
+        """The run as one JSON-able object: metric -> "k=v,..." series -> value."""
+        data: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for (name, labels), value in sorted(self._values.items()):
+                series = ",".join(f"{k}={v}" for k, v in labels)
+                data.setdefault(name, {})[series] = value
+            for (name, labels), row in sorted(self._histograms.items()):
+                series = ",".join(f"{k}={v}" for k, v in labels)
+                data.setdefault(name, {})[series] = {
+                    "count": sum(row[:-1]),
+                    "sum": row[-1],
+                    "buckets": dict(
+                        zip([f"{b:g}" for b in BUCKETS] + ["+Inf"], row[:-1])
+                    ),
+                }
+        return {"time": time.time(), "labels": self.labels, "metrics": data}
+
+    def write(self, path: Path) -> None:
+        """Write a .prom file atomically, or append a JSON line to any other file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".prom":
+            # The textfile collector may read at any moment; never show it a
+            # half-written file
+            tmp_file = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_file, path)
+        else:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self.to_json()) + "\n")
+
+
+# Registry the CLI enables with --metrics; classes fall back to it
+REGISTRY = Metrics(enabled=False)
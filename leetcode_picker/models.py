@@ -4,6 +4,13 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
+# Study plan URLs
+STUDY_PLANS = {
+    "leetcode-75": "https://leetcode.com/studyplan/leetcode-75/",
+    "top-interview-150": "https://leetcode.com/studyplan/top-interview-150/",
+    "grind75": "https://www.techinterviewhandbook.org/grind75/",
+}
+
 
 @dataclass
 class Problem:
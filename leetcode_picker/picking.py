@@ -0,0 +1,18 @@
+"""Difficulty levels and how a pick is split between them.
+
+Imports nothing from the package, so the argument parser can use it without
+slowing down startup.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+def quotas(
+    difficulty: Optional[str], count: int, mix: Optional[Dict[str, int]]
+) -> List[Tuple[Optional[str], int]]:
+    """How many problems to pick per difficulty (None = any difficulty)."""
+    if mix:
+        return [(level, n) for level, n in mix.items() if n > 0]
+    return [(difficulty, count)]
@@ -0,0 +1,158 @@
+"""Per-phase timings for a single run (``--timings`` and ``--profile``).
+
+Code marks its phases with ``with profiling.phase("storage load"):``. While
+timings are off, phase() hands back one shared do-nothing context manager, so
+the cost is a global lookup per phase; nothing is measured or kept. When on,
+each phase adds its wall and CPU time (and optionally bytes) to a per-name
+total, and HTTP sessions passed to instrument_session() log every response's
+latency and size. Phases nest, so a row includes the time of any phases
+inside it.
+"""
+
+import sys
+import time
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+# Slowest HTTP requests listed individually under the summary
+SLOWEST_REQUESTS = 10
+
+
+class _NullPhase:
+    """Stands in for a phase while timings are off."""
+
+    def __enter__(self) -> "_NullPhase":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+    def add_bytes(self, nbytes: int) -> None:
+        """Ignored."""
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    """One timed run of a named phase."""
+
+    def __init__(self, timings: "Timings", name: str):
+        self.timings = timings
+        self.name = name
+        self.nbytes = 0
+
+    def __enter__(self) -> "_Phase":
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.timings.add(
+            self.name,
+            time.perf_counter() - self.wall,
+            time.process_time() - self.cpu,
+            self.nbytes,
+        )
+
+    def add_bytes(self, nbytes: int) -> None:
+        """Count bytes read or written during the phase."""
+        self.nbytes += nbytes
+
+
+class Timings:
+    """Totals per phase name, plus a log of HTTP requests."""
+
+    def __init__(self) -> None:
+        """Start an empty record; phases are listed in first-seen order."""
+        # name -> [calls, wall seconds, cpu seconds, bytes]
+        self.phases: Dict[str, List[float]] = {}
+        # (method, url, status, seconds, bytes)
+        self.requests: List[Tuple[str, str, int, float, int]] = []
+
+    def add(self, name: str, wall: float, cpu: float, nbytes: int = 0) -> None:
+        """Add one run of a phase."""
+        row = self.phases.setdefault(name, [0, 0.0, 0.0, 0])
+        row[0] += 1
+        row[1] += wall
+        row[2] += cpu
+        row[3] += nbytes
+
+    def add_request(
+        self, method: str, url: str, status: int, seconds: float, nbytes: int
+    ) -> None:
+        """Log one HTTP response; also totalled as an "http" phase."""
+        self.requests.append((method, url, status, seconds, nbytes))
+        self.add("http", seconds, 0.0, nbytes)
+
+    def report(self, out: TextIO = sys.stderr) -> None:
+        """Print the summary table."""
+        print(file=out)
+        print(
+            f"{'phase':<24} {'calls':>6} {'wall ms':>10} {'cpu ms':>10} {'bytes':>12}",
+            file=out,
+        )
+        print("-" * 66, file=out)
+        for name, (calls, wall, cpu, nbytes) in self.phases.items():
+            cpu_ms = "-" if name == "http" else f"{cpu * 1000:.1f}"
+            print(
+                f"{name:<24} {int(calls):>6} {wall * 1000:>10.1f} {cpu_ms:>10} "
+                f"{int(nbytes) or '':>12}",
+                file=out,
+            )
+
+        if self.requests:
+            slowest = sorted(self.requests, key=lambda r: r[3], reverse=True)
+            print(file=out)
+            print(
+                f"Slowest HTTP requests ({min(len(slowest), SLOWEST_REQUESTS)} "
+                f"of {len(slowest)}):",
+                file=out,
+            )
+            for method, url, status, seconds, nbytes in slowest[:SLOWEST_REQUESTS]:
+                print(
+                    f"  {seconds * 1000:>8.1f} ms {nbytes:>10} B  {status} "
+                    f"{method} {url}",
+                    file=out,
+                )
+
+
+_active: Optional[Timings] = None
+
+
+def enable() -> Timings:
+    """Start recording phases for this process."""
+    global _active
+    _active = Timings()
+    return _active
+
+
+def disable() -> Optional[Timings]:
+    """Stop recording; returns what was recorded."""
+    global _active
+    timings, _active = _active, None
+    return timings
+
+
+def phase(name: str) -> Any:
+    """Context manager timing a phase (a shared no-op while timings are off)."""
+    if _active is None:
+        return _NULL_PHASE
+    return _Phase(_active, name)
+
+
+def instrument_session(session: Any) -> None:
+    """Log each response of a requests session while timings are on."""
+    if _active is None:
+        return
+
+    def record(response: Any, *args: Any, **kwargs: Any) -> None:
+        if _active is not None:
+            _active.add_request(
+                response.request.method,
+                response.url,
+                response.status_code,
+                response.elapsed.total_seconds(),
+                len(response.content),
+            )
+
+    session.hooks["response"].append(record)
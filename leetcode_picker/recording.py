@@ -0,0 +1,192 @@
+"""Record HTTP responses to a fixture directory and replay them offline.
+
+With ``LEETCODE_PICKER_RECORD=DIR`` set, the scraper and GraphQL sessions
+save every response they get (study plan HTML, Grind75 pages and Next.js
+chunks, GraphQL JSON) into DIR. With ``LEETCODE_PICKER_REPLAY=DIR`` they
+serve those responses instead of touching the network, so parsing can be
+measured and checked against a fixed corpus::
+
+    LEETCODE_PICKER_RECORD=corpus leetcode-picker refresh
+    LEETCODE_PICKER_REPLAY=corpus leetcode-picker refresh
+
+Responses are keyed by method, URL and a digest of the request body (GraphQL
+posts differ only in their body). Request headers and cookies are never
+stored, and neither are Set-Cookie response headers. A request with no
+recording fails with a ConnectionError, the same way an offline request
+would.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import timedelta
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+RECORD_ENV = "LEETCODE_PICKER_RECORD"
+REPLAY_ENV = "LEETCODE_PICKER_REPLAY"
+
+INDEX_FILE_NAME = "index.json"
+
+# Response headers that no longer describe the stored (decoded) body, or that
+# carry credentials
+DROPPED_HEADERS = {
+    "set-cookie",
+    "content-encoding",
+    "content-length",
+    "transfer-encoding",
+}
+
+# One store per directory, so sessions recording together share an index
+_stores: Dict[Path, "FixtureStore"] = {}
+_stores_lock = threading.Lock()
+
+
+def request_key(method: str, url: str, body: Optional[bytes] = None) -> str:
+    """Key identifying a request in the fixture index."""
+    key = f"{method.upper()} {url}"
+    if body:
+        key += f" {hashlib.sha1(body).hexdigest()[:16]}"
+    return key
+
+
+class FixtureStore:
+    """A directory of recorded responses with an index.json describing them."""
+
+    def __init__(self, directory: Path):
+        """Open (or start) a fixture directory."""
+        self.directory = Path(directory)
+        self.index_file = self.directory / INDEX_FILE_NAME
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                self.index: Dict[str, Dict[str, Any]] = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+        # Sessions on several threads (sync-all) record into the same store
+        self._lock = threading.Lock()
+
+    def put(
+        self,
+        key: str,
+        status: int,
+        headers: Mapping[str, str],
+        content: bytes,
+    ) -> None:
+        """Store one response body and its metadata, then rewrite the index."""
+        body_file = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + ".body"
+        # Unique per process, so two recording processes can't share a temp file
+        tmp_file = self.directory / f".{INDEX_FILE_NAME}.{os.getpid()}.tmp"
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            (self.directory / body_file).write_bytes(content)
+            self.index[key] = {
+                "status": status,
+                "headers": {
+                    k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS
+                },
+                "file": body_file,
+                "bytes": len(content),
+            }
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(self.index, f, indent=1, sort_keys=True)
+            os.replace(tmp_file, self.index_file)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Metadata and body (under "content") of a recorded response, or None."""
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        content = (self.directory / entry["file"]).read_bytes()
+        return {**entry, "content": content}
+
+
+def _body(request: requests.PreparedRequest) -> Optional[bytes]:
+    """Request body as bytes."""
+    body = request.body
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    return body if isinstance(body, bytes) else None
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Sends requests normally and saves each response to a FixtureStore."""
+
+    def __init__(self, store: FixtureStore):
+        """Record into ``store``."""
+        super().__init__()
+        self.store = store
+
+    def send(self, request: requests.PreparedRequest, *args: Any, **kwargs: Any) -> Any:
+        """Send over the network and record the response."""
+        response = super().send(request, *args, **kwargs)
+        self.store.put(
+            request_key(request.method or "GET", request.url or "", _body(request)),
+            response.status_code,
+            response.headers,
+            response.content,
+        )
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Answers requests from a FixtureStore without any network access."""
+
+    def __init__(self, store: FixtureStore):
+        """Replay from ``store``."""
+        super().__init__()
+        self.store = store
+
+    def send(self, request: requests.PreparedRequest, *args: Any, **kwargs: Any) -> Any:
+        """Build the recorded response for ``request``."""
+        key = request_key(request.method or "GET", request.url or "", _body(request))
+        recorded = self.store.get(key)
+        if recorded is None:
+            raise requests.ConnectionError(
+                f"no recorded response for {key}", request=request
+            )
+
+        response = requests.Response()
+        response.status_code = recorded["status"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response._content = recorded["content"]
+        response.url = request.url or ""
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        try:
+            response.reason = HTTPStatus(response.status_code).phrase
+        except ValueError:
+            response.reason = ""
+        response.elapsed = timedelta(0)
+        return response
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+def _store(directory: Path) -> FixtureStore:
+    """The shared store for a fixture directory."""
+    directory = directory.resolve()
+    with _stores_lock:
+        if directory not in _stores:
+            _stores[directory] = FixtureStore(directory)
+        return _stores[directory]
+
+
+def attach(session: requests.Session) -> None:
+    """Route a session through the record or replay adapter, if one is requested."""
+    replay_dir = os.environ.get(REPLAY_ENV)
+    record_dir = os.environ.get(RECORD_ENV)
+    adapter: Optional[BaseAdapter] = None
+    if replay_dir:
+        adapter = ReplayAdapter(_store(Path(replay_dir)))
+    elif record_dir:
+        adapter = RecordingAdapter(_store(Path(record_dir)))
+    if adapter is not None:
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
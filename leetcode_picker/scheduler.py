@@ -0,0 +1,174 @@
+"""Spaced-repetition review schedule (SM-2 style) with a due-date index.
+
+LeetCode gives no per-review grades, so each solved problem's recall quality
+is estimated from its accepted/total submission ratio, and SM-2 is applied
+once per completion to get an ease factor and interval. The problem is due
+``interval`` days after its last pass.
+
+Due dates are kept in a sorted index persisted next to the database, so the
+most overdue problem is the first entry. The index is tagged with the data
+file's fingerprint and rebuilt whenever the file changed behind its back.
+"""
+
+import bisect
+import json
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .models import Problem
+from .storage import ProblemStorage
+
+INDEX_FILE_NAME = "review_index.json"
+
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+
+# Qualities below this count as a lapse and restart the interval (SM-2)
+PASSING_QUALITY = 3
+
+# Sorts before every date, so problems solved on an unknown date come up first
+UNKNOWN_DUE = ""
+
+# (due date, url), sorted
+Entry = Tuple[str, str]
+
+# Index per data file, reused while the file's fingerprint matches
+_indexes: Dict[Path, Tuple[Tuple[int, int, int], List[Entry]]] = {}
+
+
+def recall_quality(problem: Problem) -> int:
+    """Estimate SM-2 quality (0-5) from the share of accepted submissions."""
+    attempts = max(problem.submissions, problem.completions, 1)
+    return round(5 * problem.completions / attempts)
+
+
+def review_interval(problem: Problem) -> int:
+    """Days between the last pass and the next review."""
+    quality = recall_quality(problem)
+    if quality < PASSING_QUALITY:
+        return 1
+
+    ease = INITIAL_EASE
+    interval = 0
+    for repetition in range(1, problem.completions + 1):
+        if repetition == 1:
+            interval = 1
+        elif repetition == 2:
+            interval = 6
+        else:
+            interval = round(interval * ease)
+        ease += 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+        ease = max(ease, MIN_EASE)
+    return interval
+
+
+def due_date(problem: Problem) -> str:
+    """Next review date (YYYY-MM-DD), or UNKNOWN_DUE if the last pass isn't dated."""
+    if not problem.last_pass_date:
+        return UNKNOWN_DUE
+    try:
+        last_pass = datetime.strptime(problem.last_pass_date, "%Y-%m-%d").date()
+    except ValueError:
+        return UNKNOWN_DUE
+    return (last_pass + timedelta(days=review_interval(problem))).isoformat()
+
+
+def days_overdue(due: str, today: Optional[date] = None) -> Optional[int]:
+    """Days past the due date (negative if not due yet), None if unknown."""
+    if due == UNKNOWN_DUE:
+        return None
+    today = today or date.today()
+    return (today - datetime.strptime(due, "%Y-%m-%d").date()).days
+
+
+class ReviewIndex:
+    """Solved problems sorted by due date.
+
+    Create it before changing a problem, then call reschedule() after saving
+    the change, so the update can be applied incrementally.
+    """
+
+    def __init__(self, storage: ProblemStorage):
+        """Load (or rebuild) the index for a storage's data file."""
+        self.storage = storage
+        self.index_file = storage.data_file.parent / INDEX_FILE_NAME
+        self.entries = self._load()
+
+    def _load(self) -> List[Entry]:
+        """Get the index from memory, the index file, or by rebuilding it.
+
+        The file is skipped while saves are held in memory, as it doesn't
+        have them.
+        """
+        fingerprint = self.storage.fingerprint()
+        cached = _indexes.get(self.storage.data_file)
+        if cached and cached[0] == fingerprint:
+            return cached[1]
+
+        try:
+            if not self.storage.pending_writes:
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                if tuple(stored["fingerprint"]) == fingerprint:
+                    entries = [(due, url) for due, url in stored["entries"]]
+                    _indexes[self.storage.data_file] = (fingerprint, entries)
+                    return entries
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        entries = sorted(
+            (due_date(p), p.url)
+            for p in self.storage.load_problems().values()
+            if p.is_completed
+        )
+        self._save(entries)
+        return entries
+
+    def _save(self, entries: List[Entry]) -> None:
+        """Persist the index, tagged with the current data file fingerprint.
+
+        While saves are held in memory, only this process's copy is updated:
+        the entries include them, but the fingerprint is still that of the
+        file on disk.
+        """
+        fingerprint = self.storage.fingerprint()
+        _indexes[self.storage.data_file] = (fingerprint, entries)
+        if self.storage.pending_writes:
+            return
+        tmp_file = self.index_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint, "entries": entries}, f)
+        os.replace(tmp_file, self.index_file)
+
+    def reschedule(self, changes: Iterable[Tuple[Problem, Problem]]) -> None:
+        """Move problems to their new due dates after the change was saved.
+
+        ``changes`` holds (before, after) pairs.
+        """
+        for before, after in changes:
+            if before.is_completed:
+                old = (due_date(before), before.url)
+                i = bisect.bisect_left(self.entries, old)
+                if i < len(self.entries) and self.entries[i] == old:
+                    del self.entries[i]
+            if after.is_completed:
+                bisect.insort(self.entries, (due_date(after), after.url))
+        self._save(self.entries)
+
+    def iter_due(self, until: Optional[str] = None) -> Iterator[Tuple[str, Problem]]:
+        """Yield (due date, problem), most overdue first, up to ``until``.
+
+        Entries that no longer agree with the store (e.g. a change that was
+        never flushed) are skipped.
+        """
+        problems = self.storage.load_problems()
+        end = len(self.entries)
+        if until is not None:
+            end = bisect.bisect_right(self.entries, until, key=lambda e: e[0])
+        for i in range(end):
+            due, url = self.entries[i]
+            problem = problems.get(url)
+            if problem is not None and problem.is_completed and due_date(problem) == due:
+                yield due, problem
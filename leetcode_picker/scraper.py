@@ -3,26 +3,50 @@
 import re
 import time
 import sys
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import requests
 from bs4 import BeautifulSoup
 
-from .models import Problem
-
-# Study plan URLs
-STUDY_PLANS = {
-    "leetcode-75": "https://leetcode.com/studyplan/leetcode-75/",
-    "top-interview-150": "https://leetcode.com/studyplan/top-interview-150/",
-    "grind75": "https://www.techinterviewhandbook.org/grind75/",
-}
+from . import profiling, recording
+from .metrics import REGISTRY, Metrics
+from .models import STUDY_PLANS, Problem
+
+
+def merge_catalog(
+    problems: Dict[str, Problem], catalog: Iterable[Problem]
+) -> Tuple[int, int]:
+    """Merge scraped problems into a database, preserving completion data.
+
+    New problems are added as copies, so one catalog can be merged into
+    several databases. Returns (added, updated).
+    """
+    added = updated = 0
+    for problem in catalog:
+        existing = problems.get(problem.url)
+        if existing is not None:
+            # Update existing problem, preserve completion data
+            existing.title = problem.title
+            existing.difficulty = problem.difficulty
+            existing.study_plan_urls = list(problem.study_plan_urls)
+            updated += 1
+        else:
+            problems[problem.url] = Problem(
+                url=problem.url,
+                title=problem.title,
+                difficulty=problem.difficulty,
+                study_plan_urls=list(problem.study_plan_urls),
+            )
+            added += 1
+    return added, updated
 
 
 class LeetCodeScraper:
     """Scrapes LeetCode study plans for problem lists."""
 
-    def __init__(self):
+    def __init__(self, metrics: Optional[Metrics] = None):
         """Initialize scraper with session."""
+        self.metrics = metrics or REGISTRY
         self.session = requests.Session()
         self.session.headers.update(
             {
@@ -32,6 +56,9 @@ class LeetCodeScraper:
                 )
             }
         )
+        recording.attach(self.session)
+        profiling.instrument_session(self.session)
+        self.metrics.instrument_session(self.session, "scraper")
 
     def scrape_leetcode_study_plan(self, plan_name: str, plan_url: str) -> List[Problem]:
         """Scrape a LeetCode study plan for problem list."""
@@ -43,7 +70,8 @@ class LeetCodeScraper:
 
             # LeetCode uses GraphQL and dynamic loading, so we need to extract
             # the initial data from the page
-            soup = BeautifulSoup(response.content, "html.parser")
+            with profiling.phase("html parse"):
+                soup = BeautifulSoup(response.content, "html.parser")
 
             # Look for script tags containing problem data
             script_tags = soup.find_all("script")
@@ -74,6 +102,7 @@ class LeetCodeScraper:
                 problems = self._fallback_html_parsing(plan_url, soup)
 
         except requests.RequestException as e:
+            self.metrics.request_failed(e, "scraper")
             print(f"Error scraping {plan_name}: {e}")
 
         return problems
@@ -131,10 +160,12 @@ class LeetCodeScraper:
                 )
             resp.raise_for_status()
         except requests.RequestException as e:
+            self.metrics.request_failed(e, "scraper")
             print(f"Error scraping grind75: {e}")
             return problems
 
-        soup = BeautifulSoup(resp.content, "html.parser")
+        with profiling.phase("html parse"):
+            soup = BeautifulSoup(resp.content, "html.parser")
 
         # Extract LeetCode problem URLs from raw HTML (Next.js JSON), preserve order
         html = resp.text
@@ -229,6 +260,7 @@ class LeetCodeScraper:
                         )
                     js_resp.raise_for_status()
                 except requests.RequestException as e:
+                    self.metrics.request_failed(e, "scraper")
                     if verbose:
                         print(
                             f"[grind75] error fetching chunk {js_url}: {e}",
@@ -716,13 +748,15 @@ class LeetCodeScraper:
         # Scrape main study plans
         for plan_name, plan_url in STUDY_PLANS.items():
             print(f"Scraping {plan_name}...")
-            problems = self.scrape_leetcode_study_plan(plan_name, plan_url)
+            with profiling.phase("scrape study plan"):
+                problems = self.scrape_leetcode_study_plan(plan_name, plan_url)
             all_problems[plan_name] = problems
             time.sleep(1)  # Be nice to the server
 
         # Scrape Grind75
         print("Scraping Grind75...")
-        grind75_problems = self.scrape_grind75(verbose=verbose)
+        with profiling.phase("scrape grind75"):
+            grind75_problems = self.scrape_grind75(verbose=verbose)
         all_problems["grind75"] = grind75_problems
 
         return all_problems
@@ -746,26 +780,18 @@ class LeetCodeScraper:
                     # New problem
                     merged_problems[problem.url] = problem
 
-        # Save merged problems to database
-        existing_db_problems = storage.load_problems()
-        total_added = 0
-        total_updated = 0
-
-        for problem in merged_problems.values():
-            if problem.url in existing_db_problems:
-                # Update existing problem, preserve completion data
-                existing = existing_db_problems[problem.url]
-                existing.title = problem.title
-                existing.difficulty = problem.difficulty
-                existing.study_plan_urls = (
-                    problem.study_plan_urls
-                )  # Update with merged list
-                storage.add_or_update_problem(existing)
-                total_updated += 1
-            else:
-                # Add new problem
-                storage.add_or_update_problem(problem)
-                total_added += 1
+        # Save merged problems to database in a single write
+        counts: Dict[str, int] = {}
+
+        def apply(existing_db_problems: Dict[str, Problem]) -> bool:
+            counts["added"], counts["updated"] = merge_catalog(
+                existing_db_problems, merged_problems.values()
+            )
+            return bool(merged_problems)
+
+        storage.update(apply)
+        total_added = counts["added"]
+        total_updated = counts["updated"]
 
         print(
             f"Added {total_added} new problems, updated {total_updated} existing problems"
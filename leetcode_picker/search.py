@@ -0,0 +1,206 @@
+"""Trigram index over problem titles for fuzzy lookup by name.
+
+Titles are normalized to lowercase words and cut into trigrams, including
+the spaces around words ("lru cache" -> " lr", "lru", "ru ", "u c", " ca",
+...), so word boundaries and word order count. A lookup counts shared
+trigrams by walking only the posting lists of the query's trigrams, so it
+touches the titles that overlap the query instead of scoring every row.
+
+The index is persisted next to the database and tagged with a digest of the
+titles; it's rebuilt when they change (refresh and sync rebuild it eagerly).
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from .models import Problem
+from .storage import ProblemStorage
+
+INDEX_FILE_NAME = "title_index.json"
+
+# Bump when trigrams() changes so persisted indexes are rebuilt
+INDEX_VERSION = 1
+
+# Share of the query's trigrams a title must contain to be a candidate
+MIN_SCORE = 0.5
+
+# How far the best partial match must lead the next one to be picked alone
+MIN_LEAD = 0.1
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Index per data file, reused while the file's fingerprint matches
+_indexes: Dict[Path, Tuple[Tuple[int, int, int], "TitleIndex"]] = {}
+
+
+def normalize(text: str) -> str:
+    """Lowercase words separated by single spaces, punctuation dropped."""
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of the normalized text, padded with a space on each side."""
+    padded = f" {normalize(text)} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def titles_digest(problems: Dict[str, Problem]) -> str:
+    """Digest of every (url, title) pair, to tell when the index is stale."""
+    digest = hashlib.sha1()
+    for url, problem in sorted(problems.items()):
+        digest.update(f"{url}\t{problem.title}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class TitleIndex:
+    """Posting lists from trigram to the problems whose titles contain it."""
+
+    def __init__(
+        self,
+        urls: List[str],
+        titles: List[str],
+        sizes: List[int],
+        postings: Dict[str, List[int]],
+        digest: str,
+    ):
+        """Wrap prebuilt index data; use build() or for_storage()."""
+        self.urls = urls
+        self.titles = titles
+        self.sizes = sizes
+        self.postings = postings
+        self.digest = digest
+
+    @classmethod
+    def build(cls, problems: Dict[str, Problem]) -> "TitleIndex":
+        """Index the titles of ``problems``."""
+        urls: List[str] = []
+        titles: List[str] = []
+        sizes: List[int] = []
+        postings: Dict[str, List[int]] = {}
+        for i, (url, problem) in enumerate(sorted(problems.items())):
+            grams = trigrams(problem.title)
+            urls.append(url)
+            titles.append(normalize(problem.title))
+            sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        return cls(urls, titles, sizes, postings, titles_digest(problems))
+
+    @classmethod
+    def for_storage(cls, storage: ProblemStorage) -> "TitleIndex":
+        """Index for a storage's current titles, from memory, disk or rebuilt."""
+        fingerprint = storage.fingerprint()
+        cached = _indexes.get(storage.data_file)
+        if cached and cached[0] == fingerprint:
+            return cached[1]
+
+        problems = storage.load_problems()
+        digest = titles_digest(problems)
+        index = cls._read(storage.data_file.parent / INDEX_FILE_NAME)
+        if index is None or index.digest != digest:
+            index = cls.rebuild(storage)
+        _indexes[storage.data_file] = (fingerprint, index)
+        return index
+
+    @classmethod
+    def rebuild(cls, storage: ProblemStorage) -> "TitleIndex":
+        """Rebuild and persist the index from the storage's titles."""
+        index = cls.build(storage.load_problems())
+        index._write(storage.data_file.parent / INDEX_FILE_NAME)
+        _indexes[storage.data_file] = (storage.fingerprint(), index)
+        return index
+
+    @classmethod
+    def _read(cls, index_file: Path) -> Optional["TitleIndex"]:
+        """Load a persisted index, or None if missing or unreadable."""
+        try:
+            with open(index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data["version"] != INDEX_VERSION:
+                return None
+            return cls(
+                data["urls"],
+                data["titles"],
+                data["sizes"],
+                data["postings"],
+                data["digest"],
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write(self, index_file: Path) -> None:
+        """Persist the index atomically."""
+        data = {
+            "version": INDEX_VERSION,
+            "digest": self.digest,
+            "urls": self.urls,
+            "titles": self.titles,
+            "sizes": self.sizes,
+            "postings": self.postings,
+        }
+        tmp_file = index_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_file, index_file)
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[float, str]]:
+        """Best matching (score, url) pairs, best first.
+
+        The score is the share of the query's trigrams found in the title, so
+        partial titles ("lru") score as well as full ones; ties go to the
+        title with fewer extra trigrams. An exact title match scores above 1.
+        Only titles with at least MIN_SCORE are returned.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        hits: Counter = Counter()
+        for gram in grams:
+            hits.update(self.postings.get(gram, ()))
+
+        # Rank by shared trigrams (exact title first), then by fewest extra
+        # trigrams in the title, then by URL
+        needed = MIN_SCORE * len(grams)
+        wanted = normalize(query)
+        exact_bonus = len(grams)
+        top = heapq.nlargest(
+            limit,
+            (i for i, n in hits.items() if n >= needed),
+            key=lambda i: (
+                hits[i] + (exact_bonus if self.titles[i] == wanted else 0),
+                -self.sizes[i],
+                -i,
+            ),
+        )
+        return [
+            (
+                hits[i] / len(grams) + (1.0 if self.titles[i] == wanted else 0.0),
+                self.urls[i],
+            )
+            for i in top
+        ]
+
+
+def best_match(matches: List[Tuple[float, str]]) -> Optional[str]:
+    """The URL a search clearly points at, or None if it's ambiguous.
+
+    An exact title wins. Otherwise the top match is taken if it's the only
+    title containing the whole query, or, when none does (a misspelling), if
+    it leads the next match by at least MIN_LEAD.
+    """
+    if not matches:
+        return None
+    top = matches[0][0]
+    runner_up = matches[1][0] if len(matches) > 1 else 0.0
+    if top > 1.0:
+        return matches[0][1] if runner_up <= 1.0 else None
+    if top == 1.0:
+        return matches[0][1] if runner_up < 1.0 else None
+    return matches[0][1] if top - runner_up >= MIN_LEAD else None
@@ -0,0 +1,227 @@
+"""Persisted shuffle bags for picking problems without repeats.
+
+Each filter combination (solved vs. unsolved, difficulty, study plan, review
+age) gets a pre-shuffled queue of problem URLs. A pick pops from the end, so
+no problem repeats until its bag runs out, after which the bag is reshuffled
+from the current store. Entries are re-checked against the filter when popped,
+so problems that stopped matching are skipped; problems that start matching
+(completed, difficulty overridden) are slotted into existing bags by touch().
+"""
+
+import json
+import os
+import random
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .models import STUDY_PLANS, Problem
+
+QUEUE_FILE_NAME = "selection_queues.json"
+
+
+@dataclass(frozen=True)
+class Selection:
+    """A filter combination that owns one shuffle bag."""
+
+    solved: bool  # review (solved) vs. choose (unsolved)
+    difficulty: Optional[str] = None
+    study_plan: Optional[str] = None
+    weeks_ago: Optional[int] = None
+
+    @property
+    def key(self) -> str:
+        """Stable identifier used in the queue file."""
+        return "|".join(
+            [
+                "solved" if self.solved else "unsolved",
+                self.difficulty or "*",
+                self.study_plan or "*",
+                str(self.weeks_ago or "*"),
+            ]
+        )
+
+    def matches(self, problem: Problem) -> bool:
+        """Whether a problem belongs in this selection right now."""
+        if problem.is_completed != self.solved:
+            return False
+        if self.difficulty and problem.effective_difficulty != self.difficulty:
+            return False
+        if self.solved:
+            if self.weeks_ago:
+                cutoff = (datetime.now() - timedelta(weeks=self.weeks_ago)).strftime(
+                    "%Y-%m-%d"
+                )
+                return bool(problem.last_pass_date and problem.last_pass_date <= cutoff)
+            return True
+        if self.study_plan:
+            return any(self.study_plan in url for url in problem.study_plan_urls)
+        # Default: only problems from the main study plans
+        return any(
+            plan in url
+            for plan in STUDY_PLANS.values()
+            for url in problem.study_plan_urls
+        )
+
+
+def _rng(seed: Optional[int], *parts: object) -> random.Random:
+    """Deterministic generator for a seeded bag, fresh randomness otherwise."""
+    if seed is None:
+        return random.Random()
+    return random.Random(":".join(str(p) for p in (seed, *parts)))
+
+
+class SelectionQueues:
+    """Shuffle bags for every selection used so far, stored as JSON.
+
+    The file is read, changed and rewritten as a whole, so hold the problem
+    store's write lock around pops and touches from the first read on.
+    """
+
+    def __init__(self, data_dir: Path):
+        """Initialize with the data directory; the queue file is read lazily."""
+        self.queue_file = data_dir / QUEUE_FILE_NAME
+        self._bags: Optional[Dict[str, Dict]] = None
+
+    def _load(self) -> Dict[str, Dict]:
+        """Read the queue file once."""
+        if self._bags is None:
+            try:
+                with open(self.queue_file, "r", encoding="utf-8") as f:
+                    self._bags = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._bags = {}
+        assert self._bags is not None
+        return self._bags
+
+    def _save(self) -> None:
+        """Write all bags back atomically, through a temporary file of our own."""
+        self.queue_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.queue_file.parent, prefix=".selection_queues.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._load(), f)
+            os.replace(tmp_name, self.queue_file)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+    def _fill(
+        self,
+        selection: Selection,
+        problems: Dict[str, Problem],
+        seed: Optional[int],
+        last: Optional[str] = None,
+    ) -> Dict:
+        """(Re)build a bag from every matching problem, shuffled.
+
+        ``last`` (the previous bag's final pick) won't come up first, so the
+        boundary between two rounds doesn't repeat a problem back to back.
+        """
+        bags = self._load()
+        previous = bags.get(selection.key)
+        round_number = (
+            previous["round"] + 1 if previous and previous["seed"] == seed else 0
+        )
+        urls = sorted(url for url, p in problems.items() if selection.matches(p))
+        _rng(seed, round_number).shuffle(urls)
+        if len(urls) > 1 and urls[-1] == last:
+            urls[0], urls[-1] = urls[-1], urls[0]
+        bag = {"seed": seed, "round": round_number, "urls": urls, "last": last}
+        bags[selection.key] = bag
+        return bag
+
+    def pop(
+        self,
+        selection: Selection,
+        problems: Dict[str, Problem],
+        seed: Optional[int] = None,
+    ) -> Optional[Problem]:
+        """Take the next problem for a selection, or None if nothing matches.
+
+        Passing a different ``seed`` than the bag was built with starts a new,
+        reproducible shuffle.
+        """
+        picked = self.pop_many(selection, problems, 1, seed)
+        return picked[0] if picked else None
+
+    def pop_many(
+        self,
+        selection: Selection,
+        problems: Dict[str, Problem],
+        count: int,
+        seed: Optional[int] = None,
+        exclude: Optional[Set[str]] = None,
+    ) -> List[Problem]:
+        """Take up to ``count`` distinct problems for a selection.
+
+        URLs in ``exclude`` (already picked for the same set) are skipped and
+        have the picked URLs added to them. Fewer than ``count`` come back only
+        when the selection runs out of problems.
+        """
+        exclude = exclude if exclude is not None else set()
+        bags = self._load()
+        bag = bags.get(selection.key)
+        if bag is None or (seed is not None and bag["seed"] != seed):
+            bag = self._fill(selection, problems, seed)
+
+        picked: List[Problem] = []
+        refilled = False
+        while len(picked) < count:
+            while bag["urls"] and len(picked) < count:
+                url = bag["urls"].pop()
+                problem = problems.get(url)
+                if problem and url not in exclude and selection.matches(problem):
+                    picked.append(problem)
+                    exclude.add(url)
+            if len(picked) < count:
+                # Only one reshuffle per call: after it, everything left has
+                # been picked already
+                if refilled:
+                    break
+                bag = self._fill(selection, problems, bag["seed"], bag.get("last"))
+                refilled = True
+
+        if picked:
+            bag["last"] = picked[-1].url
+
+        self._save()
+        return picked
+
+    def touch(self, changes: Iterable[Tuple[Problem, Problem]]) -> None:
+        """Slot changed problems into existing bags they have started matching.
+
+        ``changes`` holds (before, after) pairs. Bags a problem no longer
+        matches drop it lazily when it's popped; bags it matched all along are
+        left alone, so it isn't repeated early.
+        """
+        bags = self._load()
+        changed = False
+        for before, after in changes:
+            for key, bag in bags.items():
+                if after.url in bag["urls"]:
+                    continue
+                solved, difficulty, study_plan, weeks_ago = key.split("|")
+                selection = Selection(
+                    solved=solved == "solved",
+                    difficulty=None if difficulty == "*" else difficulty,
+                    study_plan=None if study_plan == "*" else study_plan,
+                    weeks_ago=None if weeks_ago == "*" else int(weeks_ago),
+                )
+                if selection.matches(before) or not selection.matches(after):
+                    continue
+                urls: List[str] = bag["urls"]
+                rng = _rng(bag["seed"], bag["round"], after.url)
+                urls.insert(rng.randint(0, len(urls)), after.url)
+                changed = True
+        if changed:
+            self._save()
+
+    def clear(self) -> None:
+        """Drop every bag (after bulk changes such as sync or refresh)."""
+        self._bags = {}
+        self.queue_file.unlink(missing_ok=True)
@@ -0,0 +1,135 @@
+"""Interactive shell that runs CLI commands against one in-memory database.
+
+Commands are parsed with the regular CLI parser, so everything typed at the
+prompt works the same as ``leetcode-picker <command>``. The problem store is
+loaded once and saves are held in memory, then written in batches and on exit.
+"""
+
+import argparse
+import cmd
+import shlex
+from typing import List
+
+from .derived import after_flush
+from .main import create_parser, is_measured, run_command, run_measured
+from .storage import ProblemStorage
+
+# Flush held writes after this many saves
+DEFAULT_FLUSH_EVERY = 5
+
+# Commands that make no sense inside the shell
+EXCLUDED_COMMANDS = {"shell", "daemon"}
+
+
+class PickerShell(cmd.Cmd):
+    """Line-oriented shell over the leetcode-picker subcommands."""
+
+    intro = "leetcode-picker shell. Type 'help' for commands, 'exit' to quit."
+
+    def __init__(self, flush_every: int = DEFAULT_FLUSH_EVERY):
+        """Initialize with the batch size for flushing held writes."""
+        super().__init__()
+        self.flush_every = flush_every
+        self.parser = create_parser()
+        self.parser.prog = ""
+        self.storage = ProblemStorage()
+        self.storage.defer_writes()
+        self.storage.load_problems()
+
+    @property
+    def prompt(self) -> str:  # type: ignore[override]
+        """Prompt showing how many saves are still held in memory."""
+        pending = self.storage.pending_writes
+        return (
+            f"leetcode-picker ({pending} unsaved)> " if pending else "leetcode-picker> "
+        )
+
+    def emptyline(self) -> bool:
+        """Do nothing on an empty line (instead of repeating the last command)."""
+        return False
+
+    def default(self, line: str) -> None:
+        """Run a CLI subcommand."""
+        try:
+            argv = shlex.split(line)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+
+        try:
+            args = self.parser.parse_args(argv)
+        except SystemExit:
+            return  # argparse already printed the problem
+
+        if args.command in EXCLUDED_COMMANDS:
+            print(f"'{args.command}' isn't available inside the shell.")
+            return
+
+        run = run_measured if is_measured(args) else run_command
+        if run(args) != 0:
+            # A failed command may have left the snapshot half-modified; keep
+            # what was already saved, then re-read from disk
+            self.flush()
+            self.storage.invalidate_cache()
+
+        if self.storage.pending_writes >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write held saves, then the counters and review index that skipped them."""
+        if self.storage.pending_writes:
+            self.storage.flush()
+            after_flush(self.storage)
+
+    def completenames(self, text: str, *ignored: object) -> List[str]:
+        """Complete subcommand names."""
+        commands = [*self._subcommands(), "flush", "exit", "quit", "help"]
+        return [c for c in commands if c.startswith(text)]
+
+    def _subcommands(self) -> List[str]:
+        """Subcommand names known to the CLI parser."""
+        for action in self.parser._actions:
+            if isinstance(action, argparse._SubParsersAction):
+                return [c for c in action.choices if c not in EXCLUDED_COMMANDS]
+        return []
+
+    def do_help(self, arg: str) -> None:
+        """Show help for the shell or for one command."""
+        if arg:
+            self.default(f"{arg} --help")
+            return
+        print("Commands: " + ", ".join(self._subcommands()))
+        print("Shell: flush (write pending changes), exit/quit (flush and leave)")
+        print("Use '<command> --help' for a command's options.")
+
+    def do_flush(self, arg: str) -> None:
+        """Write pending changes to disk now."""
+        pending = self.storage.pending_writes
+        self.flush()
+        print(f"Flushed {pending} pending saves." if pending else "Nothing to flush.")
+
+    def do_exit(self, arg: str) -> bool:
+        """Flush pending changes and leave the shell."""
+        return True
+
+    do_quit = do_exit
+
+    def do_EOF(self, arg: str) -> bool:
+        """Leave on Ctrl-D."""
+        print()
+        return True
+
+
+def run_shell(flush_every: int = DEFAULT_FLUSH_EVERY) -> None:
+    """Run the interactive shell, flushing held writes however it exits."""
+    shell = PickerShell(flush_every)
+    try:
+        while True:
+            try:
+                shell.cmdloop()
+                break
+            except KeyboardInterrupt:
+                print("^C")
+                shell.intro = ""
+    finally:
+        shell.flush()
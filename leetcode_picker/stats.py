@@ -0,0 +1,315 @@
+"""Solve statistics over the problem database and the synced submission history.
+
+Both sources are turned into NumPy columns once (dates as int days since
+1970-01-01, difficulties as small int codes), and every report is a handful
+of array operations over them, so reports stay instant at hundreds of
+thousands of submissions. The columns are cached in ``stats_columns.npz``,
+tagged with the fingerprints of problems.csv and submissions.jsonl, so
+they're only rebuilt after a sync or a change to the database.
+
+Without a synced history, solves are taken from each problem's last pass
+date, which only knows the latest solve of every problem.
+
+NumPy is an optional dependency: ``pip install 'leetcode-picker[stats]'``.
+"""
+
+import os
+import zipfile
+from array import array
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .history import SubmissionHistory
+from .picking import DIFFICULTIES
+from .storage import HISTORY_FILE_NAME, ProblemStorage
+
+COLUMNS_FILE_NAME = "stats_columns.npz"
+
+
+# Difficulty code of problems with no known difficulty (submissions to
+# problems that aren't in the database)
+UNKNOWN = len(DIFFICULTIES)
+
+# Submission status LeetCode reports for an accepted solution
+ACCEPTED = 10
+
+# Day number of problems solved without a recorded date
+UNDATED = -1
+
+EPOCH = date(1970, 1, 1).toordinal()
+
+DEFAULT_WEEKS = 12
+
+# Age thresholds of the stale report, in days since the last solve
+STALE_DAYS = (30, 90, 180, 365)
+
+# Per problem (index = row in problems.csv)
+PROBLEM_COLUMNS = ("difficulty", "completions", "submissions", "last_day")
+
+
+def _numpy() -> Any:
+    """Import NumPy, explaining how to get it if it's missing."""
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError(
+            "stats needs NumPy; install it with: pip install 'leetcode-picker[stats]'"
+        ) from None
+    return numpy
+
+
+def day_number(day: date) -> int:
+    """Days since 1970-01-01."""
+    return day.toordinal() - EPOCH
+
+
+def day_date(number: int) -> date:
+    """Inverse of day_number()."""
+    return date.fromordinal(int(number) + EPOCH)
+
+
+def monday(days: Any) -> Any:
+    """Day number of the Monday starting each day's week (1970-01-01 was a Thursday)."""
+    return days - (days + 3) % 7
+
+
+def _difficulty_code(difficulty: str) -> int:
+    """Index of a difficulty in DIFFICULTIES, or UNKNOWN."""
+    try:
+        return DIFFICULTIES.index(difficulty.lower())
+    except ValueError:
+        return UNKNOWN
+
+
+def _last_day(last_pass_date: Optional[str]) -> int:
+    """Day number of a YYYY-MM-DD date, or UNDATED."""
+    try:
+        return day_number(date.fromisoformat(last_pass_date or ""))
+    except ValueError:
+        return UNDATED
+
+
+class SolveStats:
+    """Columns built from a database and its history, and the reports over them."""
+
+    def __init__(
+        self, storage: Optional[ProblemStorage] = None, today: Optional[date] = None
+    ):
+        """Load the columns for ``storage`` (default: ~/.leetcode-picker)."""
+        self.np = _numpy()
+        self.storage = storage or ProblemStorage()
+        self.metrics = self.storage.metrics
+        self.history_file = self.storage.data_file.parent / HISTORY_FILE_NAME
+        self.columns_file = self.storage.data_file.parent / COLUMNS_FILE_NAME
+        self.today = day_number(today or date.today())
+        # Whether the columns were rebuilt instead of read from the cache
+        self.rebuilt = False
+        self.columns = self._load()
+
+    @property
+    def has_history(self) -> bool:
+        """Whether there is a synced submission history to report from."""
+        return len(self.columns["day"]) > 0
+
+    def _key(self) -> Any:
+        """Fingerprints of the data file and the history (zeros if there's none)."""
+        history = (0, 0, 0)
+        if self.history_file.exists():
+            st = os.stat(self.history_file)
+            history = (st.st_mtime_ns, st.st_size, st.st_ino)
+        return self.np.array([*self.storage.fingerprint(), *history], dtype=self.np.int64)
+
+    def _load(self) -> Dict[str, Any]:
+        """Cached columns if both sources are unchanged, else rebuilt ones."""
+        np = self.np
+        # Taken before reading: a write in between only causes a rebuild
+        key = self._key()
+        try:
+            with np.load(self.columns_file, allow_pickle=False) as data:
+                if np.array_equal(data["key"], key):
+                    self.metrics.inc("cache_hits_total", cache="stats")
+                    return {name: data[name] for name in data.files if name != "key"}
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            pass
+        self.metrics.inc("cache_misses_total", cache="stats")
+        self.rebuilt = True
+        columns = self._build()
+        self._save(key, columns)
+        return columns
+
+    def _save(self, key: Any, columns: Dict[str, Any]) -> None:
+        """Store the columns with the fingerprints they were built from."""
+        tmp_file = self.columns_file.with_suffix(".tmp")
+        with open(tmp_file, "wb") as f:
+            self.np.savez(f, key=key, **columns)
+        os.replace(tmp_file, self.columns_file)
+
+    def _build(self) -> Dict[str, Any]:
+        """Read both sources once, one row at a time, into typed arrays."""
+        np = self.np
+        ids: Dict[str, int] = {}
+        problem = {name: array("i") for name in PROBLEM_COLUMNS}
+        for p in self.storage.iter_problems():
+            ids[p.url.rstrip("/").rsplit("/", 1)[-1]] = len(ids)
+            problem["difficulty"].append(_difficulty_code(p.effective_difficulty))
+            problem["completions"].append(p.completions)
+            problem["submissions"].append(p.submissions)
+            problem["last_day"].append(_last_day(p.last_pass_date))
+
+        timestamps = array("q")
+        accepted = array("b")
+        submission_problem = array("i")
+        if self.history_file.exists():
+            for record in SubmissionHistory(self.history_file.parent).read():
+                try:
+                    timestamp = int(record.get("timestamp") or 0)
+                except (TypeError, ValueError):
+                    continue
+                slug = record.get("titleSlug") or ""
+                if slug not in ids:
+                    ids[slug] = len(ids)
+                timestamps.append(timestamp)
+                accepted.append(record.get("status") == ACCEPTED)
+                submission_problem.append(ids[slug])
+
+        columns = {
+            name: np.frombuffer(values, dtype=np.int32).copy()
+            for name, values in problem.items()
+        }
+        id_difficulty = np.full(len(ids), UNKNOWN, dtype=np.int8)
+        id_difficulty[: len(columns["difficulty"])] = columns["difficulty"]
+        columns["difficulty"] = columns["difficulty"].astype(np.int8)
+        columns["id_difficulty"] = id_difficulty
+
+        # Local calendar days, as the last pass dates sync writes
+        offset = datetime.now().astimezone().utcoffset()
+        seconds = np.frombuffer(timestamps, dtype=np.int64)
+        if offset is not None:
+            seconds = seconds + int(offset.total_seconds())
+        columns["day"] = (seconds // 86400).astype(np.int32)
+        columns["accepted"] = np.frombuffer(accepted, dtype=np.int8).astype(bool)
+        # Indexes id_difficulty: the database's problems, then any other slug
+        # the history mentions
+        columns["problem"] = np.frombuffer(submission_problem, dtype=np.int32).copy()
+        return columns
+
+    def weekly(self, weeks: int = DEFAULT_WEEKS) -> List[Dict[str, Any]]:
+        """Per week, oldest first: problems solved, by difficulty, and more.
+
+        Each row has "week" (its Monday), "solved" (distinct problems solved
+        that week), "mix" (those by difficulty, in DIFFICULTIES order), and,
+        from the history only, "new" (problems solved for the first time)
+        and "submissions" (all submissions); those two are None without one.
+        """
+        np = self.np
+        c = self.columns
+        first = monday(self.today) - 7 * (weeks - 1)
+        n_codes = UNKNOWN + 1
+
+        new = submissions = None
+        if self.has_history:
+            week = (monday(c["day"]) - first) // 7
+            inside = (week >= 0) & (week < weeks)
+            submissions = np.bincount(week[inside], minlength=weeks)
+
+            solved_day = c["day"][c["accepted"]]
+            solved_problem = c["problem"][c["accepted"]].astype(np.int64)
+            solved_week = week[c["accepted"]]
+
+            # First accepted submission of each problem
+            order = np.lexsort((solved_day, solved_problem))
+            _, first_index = np.unique(solved_problem[order], return_index=True)
+            first_week = solved_week[order][first_index]
+            new = np.bincount(
+                first_week[(first_week >= 0) & (first_week < weeks)], minlength=weeks
+            )
+
+            # Distinct (week, problem) pairs: a problem solved twice in a week
+            # counts once
+            keep = (solved_week >= 0) & (solved_week < weeks)
+            n_ids = max(len(c["id_difficulty"]), 1)
+            pairs = np.unique(
+                solved_week[keep].astype(np.int64) * n_ids + solved_problem[keep]
+            )
+            pair_week = pairs // n_ids
+            pair_code = c["id_difficulty"][pairs % n_ids]
+        else:
+            solved = (c["completions"] > 0) & (c["last_day"] != UNDATED)
+            pair_week = (monday(c["last_day"][solved]) - first) // 7
+            pair_code = c["difficulty"][solved]
+            keep = (pair_week >= 0) & (pair_week < weeks)
+            pair_week, pair_code = pair_week[keep], pair_code[keep]
+
+        mix = np.bincount(
+            pair_week.astype(np.int64) * n_codes + pair_code, minlength=weeks * n_codes
+        ).reshape(weeks, n_codes)
+
+        return [
+            {
+                "week": day_date(first + 7 * i).isoformat(),
+                "solved": int(mix[i].sum()),
+                "mix": [int(n) for n in mix[i, :UNKNOWN]],
+                "new": None if new is None else int(new[i]),
+                "submissions": None if submissions is None else int(submissions[i]),
+            }
+            for i in range(weeks)
+        ]
+
+    def submissions_per_completion(self) -> Dict[str, Tuple[int, int]]:
+        """(submissions, accepted) per difficulty.
+
+        From the history when there is one: the database's submission counts
+        only cover what was marked locally (sync records accepted ones only).
+        """
+        np = self.np
+        c = self.columns
+        n_codes = UNKNOWN + 1
+        if self.has_history:
+            code = c["id_difficulty"][c["problem"]]
+            total = np.bincount(code, minlength=n_codes)
+            accepted = np.bincount(code[c["accepted"]], minlength=n_codes)
+        else:
+            total = np.bincount(
+                c["difficulty"], weights=c["submissions"], minlength=n_codes
+            )
+            accepted = np.bincount(
+                c["difficulty"], weights=c["completions"], minlength=n_codes
+            )
+        return {
+            difficulty: (int(total[i]), int(accepted[i]))
+            for i, difficulty in enumerate(DIFFICULTIES)
+        }
+
+    def stale(
+        self, thresholds: Tuple[int, ...] = STALE_DAYS
+    ) -> List[Tuple[str, List[int]]]:
+        """Solved problems by how long ago they were last solved, per difficulty.
+
+        Rows are ("30", counts) for "last solved at least 30 days ago" and so
+        on, then ("undated", counts) for solves without a date.
+        """
+        np = self.np
+        c = self.columns
+        solved = c["completions"] > 0
+        dated = c["last_day"] != UNDATED
+        age = self.today - c["last_day"]
+
+        def by_difficulty(mask: Any) -> List[int]:
+            counts = np.bincount(c["difficulty"][mask], minlength=UNKNOWN + 1)
+            return [int(n) for n in counts[:UNKNOWN]]
+
+        rows = [
+            (str(days), by_difficulty(solved & dated & (age >= days)))
+            for days in thresholds
+        ]
+        rows.append(("undated", by_difficulty(solved & ~dated)))
+        return rows
+
+    def totals(self) -> Dict[str, int]:
+        """Problems solved, submissions in the history, and its first day."""
+        c = self.columns
+        return {
+            "solved": int((c["completions"] > 0).sum()),
+            "submissions": len(c["day"]),
+            "first_day": int(c["day"].min()) if self.has_history else UNDATED,
+        }
@@ -1,14 +1,34 @@
 """CSV storage for problem data."""
 
+import contextlib
 import csv
 import json
+import os
+import sys
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
+from . import profiling
+from .metrics import REGISTRY, Metrics
 from .models import Problem
 
 DEFAULT_DATA_FILE = Path.home() / ".leetcode-picker" / "problems.csv"
 
+# Per-account data directories (NAME/problems.csv) for sync-all and
+# cohort-progress
+DEFAULT_COHORT_DIR = DEFAULT_DATA_FILE.parent / "cohort"
+
+# Study plan problems shared by the cohort, in DEFAULT_COHORT_DIR
+CATALOG_FILE_NAME = "catalog.csv"
+
+# Problem slugs, one per line, next to the data file; shell completion reads
+# it directly so it never has to start Python
+COMPLETION_FILE_NAME = "completions.txt"
+
+# Submission history fetched by sync, next to the data file
+HISTORY_FILE_NAME = "submissions.jsonl"
+
 # CSV headers
 HEADERS = [
     "url",
@@ -21,13 +41,134 @@ HEADERS = [
     "overridden_difficulty",
 ]
 
+# Lock file next to the data file. Writers hold an exclusive lock on it while
+# they check for conflicts and replace the data file; its first bytes are a
+# write counter that readers check without locking.
+LOCK_SUFFIX = ".lock"
+VERSION_WIDTH = 20
+
+# A change to the problems: mutates the dict, returns whether it changed it
+Change = Callable[[Dict[str, Problem]], bool]
+
+# Parsed problems per data file, reused while the file is unchanged on disk.
+# Keyed by (mtime_ns, size, inode); any write through save_problems refreshes it.
+_snapshots: Dict[Path, Tuple[Tuple[int, int, int], Dict[str, Problem]]] = {}
+
+# Write counter each snapshot was read at, to detect writes made since
+_versions: Dict[Path, int] = {}
+
+# Data files whose saves are held in memory until flushed, with the changes
+# pending for each; None for a plain save, which can't be replayed (see
+# ProblemStorage.defer_writes)
+_deferred: Dict[Path, List[Optional[Change]]] = {}
+
+
+def _file_key(path: Path) -> Tuple[int, int, int]:
+    """Cheap change detector for a data file."""
+    return _stat_key(os.stat(path))
+
+
+def _stat_key(st: os.stat_result) -> Tuple[int, int, int]:
+    """(mtime_ns, size, inode) of a stat result."""
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+if sys.platform == "win32":
+    import msvcrt
+
+    # Lock a byte past the counter, so lock-free readers can still read it
+    _LOCK_OFFSET = VERSION_WIDTH + 1
+
+    def _lock(fd: int) -> None:
+        """Block until the exclusive lock on ``fd`` is ours."""
+        os.lseek(fd, _LOCK_OFFSET, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after ten seconds; keep waiting
+                continue
+
+    def _unlock(fd: int) -> None:
+        """Release the lock taken by _lock."""
+        os.lseek(fd, _LOCK_OFFSET, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock(fd: int) -> None:
+        """Block until the exclusive lock on ``fd`` is ours."""
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock(fd: int) -> None:
+        """Release the lock taken by _lock."""
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Make a rename in ``directory`` durable, where the OS supports it."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _read_version(fd: int) -> int:
+    """Write counter stored at the start of a lock file."""
+    os.lseek(fd, 0, os.SEEK_SET)
+    data = os.read(fd, VERSION_WIDTH)
+    try:
+        return int(data) if data.strip() else 0
+    except ValueError:
+        # Caught mid-write; never matches a snapshot, so writers re-read
+        return -1
+
+
+def _parse_row(row: Dict[str, str]) -> Problem:
+    """Build a Problem from a CSV row."""
+    # Handle backward compatibility for old format
+    if "study_plan_url" in row:
+        # Old format - single URL
+        study_plan_urls = [row["study_plan_url"]] if row["study_plan_url"] else []
+    else:
+        # New format - JSON array of URLs
+        try:
+            study_plan_urls = (
+                json.loads(row["study_plan_urls"]) if row["study_plan_urls"] else []
+            )
+        except (json.JSONDecodeError, KeyError):
+            study_plan_urls = []
+
+    return Problem(
+        url=row["url"],
+        title=row["title"],
+        difficulty=row["difficulty"],
+        study_plan_urls=study_plan_urls,
+        last_pass_date=row["last_pass_date"] or None,
+        completions=int(row["completions"]) if row["completions"] else 0,
+        submissions=int(row["submissions"]) if row["submissions"] else 0,
+        overridden_difficulty=row["overridden_difficulty"] or None,
+    )
+
 
 class ProblemStorage:
     """Handles CSV storage and retrieval of problem data."""
 
-    def __init__(self, data_file: Optional[Path] = None):
-        """Initialize storage with optional custom data file path."""
+    def __init__(
+        self, data_file: Optional[Path] = None, metrics: Optional[Metrics] = None
+    ):
+        """Initialize storage with optional custom data file path and metrics."""
         self.data_file = data_file or DEFAULT_DATA_FILE
+        self.metrics = metrics or REGISTRY
+        self.lock_file = self.data_file.with_name(self.data_file.name + LOCK_SUFFIX)
+        # Whether the last update() had to be re-applied to another
+        # process's newer data
+        self.rebased = False
         self._ensure_data_file_exists()
 
     def _ensure_data_file_exists(self) -> None:
@@ -40,47 +181,222 @@ class ProblemStorage:
                 writer = csv.DictWriter(f, fieldnames=HEADERS)
                 writer.writeheader()
 
+    def fingerprint(self) -> Tuple[int, int, int]:
+        """Identify the data file's current contents on disk (cheap stat)."""
+        return _file_key(self.data_file)
+
+    def invalidate_cache(self) -> None:
+        """Drop the cached snapshot so the next load re-reads the file."""
+        _snapshots.pop(self.data_file, None)
+
+    def defer_writes(self) -> None:
+        """Hold saves to this data file in memory until flush() is called.
+
+        Applies to every ProblemStorage on the same file in this process, so
+        commands keep working against the in-memory snapshot.
+        """
+        _deferred.setdefault(self.data_file, [])
+
+    @property
+    def deferred(self) -> bool:
+        """Whether saves to this data file are being held in memory."""
+        return self.data_file in _deferred
+
+    @property
+    def pending_writes(self) -> int:
+        """Number of deferred saves not yet written to disk."""
+        return len(_deferred.get(self.data_file, []))
+
+    def flush(self) -> None:
+        """Write out deferred saves, if any.
+
+        If the cached snapshot was dropped, or another process wrote the file
+        in the meantime, the pending update() changes are re-applied to a
+        fresh read; a plain save_problems() among them means the in-memory
+        copy wins instead, as long as it's still cached.
+        """
+        if not self.pending_writes:
+            return
+        pending = _deferred[self.data_file]
+        with self.write_lock() as fd:
+            cached = _snapshots.get(self.data_file)
+            self.rebased = cached is None or (
+                None not in pending and self.changed_since_load()
+            )
+            if cached is not None and not self.rebased:
+                problems = cached[1]
+            else:
+                self.invalidate_cache()
+                problems = self._load_problems(_read_version(fd))
+                for change in pending:
+                    if change is not None:
+                        change(problems)
+            self._commit(fd, problems)
+        pending.clear()
+
+    def current_version(self) -> int:
+        """The data file's write counter, read without locking."""
+        try:
+            fd = os.open(self.lock_file, os.O_RDONLY)
+        except FileNotFoundError:
+            return 0
+        try:
+            return _read_version(fd)
+        finally:
+            os.close(fd)
+
+    @contextlib.contextmanager
+    def write_lock(self) -> Iterator[int]:
+        """Hold the cross-process write lock; yields the lock file descriptor.
+
+        Not reentrant: update() and save_problems() take it themselves.
+        """
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            _lock(fd)
+            try:
+                yield fd
+            finally:
+                _unlock(fd)
+        finally:
+            os.close(fd)
+
+    def changed_since_load(self) -> bool:
+        """Whether the file was written since the cached snapshot was read.
+
+        Checks the write counter and the file's fingerprint, so edits made
+        outside the picker are caught too. Only final with the write lock held.
+        """
+        cached = _snapshots.get(self.data_file)
+        if cached is None:
+            return True
+        return (
+            self.current_version() != _versions.get(self.data_file)
+            or _file_key(self.data_file) != cached[0]
+        )
+
     def load_problems(self) -> Dict[str, Problem]:
-        """Load all problems from CSV file, indexed by URL."""
+        """Load all problems from CSV file, indexed by URL.
+
+        The parsed result is cached until the file changes, and callers share
+        it: mutate problems only to save them back.
+        """
+        cached = _snapshots.get(self.data_file)
+        if cached and self.data_file in _deferred:
+            self.metrics.inc("cache_hits_total", cache="snapshot")
+            return cached[1]
+        key = _file_key(self.data_file)
+        if cached and cached[0] == key:
+            self.metrics.inc("cache_hits_total", cache="snapshot")
+            return cached[1]
+
+        self.metrics.inc("cache_misses_total", cache="snapshot")
+        return self._load_problems(self.current_version())
+
+    def _load_problems(self, version: int) -> Dict[str, Problem]:
+        """Read and cache the file, recording the write counter it was read at.
+
+        The counter is read first: if a write lands in between, the snapshot
+        looks older than it is, which costs a retry but never loses a write.
+        """
+        start = time.perf_counter()
         problems = {}
 
-        with open(self.data_file, "r", encoding="utf-8") as f:
+        with profiling.phase("storage load") as timed, open(
+            self.data_file, "r", encoding="utf-8"
+        ) as f:
+            # The file is only ever replaced, so this is what's being read
+            key = _stat_key(os.fstat(f.fileno()))
+            timed.add_bytes(key[1])
             reader = csv.DictReader(f)
             for row in reader:
-                # Handle backward compatibility for old format
-                if "study_plan_url" in row:
-                    # Old format - single URL
-                    study_plan_urls = (
-                        [row["study_plan_url"]] if row["study_plan_url"] else []
-                    )
-                else:
-                    # New format - JSON array of URLs
-                    try:
-                        study_plan_urls = (
-                            json.loads(row["study_plan_urls"])
-                            if row["study_plan_urls"]
-                            else []
-                        )
-                    except (json.JSONDecodeError, KeyError):
-                        study_plan_urls = []
-
-                problem = Problem(
-                    url=row["url"],
-                    title=row["title"],
-                    difficulty=row["difficulty"],
-                    study_plan_urls=study_plan_urls,
-                    last_pass_date=row["last_pass_date"] or None,
-                    completions=int(row["completions"]) if row["completions"] else 0,
-                    submissions=int(row["submissions"]) if row["submissions"] else 0,
-                    overridden_difficulty=row["overridden_difficulty"] or None,
-                )
+                problem = _parse_row(row)
                 problems[problem.url] = problem
 
+        self.metrics.inc("storage_loads_total")
+        self.metrics.inc("storage_bytes_total", key[1], op="load")
+        self.metrics.observe(
+            "storage_duration_seconds", time.perf_counter() - start, op="load"
+        )
+        _snapshots[self.data_file] = (key, problems)
+        _versions[self.data_file] = version
         return problems
 
+    def iter_problems(self) -> Iterator[Problem]:
+        """Yield the problems one at a time, without caching the parsed file.
+
+        For one-pass reports over many data files, where keeping every
+        file's problems in memory would cost too much. A cached snapshot
+        that is still current is reused.
+        """
+        cached = _snapshots.get(self.data_file)
+        if cached and cached[0] == _file_key(self.data_file):
+            yield from cached[1].values()
+            return
+        with open(self.data_file, "r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield _parse_row(row)
+
     def save_problems(self, problems: Dict[str, Problem]) -> None:
-        """Save all problems to CSV file."""
-        with open(self.data_file, "w", newline="", encoding="utf-8") as f:
+        """Save all problems to CSV file (or hold them in memory if deferred).
+
+        The file is replaced as a whole, so whatever another process wrote
+        since ``problems`` was loaded is overwritten; prefer update() for
+        changes to a few problems.
+        """
+        if self.data_file in _deferred:
+            cached = _snapshots.get(self.data_file)
+            _snapshots[self.data_file] = (cached[0] if cached else (0, 0, 0), problems)
+            _deferred[self.data_file].append(None)
+            return
+        with self.write_lock() as fd:
+            self._commit(fd, problems)
+
+    def update(self, change: Change) -> bool:
+        """Apply ``change`` to the problems and save them, keeping other writes.
+
+        Readers never lock. ``change`` runs on the cached snapshot first; if
+        another process wrote the file since that snapshot was read, it runs
+        again, under the write lock, on a fresh read (``rebased`` is then
+        True). It must therefore work only from the dict it's given and
+        reset any results it collects. Returns whether anything was saved.
+        """
+        problems = self.load_problems()
+        self.rebased = False
+        if not change(problems):
+            return False
+        if self.data_file in _deferred:
+            _deferred[self.data_file].append(change)
+            return True
+
+        with self.write_lock() as fd:
+            if self.changed_since_load():
+                self.rebased = True
+                self.invalidate_cache()
+                problems = self._load_problems(_read_version(fd))
+                if not change(problems):
+                    return False
+            self._commit(fd, problems)
+        return True
+
+    def _commit(self, fd: int, problems: Dict[str, Problem]) -> None:
+        """Replace the file and bump the write counter; needs the write lock."""
+        self._write_problems(problems)
+        version = _read_version(fd) + 1
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, f"{version:0{VERSION_WIDTH}d}".encode("ascii"))
+        _versions[self.data_file] = version
+
+    def _write_problems(self, problems: Dict[str, Problem]) -> None:
+        """Write all problems to a temporary file and move it over the CSV file.
+
+        Readers see the old file or the new one, never a partial write.
+        """
+        start = time.perf_counter()
+        tmp_file = self.data_file.with_name(f".{self.data_file.name}.{os.getpid()}.tmp")
+        with profiling.phase("storage save") as timed, open(
+            tmp_file, "w", newline="", encoding="utf-8"
+        ) as f:
             writer = csv.DictWriter(f, fieldnames=HEADERS)
             writer.writeheader()
 
@@ -97,12 +413,37 @@ class ProblemStorage:
                         "overridden_difficulty": problem.overridden_difficulty or "",
                     }
                 )
+            timed.add_bytes(f.tell())
+            self.metrics.inc("storage_bytes_total", f.tell(), op="write")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.data_file)
+        _fsync_directory(self.data_file.parent)
+
+        self.metrics.inc("storage_writes_total")
+        self.metrics.observe(
+            "storage_duration_seconds", time.perf_counter() - start, op="write"
+        )
+        _snapshots[self.data_file] = (_file_key(self.data_file), problems)
+        self.write_completions(problems)
+
+    def write_completions(self, problems: Dict[str, Problem]) -> None:
+        """Write the problem slugs for shell completion."""
+        completion_file = self.data_file.parent / COMPLETION_FILE_NAME
+        tmp_file = completion_file.with_name(f".{completion_file.name}.{os.getpid()}.tmp")
+        slugs = sorted({url.rstrip("/").rsplit("/", 1)[-1] for url in problems})
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write("".join(f"{slug}\n" for slug in slugs))
+        os.replace(tmp_file, completion_file)
 
     def add_or_update_problem(self, problem: Problem) -> None:
         """Add a new problem or update an existing one."""
-        problems = self.load_problems()
-        problems[problem.url] = problem
-        self.save_problems(problems)
+
+        def change(problems: Dict[str, Problem]) -> bool:
+            problems[problem.url] = problem
+            return True
+
+        self.update(change)
 
     def get_problem(self, url: str) -> Optional[Problem]:
         """Get a specific problem by URL."""
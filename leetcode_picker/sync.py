@@ -1,98 +1,444 @@
 """Sync LeetCode submission history with local database."""
 
-from typing import Dict, List, Optional
-
-from .auth import LeetCodeAuth
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from . import profiling
+from .auth import CURRENT_USER_FIELD, GraphQLError, GraphQLField, LeetCodeAuth
+from .history import SubmissionHistory
+from .metrics import REGISTRY, Metrics
+from .models import Problem
 from .storage import ProblemStorage
 
+T = TypeVar("T")
+
+# LeetCode seems to ignore this and returns ~20 per page
+SUBMISSION_PAGE_LIMIT = 50
+
+# Retries per submissions page before a sync stops (and can be resumed later)
+PAGE_RETRIES = 3
+
+# Initial retry delay in seconds; doubles on each attempt
+RETRY_DELAY = 2.0
+
+# Question metadata lookups merged into one aliased request
+QUESTION_BATCH_SIZE = 50
+
+# Question list page size; unlike submissionList, questionList honors the limit
+PROBLEMSET_PAGE_SIZE = 100
+
+# Status filters for the problemset question list, keyed by the per-question
+# status value LeetCode reports back ("ac" = solved, "notac" = attempted)
+PROBLEMSET_STATUS_FILTERS = {"ac": "AC", "notac": "TRIED"}
+
+
+def submission_list_field(offset: int = 0, limit: int = 100) -> GraphQLField:
+    """Selection for one page of the user's submission history."""
+    return GraphQLField(
+        """
+        submissionList(offset: $offset, limit: $limit) {
+            submissions {
+                id
+                title
+                titleSlug
+                status
+                statusDisplay
+                lang
+                timestamp
+                url
+                isPending
+                memory
+                runtime
+                __typename
+            }
+            hasNext
+        }
+        """,
+        variables={"offset": offset, "limit": limit},
+        variable_types={"offset": "Int", "limit": "Int"},
+    )
+
+
+def question_field(title_slug: str) -> GraphQLField:
+    """Selection for one question's metadata."""
+    return GraphQLField(
+        """
+        question(titleSlug: $titleSlug) {
+            title
+            titleSlug
+            difficulty
+        }
+        """,
+        variables={"titleSlug": title_slug},
+        variable_types={"titleSlug": "String!"},
+    )
+
+
+def problemset_field(
+    status_filter: str, skip: int = 0, limit: int = PROBLEMSET_PAGE_SIZE
+) -> GraphQLField:
+    """Selection for one page of the problemset question list filtered by status."""
+    return GraphQLField(
+        """
+        questionList(
+            categorySlug: $categorySlug, limit: $limit, skip: $skip, filters: $filters
+        ) {
+            total: totalNum
+            questions: data {
+                title
+                titleSlug
+                difficulty
+                status
+            }
+        }
+        """,
+        variables={
+            "categorySlug": "",
+            "skip": skip,
+            "limit": limit,
+            "filters": {"status": status_filter},
+        },
+        variable_types={
+            "categorySlug": "String",
+            "limit": "Int",
+            "skip": "Int",
+            "filters": "QuestionListFilterInput",
+        },
+    )
+
+
+class QuestionCache:
+    """Local cache of question metadata (title, difficulty) keyed by slug.
+
+    Can be shared by syncs running in several threads (see sync-all).
+    """
+
+    def __init__(self, cache_file: Path):
+        """Initialize with the cache file path; the file is read lazily."""
+        self.cache_file = cache_file
+        self._entries: Optional[Dict[str, Dict]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict]:
+        """Read the cache file once."""
+        with self._lock:
+            if self._entries is None:
+                try:
+                    with open(self.cache_file, "r", encoding="utf-8") as f:
+                        self._entries = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    self._entries = {}
+        assert self._entries is not None
+        return self._entries
+
+    def get(self, slug: str) -> Optional[Dict]:
+        """Get cached metadata for a slug."""
+        return self._load().get(slug)
+
+    def set(self, slug: str, info: Dict) -> None:
+        """Cache metadata for a slug."""
+        entries = self._load()
+        with self._lock:
+            entries[slug] = info
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache back if anything was added."""
+        entries = self._load()
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_file = self.cache_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(dict(entries), f)
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
+
 
 class LeetCodeSync:
     """Syncs LeetCode submission data with local problem database."""
 
-    def __init__(self):
-        """Initialize sync with auth and storage."""
-        self.auth = LeetCodeAuth()
-        self.storage = ProblemStorage()
+    def __init__(
+        self,
+        auth: Optional[LeetCodeAuth] = None,
+        storage: Optional[ProblemStorage] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        """Initialize sync with auth, storage and local submission history."""
+        self.metrics = metrics or REGISTRY
+        self.auth = auth or LeetCodeAuth(metrics=self.metrics)
+        self.storage = storage or ProblemStorage(metrics=self.metrics)
+        self.history = SubmissionHistory(self.storage.data_file.parent)
+        self.question_cache = QuestionCache(
+            self.storage.data_file.parent / "question_cache.json"
+        )
+        self.retry_delay = RETRY_DELAY
+
+    def _fetch_with_auth_probe(
+        self, fields: Dict[str, GraphQLField]
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch the given selections together with the auth probe.
+
+        Saves a round trip over probing first. Returns the selections' data, or
+        None (after reporting it) if authentication isn't working.
+        """
+
+        def probe() -> Optional[Dict[str, Any]]:
+            try:
+                return self.auth.graphql({"user": CURRENT_USER_FIELD, **fields})
+            except GraphQLError as e:
+                print(f"Error contacting LeetCode: {e}")
+                return None
+
+        result = None
+        if self.auth.get_authenticated_session() is not None:
+            result = self._retrying(probe, "auth check")
+
+        if not result or result["user"] is None:
+            print("❌ Authentication failed. Run 'leetcode-picker auth' first.")
+            return None
+        return result
 
     def get_user_submissions(self, offset: int = 0, limit: int = 100) -> Optional[Dict]:
         """Get user's submission history from LeetCode GraphQL API."""
-        session = self.auth.get_authenticated_session()
-        if not session:
+        try:
+            return self.auth.graphql({"page": submission_list_field(offset, limit)})[
+                "page"
+            ]
+        except GraphQLError as e:
+            print(f"Error fetching submissions: {e}")
+            return None
+
+    def get_problemset_page(
+        self, status_filter: str, skip: int = 0, limit: int = PROBLEMSET_PAGE_SIZE
+    ) -> Optional[Dict]:
+        """Get one page of the problemset question list filtered by status."""
+        try:
+            return self.auth.graphql(
+                {"page": problemset_field(status_filter, skip, limit)}
+            )["page"]
+        except GraphQLError as e:
+            print(f"Error fetching problemset status: {e}")
             return None
 
-        query = {
-            "query": """
-            query submissionList($offset: Int, $limit: Int) {
-                submissionList(offset: $offset, limit: $limit) {
-                    submissions {
-                        id
-                        title
-                        titleSlug
-                        status
-                        statusDisplay
-                        lang
-                        timestamp
-                        url
-                        isPending
-                        memory
-                        runtime
-                        __typename
+    def get_question_statuses(
+        self, first_pages: Optional[Dict[str, Dict]] = None
+    ) -> Optional[Dict[str, Dict]]:
+        """Get solved/attempted status for every question the user has touched.
+
+        Pages through the problemset question list once per status filter, so
+        hundreds of statuses arrive in a handful of requests. Returns a dict
+        keyed by problem URL, or None if any request failed. ``first_pages``
+        may hold already-fetched first pages, keyed by status.
+        """
+        statuses: Dict[str, Dict] = {}
+        first_pages = first_pages or {}
+
+        for status, status_filter in PROBLEMSET_STATUS_FILTERS.items():
+            skip = 0
+            while True:
+                result = first_pages.get(status) if skip == 0 else None
+                if result is None:
+                    result = self.get_problemset_page(status_filter, skip)
+                if result is None:
+                    return None
+
+                questions = result.get("questions") or []
+                for question in questions:
+                    title_slug = question.get("titleSlug")
+                    if not title_slug:
+                        continue
+                    problem_url = f"https://leetcode.com/problems/{title_slug}/"
+                    statuses[problem_url] = {
+                        "title": question.get("title", ""),
+                        "difficulty": (question.get("difficulty") or "").lower(),
+                        "status": status,
                     }
-                    hasNext
-                }
-            }
-            """,
-            "variables": {"offset": offset, "limit": limit},
-        }
 
+                skip += len(questions)
+                if not questions or skip >= result.get("total", 0):
+                    break
+
+        solved = sum(1 for s in statuses.values() if s["status"] == "ac")
+        print(f"Found {solved} solved and {len(statuses) - solved} attempted problems")
+        return statuses
+
+    def _retrying(self, fetch: Callable[[], Optional[T]], what: str) -> Optional[T]:
+        """Call ``fetch`` until it returns a result, retrying rate limits and blips."""
+        for attempt in range(PAGE_RETRIES + 1):
+            result = fetch()
+            if result is not None:
+                return result
+            if attempt < PAGE_RETRIES:
+                self.metrics.inc("sync_retries_total")
+                delay = self.retry_delay * 2**attempt
+                print(f"Retrying {what} in {delay:.0f}s...")
+                time.sleep(delay)
+        return None
+
+    def _get_submissions_page(self, offset: int) -> Optional[Dict]:
+        """Get one submissions page, with retries."""
+        return self._retrying(
+            lambda: self.get_user_submissions(offset, SUBMISSION_PAGE_LIMIT),
+            f"offset {offset}",
+        )
+
+    def _lookup_questions(self, slugs: List[str]) -> Optional[Dict[str, Any]]:
+        """Look up several questions in one aliased request, keyed by slug."""
         try:
-            response = session.post(
-                "https://leetcode.com/graphql", json=query, timeout=10
+            result = self.auth.graphql(
+                {f"q{i}": question_field(slug) for i, slug in enumerate(slugs)}
             )
-            response.raise_for_status()
-            data = response.json()
-
-            if "data" in data and "submissionList" in data["data"]:
-                return data["data"]["submissionList"]
-            return None
-        except Exception as e:
-            print(f"Error fetching submissions: {e}")
+        except GraphQLError as e:
+            print(f"Error looking up problems: {e}")
             return None
+        return {slug: result[f"q{i}"] for i, slug in enumerate(slugs)}
+
+    def get_question_metadata(self, slugs: List[str]) -> Dict[str, Dict]:
+        """Get title and difficulty for the given problem slugs.
+
+        Cached slugs are answered locally; the rest are looked up with batched,
+        aliased question queries. Slugs that couldn't be looked up are omitted.
+        """
+        metadata = {slug: self.question_cache.get(slug) for slug in slugs}
+        missing = [slug for slug, info in metadata.items() if info is None]
+        self.metrics.inc("cache_hits_total", len(slugs) - len(missing), cache="question")
+        self.metrics.inc("cache_misses_total", len(missing), cache="question")
+
+        if missing:
+            print(f"Looking up {len(missing)} problems outside study plans...")
+
+        for start in range(0, len(missing), QUESTION_BATCH_SIZE):
+            batch = missing[start : start + QUESTION_BATCH_SIZE]
+            result = self._retrying(
+                lambda: self._lookup_questions(batch), "problem lookup"
+            )
+            if result is None:
+                break
 
-    def get_all_submissions(self) -> List[Dict]:
-        """Get all user submissions by paginating through results."""
-        all_submissions = []
-        offset = 0
-        limit = 50  # LeetCode seems to ignore this and returns ~20 per page
-
-        print("Fetching submission history...")
+            for slug, question in result.items():
+                if not question:
+                    continue
+                info = {
+                    "title": question.get("title", ""),
+                    "difficulty": (question.get("difficulty") or "").lower(),
+                }
+                self.question_cache.set(slug, info)
+                metadata[slug] = info
+
+        self.question_cache.save()
+        return {slug: info for slug, info in metadata.items() if info is not None}
+
+    def fetch_submission_history(self, first_page: Optional[Dict] = None) -> bool:
+        """Page through all user submissions into the local history.
+
+        Each page is checkpointed as it arrives, and an interrupted fetch
+        resumes from its last good offset once it has caught up on newer
+        submissions. ``first_page`` may hold an
+        already-fetched page at offset 0. Returns True if the history is
+        complete, False if fetching stopped early (progress is kept).
+        """
+        checkpoint = self.history.load_checkpoint()
+        if checkpoint:
+            offset = checkpoint["offset"]
+            fetched = checkpoint["fetched"]
+            print(
+                f"Resuming interrupted sync at offset {offset} "
+                f"({fetched} submissions already fetched)..."
+            )
+        else:
+            self.history.start()
+            offset = 0
+            fetched = 0
+            print("Fetching submission history...")
+
+        result = first_page
+        if checkpoint:
+            caught_up = self._catch_up(result, offset, fetched)
+            if caught_up is None:
+                return False
+            if caught_up < 0:
+                print("Checkpoint doesn't match the submission history; restarting...")
+                self.history.start()
+                offset = 0
+                fetched = 0
+            else:
+                fetched = caught_up
+                result = None
 
         while True:
-            result = self.get_user_submissions(offset, limit)
-            if not result or not result.get("submissions"):
-                break
+            if result is None:
+                result = self._get_submissions_page(offset)
+            if result is None:
+                print(f"Stopped at offset {offset} after {fetched} submissions.")
+                return False
 
-            submissions = result["submissions"]
+            submissions = result.get("submissions") or []
             if not submissions:  # Empty list means we're done
                 break
 
-            all_submissions.extend(submissions)
+            # LeetCode returns ~20 per page regardless of limit, so increment by actual count
+            offset += len(submissions)
+            fetched += len(submissions)
+            self.history.append_page(submissions, offset, fetched)
 
-            print(f"Fetched {len(all_submissions)} submissions so far...")
+            print(f"Fetched {fetched} submissions so far...")
 
             if not result.get("hasNext", False):
                 break
+            result = None
+
+        total = self.history.finish()
+        print(f"Total submissions found: {total}")
+        return True
+
+    def _catch_up(
+        self, first_page: Optional[Dict], offset: int, fetched: int
+    ) -> Optional[int]:
+        """Fetch the submissions made since an interrupted fetch's checkpoint.
+
+        New submissions push the rest down the list, so pages are read from
+        the top until one overlaps what was already fetched; the fetch then
+        carries on from the checkpoint (the history drops the overlap by
+        submission id). The new pages are appended together, so a fetch
+        interrupted here catches up again next time. Returns the new fetched
+        count, -1 if no page before the checkpoint overlaps (the partial
+        history is stale), or None if fetching failed.
+        """
+        known = self.history.partial_ids()
+        pages: List[Dict] = []
+        head = 0
+        result = first_page
+        while head < offset:
+            if result is None:
+                result = self._get_submissions_page(head)
+            if result is None:
+                print(f"Stopped at offset {head} after {fetched} submissions.")
+                return None
+
+            submissions = result.get("submissions") or []
+            if not submissions:
+                break
+            pages.extend(submissions)
+            if any(submission.get("id") in known for submission in submissions):
+                new = {s.get("id") for s in pages if s.get("id") not in known}
+                self.history.append_page(pages, offset, fetched + len(new))
+                return fetched + len(new)
+            if not result.get("hasNext", False):
+                break
+            head += len(submissions)
+            result = None
+        return -1
 
-            # LeetCode returns ~20 per page regardless of limit, so increment by actual count
-            offset += len(submissions)
-
-        print(f"Total submissions found: {len(all_submissions)}")
-        return all_submissions
-
-    def get_accepted_problems(self) -> Dict[str, Dict]:
+    def get_accepted_problems(self, submissions: Iterable[Dict]) -> Dict[str, Dict]:
         """Get only accepted submissions, grouped by problem."""
-        submissions = self.get_all_submissions()
-        accepted_problems = {}
+        accepted_problems: Dict[str, Dict] = {}
 
         for submission in submissions:
             if submission.get("status") != 10:  # 10 = Accepted
@@ -132,43 +478,83 @@ class LeetCodeSync:
 
         return accepted_problems
 
-    def sync_submission_data(self) -> None:
-        """Sync LeetCode submission data with local problem database."""
-        if not self.auth.test_authentication():
-            print("❌ Authentication failed. Run 'leetcode-picker auth' first.")
-            return
+    def sync_submission_data(self, restart: bool = False) -> bool:
+        """Sync LeetCode submission data with local problem database.
+
+        An interrupted sync is resumed unless ``restart`` is set. Nothing is
+        written to the problem database until the history is complete.
+        Returns whether the sync completed.
+        """
+        probe = self._fetch_with_auth_probe(
+            {"submissions": submission_list_field(0, SUBMISSION_PAGE_LIMIT)}
+        )
+        if probe is None:
+            return False
 
         print("🔄 Syncing submission history with local database...")
 
+        if restart:
+            self.history.clear_checkpoint()
+
+        with profiling.phase("fetch history"):
+            complete = self.fetch_submission_history(probe["submissions"])
+        if not complete:
+            print("⚠️  Sync incomplete: submission history is partial.")
+            print("   Local problems were not changed; progress has been saved.")
+            print("   Re-run 'leetcode-picker sync' to resume where it stopped.")
+            return False
+
         # Get accepted problems from LeetCode
-        accepted_problems = self.get_accepted_problems()
+        with profiling.phase("aggregate history"):
+            accepted_problems = self.get_accepted_problems(self.history.read())
 
         if not accepted_problems:
             print("No accepted submissions found.")
-            return
+            return True
 
         # Load existing problems from database
         existing_problems = self.storage.load_problems()
 
-        updated_count = 0
-        new_problems_found = 0
-
-        for problem_url, submission_data in accepted_problems.items():
-            if problem_url in existing_problems:
-                # Update existing problem
-                problem = existing_problems[problem_url]
+        # Problems outside the study plans are imported with looked-up metadata
+        outside_slugs = [
+            url.rstrip("/").rsplit("/", 1)[-1]
+            for url in accepted_problems
+            if url not in existing_problems
+        ]
+        with profiling.phase("question metadata"):
+            metadata = self.get_question_metadata(outside_slugs)
+
+        counts: Dict[str, int] = {}
+
+        def apply(problems: Dict[str, Problem]) -> bool:
+            # Re-run from scratch if another process saved in the meantime
+            counts.update(updated=0, imported=0, missing=0)
+            for problem_url, submission_data in accepted_problems.items():
+                problem = problems.get(problem_url)
+                if problem is None:
+                    info = metadata.get(problem_url.rstrip("/").rsplit("/", 1)[-1])
+                    if info is None:
+                        counts["missing"] += 1
+                        continue
+                    # Problem outside the study plans - import it without plan membership
+                    problem = Problem(
+                        url=problem_url,
+                        title=info["title"] or submission_data["title"],
+                        difficulty=info["difficulty"],
+                        study_plan_urls=[],
+                    )
+                    problems[problem_url] = problem
+                    counts["imported"] += 1
+                else:
+                    counts["updated"] += 1
 
                 # Convert timestamp to date (LeetCode uses Unix timestamp as string)
-                import datetime
-
                 timestamp = submission_data["last_accepted"]
                 # Convert string timestamp to int if needed
                 if isinstance(timestamp, str):
                     timestamp = int(timestamp)
 
-                last_date = datetime.datetime.fromtimestamp(timestamp).strftime(
-                    "%Y-%m-%d"
-                )
+                last_date = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
 
                 # Update completion data
                 problem.last_pass_date = last_date
@@ -176,27 +562,109 @@ class LeetCodeSync:
                 problem.submissions = submission_data[
                     "total_accepted"
                 ]  # Conservative estimate
+            return True
 
-                self.storage.add_or_update_problem(problem)
-                updated_count += 1
-            else:
-                # Problem not in our database - might be outside study plans
-                new_problems_found += 1
-                print(f"Found problem not in study plans: {submission_data['title']}")
+        self.storage.update(apply)
+        updated_count = counts["updated"]
+        imported_count = counts["imported"]
+        missing_count = counts["missing"]
 
         print("✅ Sync complete!")
         print(f"   Updated {updated_count} problems with submission data")
-        if new_problems_found > 0:
+        if imported_count > 0:
+            print(f"   Imported {imported_count} solved problems outside study plans")
+        if missing_count > 0:
             print(
-                f"   Found {new_problems_found} additional problems outside study plans"
+                f"   Couldn't look up {missing_count} problems; "
+                "they'll be imported on the next sync"
             )
+        return True
+
+    def sync_status_data(self) -> bool:
+        """Fast sync: update solved/attempted flags from bulk question status.
+
+        Only flags are available this way, so problems newly seen as solved get
+        a single completion and keep their last pass date. Use the full
+        submission sync for accurate counts and dates. Returns whether the
+        sync completed.
+        """
+        probe = self._fetch_with_auth_probe(
+            {
+                status: problemset_field(status_filter)
+                for status, status_filter in PROBLEMSET_STATUS_FILTERS.items()
+            }
+        )
+        if probe is None:
+            return False
+
+        print("🔄 Fetching solved/attempted status from LeetCode...")
+
+        with profiling.phase("fetch statuses"):
+            statuses = self.get_question_statuses(
+                {status: probe[status] for status in PROBLEMSET_STATUS_FILTERS}
+            )
+        if statuses is None:
+            print("❌ Could not fetch question status. Nothing was changed.")
+            return False
+
+        counts: Dict[str, int] = {}
+
+        def apply(problems: Dict[str, Problem]) -> bool:
+            # Re-run from scratch if another process saved in the meantime
+            counts.update(updated=0, imported=0)
+            for problem_url, status_data in statuses.items():
+                problem = problems.get(problem_url)
+                if problem is None:
+                    if status_data["status"] != "ac":
+                        continue
+                    # Solved outside the study plans; the question list has its metadata
+                    problem = Problem(
+                        url=problem_url,
+                        title=status_data["title"],
+                        difficulty=status_data["difficulty"],
+                        study_plan_urls=[],
+                        completions=1,
+                        submissions=1,
+                    )
+                    problems[problem_url] = problem
+                    counts["imported"] += 1
+                    continue
+
+                changed = False
+                if status_data["status"] == "ac" and not problem.is_completed:
+                    problem.completions = 1
+                    changed = True
+                if problem.submissions < 1:
+                    problem.submissions = 1
+                    changed = True
+
+                if changed:
+                    counts["updated"] += 1
+            return bool(counts["updated"] or counts["imported"])
+
+        self.storage.update(apply)
+        updated_count = counts["updated"]
+        imported_count = counts["imported"]
+
+        print("✅ Fast sync complete!")
+        print(f"   Updated {updated_count} problems with solved/attempted status")
+        if imported_count > 0:
+            print(f"   Imported {imported_count} solved problems outside study plans")
+        print("   Run 'leetcode-picker sync' for exact counts and dates.")
+        return True
 
     def get_stats(self) -> Dict[str, int]:
         """Get basic stats about synced data."""
-        if not self.auth.test_authentication():
+        probe = self._fetch_with_auth_probe(
+            {"submissions": submission_list_field(0, SUBMISSION_PAGE_LIMIT)}
+        )
+        if probe is None:
+            return {}
+
+        if not self.fetch_submission_history(probe["submissions"]):
             return {}
 
-        accepted_problems = self.get_accepted_problems()
+        accepted_problems = self.get_accepted_problems(self.history.read())
         existing_problems = self.storage.load_problems()
 
         synced_count = sum(
@@ -0,0 +1,243 @@
+"""Streaming NDJSON export and import of the problem database.
+
+One JSON object per line: a header, every problem, then every submission of
+the synced history (if there is one)::
+
+    {"type": "header", "format": "leetcode-picker", "version": 1, ...}
+    {"type": "problem", "url": "https://leetcode.com/problems/two-sum/", ...}
+    {"type": "submission", "id": "1234", "titleSlug": "two-sum", ...}
+
+Both directions stream one line at a time. An import checks the whole input
+first, then merges it into the database in a single storage.update(), so it's
+one write that keeps any save made meanwhile; the input is read again if that
+update has to be re-applied.
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+from dataclasses import asdict, replace
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Dict, Iterator, Optional, Set, TextIO, Tuple
+
+from .history import SubmissionHistory
+from .models import Problem
+from .storage import ProblemStorage
+
+FORMAT = "leetcode-picker"
+VERSION = 1
+
+RECORD_TYPES = ("header", "problem", "submission")
+
+
+def problem_record(problem: Problem) -> Dict:
+    """A problem as an export record."""
+    return {"type": "problem", **asdict(problem)}
+
+
+def parse_problem(record: Dict) -> Problem:
+    """Build a Problem from an export record."""
+    return Problem(
+        url=str(record["url"]),
+        title=record.get("title") or "",
+        difficulty=record.get("difficulty") or "",
+        study_plan_urls=[str(url) for url in record.get("study_plan_urls") or []],
+        last_pass_date=record.get("last_pass_date") or None,
+        completions=int(record.get("completions") or 0),
+        submissions=int(record.get("submissions") or 0),
+        overridden_difficulty=record.get("overridden_difficulty") or None,
+    )
+
+
+def merge_problem(current: Problem, incoming: Problem) -> bool:
+    """Merge an imported problem into the stored one; returns whether it changed.
+
+    Counts keep the larger value and the completion date the later one;
+    study plans are combined. A difficulty override already set locally wins.
+    """
+    before = replace(current, study_plan_urls=list(current.study_plan_urls))
+    current.completions = max(current.completions, incoming.completions)
+    current.submissions = max(current.submissions, incoming.submissions)
+    if incoming.last_pass_date and (
+        not current.last_pass_date or incoming.last_pass_date > current.last_pass_date
+    ):
+        current.last_pass_date = incoming.last_pass_date
+    for url in incoming.study_plan_urls:
+        if url not in current.study_plan_urls:
+            current.study_plan_urls.append(url)
+    current.overridden_difficulty = (
+        current.overridden_difficulty or incoming.overridden_difficulty
+    )
+    current.title = current.title or incoming.title
+    current.difficulty = current.difficulty or incoming.difficulty
+    return current != before
+
+
+def export_ndjson(
+    storage: ProblemStorage, out: TextIO, submissions: bool = True
+) -> Tuple[int, int]:
+    """Write the database to ``out``; returns (problems, submissions) written.
+
+    The data file is read through one open handle, so the export is a
+    consistent copy even if another process saves while it runs.
+    """
+    header = {
+        "type": "header",
+        "format": FORMAT,
+        "version": VERSION,
+        "exported": datetime.now().isoformat(timespec="seconds"),
+    }
+    out.write(json.dumps(header) + "\n")
+    n_problems = 0
+    if storage.data_file.exists():
+        for problem in storage.iter_problems():
+            out.write(json.dumps(problem_record(problem)) + "\n")
+            n_problems += 1
+
+    n_submissions = 0
+    if submissions:
+        for record in SubmissionHistory(storage.data_file.parent).read():
+            out.write(json.dumps({"type": "submission", **record}) + "\n")
+            n_submissions += 1
+    return n_problems, n_submissions
+
+
+class ImportSource:
+    """NDJSON input that can be read more than once.
+
+    A file is reopened for each read; stdin is first copied to a temporary
+    file, which lives as long as this object does.
+    """
+
+    def __init__(self, path: Optional[Path] = None, stream: Optional[IO[str]] = None):
+        """Read from ``path``, or from ``stream`` (default: stdin)."""
+        self.path = path
+        self._spool: Optional[IO[str]] = None
+        if path is None:
+            self._spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+            shutil.copyfileobj(stream or sys.stdin, self._spool)
+
+    def _lines(self) -> Iterator[str]:
+        """The input's lines, from the start."""
+        if self._spool is not None:
+            self._spool.seek(0)
+            yield from self._spool
+            return
+        assert self.path is not None
+        with open(self.path, "r", encoding="utf-8") as f:
+            yield from f
+
+    def records(self) -> Iterator[Tuple[int, Dict]]:
+        """(line number, record) for every problem and submission.
+
+        Header lines after the first are skipped, so concatenated exports
+        import as one.
+
+        Raises ValueError for anything that isn't an export of a supported
+        version.
+        """
+        seen_header = False
+        for lineno, line in enumerate(self._lines(), 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"line {lineno}: not valid JSON ({e.msg})")
+            if not isinstance(record, dict) or record.get("type") not in RECORD_TYPES:
+                raise ValueError(f"line {lineno}: not an export record")
+            if not seen_header:
+                if record["type"] != "header" or record.get("format") != FORMAT:
+                    raise ValueError("not a leetcode-picker export (no header line)")
+                if (
+                    not isinstance(record.get("version"), int)
+                    or record["version"] > VERSION
+                ):
+                    raise ValueError(
+                        f"export format version {record.get('version')} is newer "
+                        f"than this leetcode-picker supports ({VERSION})"
+                    )
+                seen_header = True
+                continue
+            if record["type"] != "header":
+                yield lineno, record
+        if not seen_header:
+            raise ValueError("not a leetcode-picker export (empty input)")
+
+
+def _parse_record(lineno: int, record: Dict) -> Optional[Problem]:
+    """The problem an import record holds (None for a submission).
+
+    Raises ValueError for a record that can't be imported.
+    """
+    if record["type"] == "submission":
+        if record.get("id") is None:
+            raise ValueError(f"line {lineno}: submission without an id")
+        return None
+    try:
+        return parse_problem(record)
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"line {lineno}: bad problem record ({e})")
+
+
+def import_ndjson(
+    storage: ProblemStorage, source: ImportSource, replace_all: bool = False
+) -> Dict[str, int]:
+    """Merge an export into the database in one write.
+
+    With ``replace_all`` the database becomes exactly the exported problems.
+    Submissions are added to the local history by id. Returns counts of
+    problems added, updated, unchanged and removed, and submissions added.
+    Nothing is written if any line is invalid.
+    """
+    counts: Dict[str, int] = {}
+
+    def apply(problems: Dict[str, Problem]) -> bool:
+        counts.update(added=0, updated=0, unchanged=0, removed=0)
+        imported: Optional[Set[str]] = set() if replace_all else None
+        for lineno, record in source.records():
+            incoming = _parse_record(lineno, record)
+            if incoming is None:
+                continue
+            if imported is not None:
+                imported.add(incoming.url)
+                if problems.get(incoming.url) != incoming:
+                    counts["updated" if incoming.url in problems else "added"] += 1
+                    problems[incoming.url] = incoming
+                else:
+                    counts["unchanged"] += 1
+                continue
+            current = problems.get(incoming.url)
+            if current is None:
+                problems[incoming.url] = incoming
+                counts["added"] += 1
+            elif merge_problem(current, incoming):
+                counts["updated"] += 1
+            else:
+                counts["unchanged"] += 1
+        if imported is not None:
+            for url in [url for url in problems if url not in imported]:
+                del problems[url]
+                counts["removed"] += 1
+        return bool(counts["added"] or counts["updated"] or counts["removed"])
+
+    # Check every line up front: a bad one halfway through would otherwise
+    # leave the cached snapshot partly merged
+    for lineno, record in source.records():
+        _parse_record(lineno, record)
+
+    try:
+        storage.update(apply)
+    except Exception:
+        # While writes are deferred, unsaved changes exist only in the cached
+        # snapshot, so it has to stay
+        if not storage.deferred:
+            storage.invalidate_cache()
+        raise
+
+    counts["submissions"] = SubmissionHistory(storage.data_file.parent).merge(
+        record for _, record in source.records() if record["type"] == "submission"
+    )
+    return counts
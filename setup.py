@@ -27,6 +27,10 @@ setup(
         "beautifulsoup4>=4.12.0",
         "click>=8.0.0",
     ],
+    extras_require={
+        # leetcode-picker stats
+        "stats": ["numpy>=1.24"],
+    },
     entry_points={
         "console_scripts": [
             "leetcode-picker=leetcode_picker.main:main",